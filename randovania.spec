@@ -9,7 +9,9 @@ a = Analysis(['randovania/__main__.py', 'randovania/cli/__init__.py'],
              binaries=[],
              datas=[
                  ("randovania/data/configuration.json", "data/"),
-                 ("randovania/data/binary_data", "data/binary_data"),
+                 ("randovania/data/binary_data/CREDITS.txt", "data/binary_data"),
+                 ("randovania/data/binary_data/*.bin", "data/binary_data"),
+                 ("randovania/data/binary_data/*.rdb", "data/binary_data"),
                  ("randovania/data/ClarisEchoesMenu", "data/ClarisEchoesMenu"),
                  ("randovania/data/ClarisPrimeRandomizer", "data/ClarisPrimeRandomizer"),
                  ("randovania/data/gui_assets", "data/gui_assets"),
@@ -1,35 +1,127 @@
+import contextlib
+import itertools
+import json
 import math
-import multiprocessing
+import os
 import time
 from argparse import ArgumentParser
+from concurrent.futures import FIRST_COMPLETED, wait
+from concurrent.futures.process import BrokenProcessPool, ProcessPoolExecutor
 from pathlib import Path
+from random import Random
+from typing import Optional, Set
 
+from randovania import profiler
 from randovania.cli import echoes_lib
-from randovania.generator import generator
+from randovania.game_description import default_database
+from randovania.generator import base_patches_factory, generator
+from randovania.generator.layout_cache import LayoutCache
 from randovania.interface_common import sleep_inhibitor
 from randovania.layout.permalink import Permalink
+from randovania.resolver import bootstrap
+from randovania.resolver.exceptions import GenerationFailure
+
+# Used when the output is a directory
+OUTPUT_FILE_NAME = "seeds.ndjson"
+
+# Set in each worker process of `batch_distribute_command_logic`
+_worker_base_permalink: Optional[Permalink] = None
+_worker_arguments: Optional[tuple] = None
+_worker_games: Optional[list] = None
 
 
 def batch_distribute_helper(base_permalink: Permalink,
                             seed_number: int,
                             timeout: int,
                             validate: bool,
-                            output_dir: Path,
-                            ) -> float:
+                            generator_jobs: int = 1,
+                            profile: bool = False,
+                            layout_cache: Optional[LayoutCache] = None,
+                            ) -> dict:
+    """
+    Generates the given seed.
+    :param base_permalink:
+    :param seed_number:
+    :param timeout:
+    :param validate:
+    :param generator_jobs:
+    :param profile: If the entry should include how long each phase of the generation took.
+    :param layout_cache: Where to look for a layout previously generated for the seed, and to add the new one.
+    :return: The entry for the seed in the output file, with either the layout or the error.
+    """
     permalink = Permalink(
         seed_number=seed_number,
         spoiler=True,
         presets=base_permalink.presets,
     )
 
-    start_time = time.perf_counter()
-    description = generator.generate_description(permalink=permalink, status_update=None,
-                                                 validate_after_generation=validate, timeout=timeout,
-                                                 attempts=0)
-    delta_time = time.perf_counter() - start_time
-
-    description.save_to_file(output_dir.joinpath("{}.json".format(seed_number)))
-    return delta_time
+    entry = {"seed_number": seed_number}
+    with profiler.profiling() if profile else contextlib.nullcontext() as generation_profile:
+        start_time = time.perf_counter()
+        try:
+            description = generator.generate_description(permalink=permalink, status_update=None,
+                                                         validate_after_generation=validate, timeout=timeout,
+                                                         attempts=0, jobs=generator_jobs,
+                                                         layout_cache=layout_cache)
+            entry["layout"] = description.as_json
+        except GenerationFailure as e:
+            entry["error"] = str(e)
+        entry["seconds"] = time.perf_counter() - start_time
+
+    if profile:
+        entry["profile"] = generation_profile.as_json
+    return entry
+
+
+def _preload_games(base_permalink: Permalink) -> list:
+    """
+    Loads and patches the game of each preset, so the time of the first seed doesn't include reading the data files.
+    :param base_permalink:
+    :return: The patched games, which should be kept alive so requirements shared with new games keep their caches.
+    """
+    games = []
+    for preset in base_permalink.presets.values():
+        configuration = preset.configuration
+        game = default_database.game_description_for(configuration.game)
+        patches = base_patches_factory.create_base_patches(configuration, Random(base_permalink.as_bytes), game,
+                                                           len(base_permalink.presets) > 1)
+        games.append(bootstrap.logic_bootstrap(configuration, game, patches)[0])
+    return games
+
+
+def _initialize_worker(base_permalink: Permalink, timeout: int, validate: bool, generator_jobs: int, profile: bool,
+                       layout_cache: Optional[LayoutCache]):
+    global _worker_base_permalink, _worker_arguments, _worker_games
+    _worker_base_permalink = base_permalink
+    _worker_arguments = (timeout, validate, generator_jobs, profile, layout_cache)
+    _worker_games = _preload_games(base_permalink)
+
+
+def _batch_distribute_in_worker(seed_number: int) -> dict:
+    return batch_distribute_helper(_worker_base_permalink, seed_number, *_worker_arguments)
+
+
+def read_finished_seeds(output_path: Path) -> Set[int]:
+    """
+    Reads the seed numbers already in the given output file. If the last entry was only partially written,
+    it's removed so new entries can be appended.
+    :param output_path:
+    :return:
+    """
+    if not output_path.is_file():
+        return set()
+
+    with output_path.open("rb+") as output_file:
+        contents = output_file.read()
+        complete_size = contents.rfind(b"\n") + 1
+        if complete_size < len(contents):
+            output_file.truncate(complete_size)
+
+    return {
+        json.loads(line)["seed_number"]
+        for line in contents[:complete_size].splitlines()
+        if line.strip()
+    }
 
 
 def batch_distribute_command_logic(args):
@@ -37,36 +129,91 @@ def batch_distribute_command_logic(args):
 
     timeout: int = args.timeout
     validate: bool = args.validate
+    generator_jobs: int = args.generator_jobs
+    profile: bool = args.profile
+    layout_cache = echoes_lib.layout_cache_from_arguments(args)
 
-    output_dir: Path = args.output_dir
-    output_dir.mkdir(parents=True, exist_ok=True)
+    output_path: Path = args.output
+    if output_path.is_dir():
+        output_path = output_path.joinpath(OUTPUT_FILE_NAME)
+        print(f"Writing the seed logs to {output_path}.")
+    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    seed_count = args.seed_count
+    base_permalink = Permalink.from_str(args.permalink)
+    finished_seeds = read_finished_seeds(output_path)
+    seed_numbers = [
+        seed_number
+        for seed_number in range(base_permalink.seed_number, base_permalink.seed_number + args.seed_count)
+        if seed_number not in finished_seeds
+    ]
+    if len(seed_numbers) < args.seed_count:
+        print("Skipping {} seeds already in {}.".format(args.seed_count - len(seed_numbers), output_path))
+
+    seed_count = len(seed_numbers)
     num_digits = math.ceil(math.log10(seed_count + 1))
     number_format = "[{0:" + str(num_digits) + "d}/{1}] "
-    base_permalink = Permalink.from_str(args.permalink)
 
     def report_update(msg: str):
         nonlocal finished_count
         finished_count += 1
         print(number_format.format(finished_count, seed_count) + msg)
 
-    def callback(result):
-        report_update(f"Finished seed in {result} seconds.")
-
-    def error_callback(e):
-        report_update(f"Failed to generate seed: {e}")
-
-    with multiprocessing.Pool(processes=args.process_count) as pool, sleep_inhibitor.get_inhibitor():
-        for seed_number in range(base_permalink.seed_number, base_permalink.seed_number + args.seed_count):
-            pool.apply_async(
-                func=batch_distribute_helper,
-                args=(base_permalink, seed_number, timeout, validate, output_dir),
-                callback=callback,
-                error_callback=error_callback,
-            )
-        pool.close()
-        pool.join()
+    written_count = 0
+    broken_pool_error: Optional[BrokenProcessPool] = None
+
+    # Unlike the workers of a multiprocessing.Pool, these aren't daemonic so each generation can use its own processes
+    with ProcessPoolExecutor(max_workers=args.process_count, initializer=_initialize_worker,
+                             initargs=(base_permalink, timeout, validate, generator_jobs, profile,
+                                       layout_cache)) as pool, \
+            sleep_inhibitor.get_inhibitor(), output_path.open("a") as output_file:
+
+        # Only a few seeds are submitted ahead, so finished futures and their results don't pile up
+        max_pending = 2 * (args.process_count or os.cpu_count() or 1)
+        seeds_to_submit = iter(seed_numbers)
+        futures = {}
+
+        def submit_seeds():
+            for seed_number in itertools.islice(seeds_to_submit, max_pending - len(futures)):
+                futures[pool.submit(_batch_distribute_in_worker, seed_number)] = seed_number
+
+        try:
+            submit_seeds()
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                broken_pool_exceptions = []
+                for future in done:
+                    seed_number = futures.pop(future)
+                    e = future.exception()
+                    if isinstance(e, BrokenProcessPool):
+                        # The other finished seeds are still written before stopping
+                        broken_pool_exceptions.append(e)
+                        continue
+                    if e is not None:
+                        # Not written, so it's tried again when resuming
+                        report_update(f"Failed to generate seed {seed_number}: {e}")
+                        continue
+
+                    entry = future.result()
+                    output_file.write(json.dumps(entry) + "\n")
+                    output_file.flush()
+                    written_count += 1
+                    if "error" in entry:
+                        report_update(f"Failed to generate seed {entry['seed_number']}: {entry['error']}")
+                    else:
+                        report_update(f"Finished seed {entry['seed_number']} in {entry['seconds']} seconds.")
+
+                if broken_pool_exceptions:
+                    # Every other seed fails the same way, and no new ones can be submitted
+                    raise broken_pool_exceptions[0]
+                submit_seeds()
+
+        except BrokenProcessPool as e:
+            broken_pool_error = e
+
+    if broken_pool_error is not None:
+        print(f"Stopped, as a worker process ended abruptly: {broken_pool_error}")
+        print(f"{seed_count - written_count} seeds weren't generated. Run the same command again to resume.")
+        raise SystemExit(1)
 
 
 def add_batch_distribute_command(sub_parsers):
@@ -82,13 +229,25 @@ def add_batch_distribute_command(sub_parsers):
         type=int,
         default=90,
         help="How many seconds to wait before timing out a generation/validation.")
+    parser.add_argument(
+        "--generator-jobs",
+        type=int,
+        default=1,
+        help="How many processes each generation uses to weight its potential actions. Defaults to 1.")
+    parser.add_argument(
+        "--profile",
+        default=False,
+        action="store_true",
+        help="Also save how long each phase of each generation took, in its entry.")
     echoes_lib.add_validate_argument(parser)
+    echoes_lib.add_layout_cache_arguments(parser)
     parser.add_argument(
         "seed_count",
         type=int,
         help="How many seeds to generate.")
     parser.add_argument(
-        "output_dir",
+        "output",
         type=Path,
-        help="Where to place the seed logs.")
+        help="The file to append the seed logs to, one JSON object per line. "
+             f"Seeds already in this file are skipped. If a directory, {OUTPUT_FILE_NAME} inside it is used.")
     parser.set_defaults(func=batch_distribute_command_logic)
@@ -0,0 +1,309 @@
+import itertools
+import json
+import multiprocessing
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+from random import Random
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+from randovania import VERSION
+from randovania.cli import echoes_lib
+from randovania.generator import generator
+from randovania.interface_common.preset_manager import PresetManager
+from randovania.layout.permalink import Permalink
+from randovania.resolver.exceptions import GenerationFailure
+
+# Above this many runs in total, the permutation test uses random permutations instead of all of them
+_EXHAUSTIVE_PERMUTATION_LIMIT = 16
+_RANDOM_PERMUTATIONS = 10000
+
+
+class BenchmarkRun(NamedTuple):
+    seconds: float
+    peak_memory: Optional[int]  # In KB, above what the process used before generating
+    success: bool
+
+
+class PresetResults(NamedTuple):
+    runs: List[BenchmarkRun]
+
+    @property
+    def seconds(self) -> List[float]:
+        return [run.seconds for run in self.runs]
+
+    @property
+    def peak_memory(self) -> List[int]:
+        return [run.peak_memory for run in self.runs if run.peak_memory is not None]
+
+    @property
+    def failures(self) -> int:
+        return sum(1 for run in self.runs if not run.success)
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "seconds": self.seconds,
+            "peak_memory": [run.peak_memory for run in self.runs],
+            "success": [run.success for run in self.runs],
+        }
+
+    @classmethod
+    def from_json(cls, value: dict) -> "PresetResults":
+        return cls([
+            BenchmarkRun(seconds, peak_memory, success)
+            for seconds, peak_memory, success in zip(value["seconds"], value["peak_memory"], value["success"])
+        ])
+
+
+class Regression(NamedTuple):
+    preset_name: str
+    metric: str
+    baseline_mean: float
+    current_mean: float
+    p_value: float
+
+
+_PROC_STATUS = Path("/proc/self/status")
+
+
+def _peak_memory_kb() -> Optional[int]:
+    """
+    The most memory this process has used so far, in KB.
+    :return:
+    """
+    # In Linux, ru_maxrss also counts the process this one was started from, but the peak in the status doesn't
+    try:
+        for line in _PROC_STATUS.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        # Reported in bytes instead of kilobytes
+        peak //= 1024
+    return peak
+
+
+def run_benchmark_seed(preset_name: str,
+                       seed_number: int,
+                       validate: bool,
+                       timeout: int,
+                       ) -> BenchmarkRun:
+    """
+    Generates a single seed. Meant to run in a new process, so the increase of its peak memory is only of this seed.
+    :param preset_name:
+    :param seed_number:
+    :param validate:
+    :param timeout:
+    :return:
+    """
+    permalink = Permalink(
+        seed_number=seed_number,
+        spoiler=True,
+        presets={0: PresetManager(None).preset_for_name(preset_name).get_preset()},
+    )
+
+    start_memory = _peak_memory_kb()
+    start_time = time.perf_counter()
+    try:
+        generator.generate_description(permalink=permalink, status_update=None,
+                                       validate_after_generation=validate, timeout=timeout,
+                                       attempts=0)
+        success = True
+    except GenerationFailure:
+        success = False
+    delta_time = time.perf_counter() - start_time
+
+    end_memory = _peak_memory_kb()
+    peak_memory = end_memory - start_memory if start_memory is not None and end_memory is not None else None
+    return BenchmarkRun(delta_time, peak_memory, success)
+
+
+def permutation_p_value(baseline: Sequence[float], current: Sequence[float]) -> float:
+    """
+    One-sided permutation test of whether the mean of `current` is bigger than the mean of `baseline` by chance.
+    :param baseline:
+    :param current:
+    :return: The probability of a difference at least as big as the observed one, if both came from the same source.
+    """
+    pooled = list(baseline) + list(current)
+    total = sum(pooled)
+    num_current = len(current)
+    num_baseline = len(baseline)
+
+    def difference(current_sum: float) -> float:
+        return current_sum / num_current - (total - current_sum) / num_baseline
+
+    # Tolerate rounding errors of sums done in different orders
+    observed = difference(sum(current)) - 1e-9
+
+    if len(pooled) <= _EXHAUSTIVE_PERMUTATION_LIMIT:
+        extreme = 0
+        permutations = 0
+        for indices in itertools.combinations(range(len(pooled)), num_current):
+            permutations += 1
+            if difference(sum(pooled[i] for i in indices)) >= observed:
+                extreme += 1
+        return extreme / permutations
+
+    rng = Random(0)
+    extreme = 0
+    for _ in range(_RANDOM_PERMUTATIONS):
+        if difference(sum(rng.sample(pooled, num_current))) >= observed:
+            extreme += 1
+    return (extreme + 1) / (_RANDOM_PERMUTATIONS + 1)
+
+
+def find_regressions(baseline: Dict[str, PresetResults],
+                     current: Dict[str, PresetResults],
+                     significance: float,
+                     ) -> List[Regression]:
+    """
+    Compares the time and peak memory of each preset in both results.
+    :param baseline:
+    :param current:
+    :param significance: Differences with a p-value below this are considered regressions.
+    :return:
+    """
+    regressions = []
+    for preset_name, results in current.items():
+        baseline_results = baseline.get(preset_name)
+        if baseline_results is None:
+            continue
+
+        for metric in ("seconds", "peak_memory"):
+            baseline_values = getattr(baseline_results, metric)
+            current_values = getattr(results, metric)
+            if not baseline_values or not current_values:
+                continue
+
+            baseline_mean = statistics.mean(baseline_values)
+            current_mean = statistics.mean(current_values)
+            if current_mean <= baseline_mean:
+                continue
+
+            p_value = permutation_p_value(baseline_values, current_values)
+            if p_value < significance:
+                regressions.append(Regression(preset_name, metric, baseline_mean, current_mean, p_value))
+
+    return regressions
+
+
+def _format_change(baseline_values: List[float], current_values: List[float]) -> str:
+    if not baseline_values or not current_values:
+        return ""
+    return "{:+.1%}".format(statistics.mean(current_values) / statistics.mean(baseline_values) - 1)
+
+
+def benchmark_command_logic(args):
+    preset_manager = PresetManager(None)
+    if args.preset:
+        preset_names = args.preset
+    else:
+        preset_names = [preset.name for preset in preset_manager.included_presets]
+
+    seed_numbers = list(range(args.first_seed, args.first_seed + args.seed_count))
+
+    baseline: Dict[str, PresetResults] = {}
+    if args.baseline is not None:
+        with args.baseline.open() as baseline_file:
+            baseline_data = json.load(baseline_file)
+        if baseline_data["seed_numbers"] != seed_numbers or baseline_data["validate"] != args.validate:
+            print("WARNING: Baseline was created with different seeds or validation settings.")
+        baseline = {
+            preset_name: PresetResults.from_json(value)
+            for preset_name, value in baseline_data["presets"].items()
+        }
+        print("Comparing with baseline from version {}".format(baseline_data["version"]))
+
+    results: Dict[str, PresetResults] = {}
+
+    # A new process for each seed, so the peak memory is measured per seed. Spawned, so it doesn't start with a copy
+    # of this process' memory.
+    with multiprocessing.get_context("spawn").Pool(processes=1, maxtasksperchild=1) as pool:
+        for preset_name in preset_names:
+            runs = []
+            for seed_number in seed_numbers:
+                run = pool.apply(run_benchmark_seed, (preset_name, seed_number, args.validate, args.timeout))
+                print("{} seed {}: {:.2f}s{}".format(preset_name, seed_number, run.seconds,
+                                                     "" if run.success else ", failed"))
+                runs.append(run)
+            results[preset_name] = PresetResults(runs)
+
+    print("\n{:<25} {:>8} {:>10} {:>8} {:>14} {:>8}".format("Preset", "Failures", "Mean time", "Change",
+                                                             "Peak memory", "Change"))
+    for preset_name, preset_results in results.items():
+        baseline_results = baseline.get(preset_name, PresetResults([]))
+        memory = preset_results.peak_memory
+        print("{:<25} {:>8} {:>9.2f}s {:>8} {:>14} {:>8}".format(
+            preset_name,
+            "{}/{}".format(preset_results.failures, len(preset_results.runs)),
+            statistics.mean(preset_results.seconds),
+            _format_change(baseline_results.seconds, preset_results.seconds),
+            "{} KB".format(int(statistics.mean(memory))) if memory else "-",
+            _format_change(baseline_results.peak_memory, memory),
+        ))
+
+    if args.save_baseline is not None:
+        with args.save_baseline.open("w") as baseline_file:
+            json.dump({
+                "version": VERSION,
+                "seed_numbers": seed_numbers,
+                "validate": args.validate,
+                "presets": {
+                    preset_name: preset_results.as_json
+                    for preset_name, preset_results in results.items()
+                },
+            }, baseline_file, indent=4)
+
+    if args.baseline is not None:
+        regressions = find_regressions(baseline, results, args.significance)
+        for regression in regressions:
+            print("REGRESSION: {} {} went from {:.2f} to {:.2f} (p = {:.3f})".format(
+                regression.preset_name, regression.metric, regression.baseline_mean, regression.current_mean,
+                regression.p_value,
+            ))
+        for preset_name, preset_results in results.items():
+            if preset_name in baseline and preset_results.failures > baseline[preset_name].failures:
+                print("WARNING: {} had {} failures, up from {}".format(
+                    preset_name, preset_results.failures, baseline[preset_name].failures))
+
+        if regressions:
+            raise SystemExit(1)
+        print("No significant regressions.")
+
+
+def add_benchmark_command(sub_parsers):
+    parser: ArgumentParser = sub_parsers.add_parser(
+        "benchmark",
+        help="Generate a fixed set of seeds for each preset, comparing the time and memory used with a baseline."
+    )
+
+    parser.add_argument("--preset", type=str, action="append",
+                        help="The name of a preset to benchmark. Can be used multiple times. "
+                             "Defaults to all included presets.")
+    parser.add_argument("--first-seed", type=int, default=0, help="The first seed number to use. Defaults to 0.")
+    parser.add_argument("--seed-count", type=int, default=5, help="How many seeds to generate for each preset.")
+    parser.add_argument(
+        "--timeout",
+        type=int,
+        default=90,
+        help="How many seconds to wait before timing out a validation.")
+    echoes_lib.add_validate_argument(parser)
+    parser.add_argument("--baseline", type=Path, help="A baseline to compare the results with.")
+    parser.add_argument("--save-baseline", type=Path, help="Where to save the results, for use as a baseline.")
+    parser.add_argument("--significance", type=float, default=0.05,
+                        help="Slowdowns with a p-value below this are reported as regressions. Defaults to 0.05.")
+    parser.set_defaults(func=benchmark_command_logic)
@@ -1,8 +1,10 @@
 import asyncio
+import contextlib
 import time
 from argparse import ArgumentParser
 from pathlib import Path
 
+from randovania import profiler
 from randovania.cli import echoes_lib
 from randovania.generator import generator
 from randovania.interface_common.preset_manager import PresetManager
@@ -40,15 +42,24 @@ def distribute_command_logic(args):
     extra_args = {}
     if args.no_retry:
         extra_args["attempts"] = 0
-
-    before = time.perf_counter()
-    layout_description = generator.generate_description(permalink=permalink, status_update=status_update,
-                                                        validate_after_generation=args.validate, timeout=None,
-                                                        **extra_args)
-    after = time.perf_counter()
+    layout_cache = echoes_lib.layout_cache_from_arguments(args)
+    if layout_cache is not None:
+        extra_args["layout_cache"] = layout_cache
+
+    with profiler.profiling() if args.profile is not None else contextlib.nullcontext() as profile:
+        before = time.perf_counter()
+        layout_description = generator.generate_description(permalink=permalink, status_update=status_update,
+                                                            validate_after_generation=args.validate, timeout=None,
+                                                            concurrent_attempts=args.concurrent_attempts,
+                                                            **extra_args)
+        after = time.perf_counter()
     print("Took {} seconds. Hash: {}".format(after - before, layout_description.shareable_hash))
 
     layout_description.save_to_file(args.output_file)
+    if args.profile == "json":
+        profile.save_json(args.output_file.with_suffix(".profile.json"))
+    elif args.profile == "chrome-trace":
+        profile.save_chrome_trace(args.output_file.with_suffix(".trace.json"))
 
 
 def add_distribute_command(sub_parsers):
@@ -61,6 +72,14 @@ def add_distribute_command(sub_parsers):
     echoes_lib.add_validate_argument(parser)
     parser.add_argument("--no-retry", default=False, action="store_true", help="Disable retries in the generation.")
     parser.add_argument("--status-update", default=False, action="store_true", help="Print the status updates.")
+    parser.add_argument("--concurrent-attempts", type=int, default=1,
+                        help="Run this many generation attempts at the same time, each with a seed derived from the "
+                             "permalink. The lowest numbered successful attempt is used, so the game is the same as "
+                             "without this option. Defaults to 1.")
+    parser.add_argument("--profile", choices=["json", "chrome-trace"],
+                        help="Also save how long each phase took, next to the seed log. Either as a JSON summary or "
+                             "as a Chrome trace.")
+    echoes_lib.add_layout_cache_arguments(parser)
 
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--permalink", type=str, help="The permalink to use")
@@ -21,7 +21,8 @@ def validate_command_logic(args):
     before = time.perf_counter()
     final_state_by_resolve = resolver.resolve(
         configuration=configuration,
-        patches=patches
+        patches=patches,
+        jobs=args.jobs,
     )
     after = time.perf_counter()
     print("Took {} seconds. Game is {}.".format(
@@ -37,6 +38,11 @@ def add_validate_command(sub_parsers):
     )
 
     add_debug_argument(parser)
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="How many processes to use for exploring the resolver's first choice of actions. Defaults to 1.")
     parser.add_argument(
         "layout_file",
         type=Path,
@@ -1,6 +1,7 @@
 from argparse import ArgumentParser
 
 from randovania.cli.commands.batch_distribute import add_batch_distribute_command
+from randovania.cli.commands.benchmark import add_benchmark_command
 from randovania.cli.commands.distribute import add_distribute_command
 from randovania.cli.commands.permalink_command import add_permalink_command
 from randovania.cli.commands.randomize_command import add_randomize_command
@@ -20,6 +21,7 @@ def create_subparsers(sub_parsers):
     add_distribute_command(sub_parsers)
     add_randomize_command(sub_parsers)
     add_batch_distribute_command(sub_parsers)
+    add_benchmark_command(sub_parsers)
     add_refresh_presets_command(sub_parsers)
     add_permalink_command(sub_parsers)
 
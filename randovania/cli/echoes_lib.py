@@ -1,5 +1,8 @@
 from argparse import ArgumentParser
+from pathlib import Path
+from typing import Optional
 
+from randovania.generator.layout_cache import LayoutCache, DEFAULT_MAX_SIZE
 from randovania.layout.echoes_configuration import LayoutSkyTempleKeyMode
 from randovania.layout.trick_level import LayoutTrickLevel
 
@@ -39,3 +42,18 @@ def add_validate_argument(parser: ArgumentParser):
                        help="After generating a layout, validate if it's possible. Default behaviour.")
     group.add_argument("--no-validate", action="store_false", dest="validate", default=True,
                        help="After generating a layout, don't validate if it's possible.")
+
+
+def add_layout_cache_arguments(parser: ArgumentParser):
+    parser.add_argument("--layout-cache", type=Path,
+                        help="A directory with previously generated layouts, used when generating the same "
+                             "permalink again. Can be shared by multiple computers.")
+    parser.add_argument("--layout-cache-size", type=int, default=DEFAULT_MAX_SIZE // (1024 * 1024),
+                        help="How many megabytes the layout cache can use, removing the least recently used layouts "
+                             "when over it. Defaults to {}.".format(DEFAULT_MAX_SIZE // (1024 * 1024)))
+
+
+def layout_cache_from_arguments(args) -> Optional[LayoutCache]:
+    if args.layout_cache is None:
+        return None
+    return LayoutCache(args.layout_cache, args.layout_cache_size * 1024 * 1024)
@@ -11,7 +11,7 @@ from randovania.game_description.node import PickupNode
 from randovania.game_description.resources.resource_database import find_resource_info_with_long_name, MissingResource
 from randovania.game_description.resources.resource_info import ResourceInfo
 from randovania.games.game import RandovaniaGame
-from randovania.games.prime import binary_data, default_data
+from randovania.games.prime import binary_data, default_data, fast_binary_data
 from randovania.interface_common.enum_lib import iterate_enum
 
 
@@ -29,11 +29,32 @@ def decode_data_file(args) -> Dict:
         return default_data.read_json_then_binary(RandovaniaGame(args.game))[1]
 
 
+def source_hash_of_data_file(args) -> bytes:
+    """
+    The hash of the file `decode_data_file` reads, so a fast binary file converted from it is only used with it.
+    :param args:
+    :return:
+    """
+    json_database: Optional[Path] = args.json_database
+    if json_database is not None:
+        return fast_binary_data.hash_source(json_database)
+
+    source_path = default_data.read_json_then_binary(RandovaniaGame(args.game))[0]
+    if source_path.suffix == f".{fast_binary_data.FILE_EXTENSION}":
+        return fast_binary_data.read_source_hash(source_path)
+    return fast_binary_data.hash_source(source_path)
+
+
 def export_as_binary(data: dict, output_binary: Path):
     with output_binary.open("wb") as x:  # type: BinaryIO
         binary_data.encode(data, x)
 
 
+def export_as_fast_binary(data: dict, output_fast_binary: Path, source_hash: bytes):
+    with output_fast_binary.open("wb") as x:  # type: BinaryIO
+        fast_binary_data.encode(data, x, source_hash)
+
+
 def convert_database_command_logic(args):
     data = decode_data_file(args)
 
@@ -41,11 +62,15 @@ def convert_database_command_logic(args):
         data = data_writer.write_game_description(data_reader.decode_data(data))
 
     output_binary: Optional[Path] = args.output_binary
+    output_fast_binary: Optional[Path] = args.output_fast_binary
     output_json: Optional[Path] = args.output_json
 
     if output_binary is not None:
         export_as_binary(data, output_binary)
 
+    elif output_fast_binary is not None:
+        export_as_fast_binary(data, output_fast_binary, source_hash_of_data_file(args))
+
     elif output_json is not None:
         with output_json.open("w") as x:  # type: TextIO
             json.dump(data, x, indent=4)
@@ -72,6 +97,13 @@ def create_convert_database_command(sub_parsers):
         type=Path,
         help="Export as a binary file.",
     )
+    group.add_argument(
+        "--output-fast-binary",
+        type=Path,
+        help="Export as a fast loading binary file. Placed in binary_data with the "
+             f".{fast_binary_data.FILE_EXTENSION} extension, it's used instead of the JSON or binary file it was "
+             "converted from while that file is unchanged.",
+    )
     group.add_argument(
         "--output-json",
         type=Path,
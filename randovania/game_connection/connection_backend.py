@@ -7,7 +7,7 @@ from typing import Optional, List, Dict, Tuple
 from randovania.dol_patching import assembler
 from randovania.game_connection.backend_choice import GameBackendChoice
 from randovania.game_connection.connection_base import ConnectionBase, InventoryItem, GameConnectionStatus
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.game_description import GameDescription
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.pickup_entry import PickupEntry
@@ -15,7 +15,7 @@ from randovania.game_description.resources.resource_info import CurrentResources
     add_resource_gain_to_current_resources
 from randovania.game_description.world import World
 from randovania.games.game import RandovaniaGame
-from randovania.games.prime import dol_patcher, default_data, all_prime_dol_patches
+from randovania.games.prime import dol_patcher, all_prime_dol_patches
 from randovania.games.prime.all_prime_dol_patches import BasePrimeDolVersion
 
 
@@ -159,7 +159,7 @@ class ConnectionBackend(ConnectionBase):
     def game(self) -> GameDescription:
         game_enum = self.patches.game
         if game_enum not in self._games:
-            self._games[game_enum] = data_reader.decode_data(default_data.read_json_then_binary(game_enum)[1])
+            self._games[game_enum] = default_database.game_description_for(game_enum)
         return self._games[game_enum]
 
     async def _identify_game(self) -> bool:
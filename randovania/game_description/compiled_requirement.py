@@ -0,0 +1,198 @@
+"""Flattened evaluators for Requirement trees, operating directly on ResourceCollection quantities."""
+from math import ceil
+from typing import FrozenSet, List, Optional, Tuple
+
+from randovania.game_description.requirements import Requirement, RequirementAnd, RequirementOr, \
+    ResourceRequirement, RequirementTemplate, MAX_DAMAGE
+from randovania.game_description.resources.resource_collection import ResourceCollection, resource_index_for
+from randovania.game_description.resources.resource_type import ResourceType
+
+# Requirements that expand into more alternatives than this are evaluated using the original tree.
+MAX_ALTERNATIVES = 64
+
+# (resource index, amount, negate)
+_Check = Tuple[int, int, bool]
+# (amount, ((reduction item index, multiplier), ...))
+_Damage = Tuple[float, Tuple[Tuple[int, float], ...]]
+# Each alternative is a list of ResourceRequirement, all of which must be satisfied
+_Alternatives = List[Tuple[ResourceRequirement, ...]]
+
+
+class _TooManyAlternatives(Exception):
+    pass
+
+
+def _expand(requirement: Requirement) -> _Alternatives:
+    if isinstance(requirement, ResourceRequirement):
+        return [(requirement,)]
+
+    if isinstance(requirement, RequirementTemplate):
+        return _expand(requirement.template_requirement)
+
+    if isinstance(requirement, RequirementOr):
+        result = []
+        for item in requirement.items:
+            result.extend(_expand(item))
+            if len(result) > MAX_ALTERNATIVES:
+                raise _TooManyAlternatives()
+        return result
+
+    if isinstance(requirement, RequirementAnd):
+        result = [()]
+        for item in requirement.items:
+            item_alternatives = _expand(item)
+            if len(result) * len(item_alternatives) > MAX_ALTERNATIVES:
+                raise _TooManyAlternatives()
+            result = [
+                alternative + item_alternative
+                for alternative in result
+                for item_alternative in item_alternatives
+            ]
+        return result
+
+    raise _TooManyAlternatives()
+
+
+def _compile_alternative(alternative: Tuple[ResourceRequirement, ...]) -> Tuple[Tuple[_Check, ...],
+                                                                                 Tuple[_Damage, ...]]:
+    checks = []
+    damages = []
+    for individual in alternative:
+        if individual.resource.resource_type == ResourceType.DAMAGE:
+            damages.append((individual.amount, tuple(
+                (resource_index_for(reduction.inventory_item), reduction.damage_multiplier)
+                for reduction in individual.resource.reductions
+            )))
+        else:
+            checks.append((resource_index_for(individual.resource), individual.amount, individual.negate))
+    return tuple(checks), tuple(damages)
+
+
+def _damage_for(damage: _Damage, quantities: List[Optional[int]], size: int) -> int:
+    amount, reductions = damage
+    multiplier = 1
+    for index, damage_multiplier in reductions:
+        if index < size and (quantities[index] or 0) > 0:
+            multiplier *= damage_multiplier
+    return ceil(multiplier * amount)
+
+
+def _checks_pass(checks: Tuple[_Check, ...], quantities: List[Optional[int]], size: int) -> bool:
+    for index, amount, negate in checks:
+        value = quantities[index] if index < size else None
+        if ((value or 0) >= amount) == negate:
+            return False
+    return True
+
+
+class CompiledRequirement:
+    """
+    A Requirement flattened into a list of alternatives, each made of resource checks and damage terms.
+    Evaluating it gives the same results as the original Requirement.
+    """
+    requirement: Requirement
+    _unsatisfied_damage: int
+    _resource_indices: Optional[FrozenSet[int]]
+    _has_damage: Optional[bool]
+    _alternatives: Optional[Tuple[Tuple[Tuple[_Check, ...], Tuple[_Damage, ...]], ...]]
+
+    def __init__(self, requirement: Requirement):
+        self.requirement = requirement
+        self._resource_indices = None
+        self._has_damage = None
+
+        # A lone ResourceRequirement has no damage, even when not satisfied
+        while isinstance(requirement, RequirementTemplate):
+            requirement = requirement.template_requirement
+        if isinstance(requirement, ResourceRequirement) and not requirement.is_damage:
+            self._unsatisfied_damage = 0
+        else:
+            self._unsatisfied_damage = MAX_DAMAGE
+
+        try:
+            self._alternatives = tuple(_compile_alternative(alternative)
+                                       for alternative in _expand(requirement))
+        except _TooManyAlternatives:
+            self._alternatives = None
+
+    def __reduce__(self):
+        # Resource indices are only valid inside this process, so it's compiled again
+        return compile_requirement, (self.requirement,)
+
+    @property
+    def is_flattened(self) -> bool:
+        return self._alternatives is not None
+
+    @property
+    def resource_indices(self) -> FrozenSet[int]:
+        """
+        The indices of all resources that can change the result of this requirement, including damage reductions.
+        """
+        if self._resource_indices is None:
+            indices = set()
+            for individual in self.requirement.iterate_resource_requirements():
+                indices.add(resource_index_for(individual.resource))
+                if individual.resource.resource_type == ResourceType.DAMAGE:
+                    indices.update(resource_index_for(reduction.inventory_item)
+                                   for reduction in individual.resource.reductions)
+            self._resource_indices = frozenset(indices)
+        return self._resource_indices
+
+    @property
+    def has_damage(self) -> bool:
+        """If the result of this requirement can depend on the current energy."""
+        if self._has_damage is None:
+            self._has_damage = any(individual.is_damage
+                                   for individual in self.requirement.iterate_resource_requirements())
+        return self._has_damage
+
+    def satisfied(self, current_resources, current_energy: int) -> bool:
+        if self._alternatives is None or not isinstance(current_resources, ResourceCollection):
+            return self.requirement.satisfied(current_resources, current_energy)
+
+        quantities = current_resources.quantities
+        size = len(quantities)
+        for checks, damages in self._alternatives:
+            if not _checks_pass(checks, quantities, size):
+                continue
+            for damage in damages:
+                if current_energy <= _damage_for(damage, quantities, size):
+                    break
+            else:
+                return True
+        return False
+
+    def damage(self, current_resources) -> int:
+        if self._alternatives is None or not isinstance(current_resources, ResourceCollection):
+            return self.requirement.damage(current_resources)
+
+        quantities = current_resources.quantities
+        size = len(quantities)
+        result = None
+        for checks, damages in self._alternatives:
+            if not _checks_pass(checks, quantities, size):
+                continue
+            total = 0
+            for damage in damages:
+                value = _damage_for(damage, quantities, size)
+                if value >= MAX_DAMAGE:
+                    break
+                total += value
+            else:
+                if result is None or total < result:
+                    result = total
+
+        return self._unsatisfied_damage if result is None else result
+
+
+def compile_requirement(requirement: Requirement) -> CompiledRequirement:
+    """
+    Gets the CompiledRequirement for the given requirement, compiling it the first time it's needed.
+    :param requirement:
+    :return:
+    """
+    compiled = getattr(requirement, "_compiled_requirement", None)
+    if compiled is None:
+        compiled = CompiledRequirement(requirement)
+        object.__setattr__(requirement, "_compiled_requirement", compiled)
+    return compiled
@@ -8,7 +8,7 @@ from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import GenericNode, DockNode, TeleporterNode, PickupNode, EventNode, Node, \
     TranslatorGateNode, LogbookNode, LoreType, NodeLocation, PlayerShipNode
 from randovania.game_description.requirements import ResourceRequirement, Requirement, \
-    RequirementOr, RequirementAnd, RequirementTemplate
+    RequirementOr, RequirementAnd, RequirementTemplate, intern_requirement
 from randovania.game_description.resources.damage_resource_info import DamageReduction, DamageResourceInfo
 from randovania.game_description.resources.item_resource_info import ItemResourceInfo
 from randovania.game_description.resources.pickup_index import PickupIndex
@@ -77,31 +77,31 @@ def read_damage_resource_info_array(data: List[Dict], items: List[ItemResourceIn
 def read_resource_requirement(data: Dict, resource_database: ResourceDatabase
                               ) -> ResourceRequirement:
     data = data["data"]
-    return ResourceRequirement.with_data(
+    return intern_requirement(ResourceRequirement.with_data(
         resource_database,
         ResourceType(data["type"]), data["index"],
-        data["amount"], data["negate"])
+        data["amount"], data["negate"]))
 
 
 def read_requirement_and(data: Dict,
                          resource_database: ResourceDatabase,
                          ) -> RequirementAnd:
-    return RequirementAnd([
+    return intern_requirement(RequirementAnd([
         read_requirement(item, resource_database)
         for item in data["data"]
-    ])
+    ]))
 
 
 def read_requirement_or(data: Dict,
                         resource_database: ResourceDatabase) -> RequirementOr:
-    return RequirementOr([
+    return intern_requirement(RequirementOr([
         read_requirement(item, resource_database)
         for item in data["data"]
-    ])
+    ]))
 
 
 def read_requirement_template(data: Dict, resource_database: ResourceDatabase) -> RequirementTemplate:
-    return RequirementTemplate(resource_database, data["data"])
+    return intern_requirement(RequirementTemplate(resource_database, data["data"]))
 
 
 def read_requirement(data: Dict, resource_database: ResourceDatabase) -> Requirement:
@@ -21,7 +21,14 @@ def resource_database_for(game: RandovaniaGame) -> ResourceDatabase:
     return read_resource_database(default_data.read_json_then_binary(game)[1]["resource_database"])
 
 
+@functools.lru_cache()
 def game_description_for(game: RandovaniaGame) -> GameDescription:
+    """
+    The decoded database of the given game, shared by the whole process.
+    It must not be modified: use `copy.deepcopy` to get a copy that can be.
+    :param game:
+    :return:
+    """
     return data_reader.decode_data(default_data.read_json_then_binary(game)[1])
 
 
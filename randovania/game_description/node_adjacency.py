@@ -0,0 +1,58 @@
+from array import array
+from typing import Iterable, Iterator, List, Tuple
+
+from randovania.game_description.compiled_requirement import CompiledRequirement, compile_requirement
+from randovania.game_description.node import Node
+from randovania.game_description.requirements import Requirement
+
+
+class NodeAdjacency:
+    """
+    The potential connections of every node for a GamePatches, in a compressed sparse row layout.
+    The connections of the node with index `i` are in positions `offsets[i]` to `offsets[i + 1]` of the parallel
+    `targets`, `target_nodes`, `requirements` and `compiled_requirements`.
+    """
+    offsets: array
+    targets: array
+    target_nodes: Tuple[Node, ...]
+    requirements: Tuple[Requirement, ...]
+    compiled_requirements: Tuple[CompiledRequirement, ...]
+
+    def __init__(self, connections: Iterable[Tuple[Node, Iterable[Tuple[Node, Requirement]]]]):
+        """
+        :param connections: Each node with its connections, in the order they're checked.
+        """
+        by_index: List[List[Tuple[Node, Requirement]]] = []
+        for node, node_connections in connections:
+            while len(by_index) <= node.index:
+                by_index.append([])
+            by_index[node.index] = [(target, requirement) for target, requirement in node_connections
+                                    if target is not None]
+
+        self.offsets = array("l", [0])
+        target_nodes = []
+        requirements = []
+        for node_connections in by_index:
+            for target, requirement in node_connections:
+                target_nodes.append(target)
+                requirements.append(requirement)
+            self.offsets.append(len(target_nodes))
+
+        self.targets = array("l", [target.index for target in target_nodes])
+        self.target_nodes = tuple(target_nodes)
+        self.requirements = tuple(requirements)
+        self.compiled_requirements = tuple(compile_requirement(requirement) for requirement in requirements)
+
+    def connections_from(self, node: Node) -> Iterator[Tuple[Node, Requirement, CompiledRequirement]]:
+        """
+        The nodes that can be reached from the given node, with the requirements for doing so.
+        Same as `WorldList.potential_nodes_from`, except connections to nothing are skipped.
+        :param node:
+        :return:
+        """
+        index = node.index
+        if index + 1 >= len(self.offsets):
+            return iter(())
+        start = self.offsets[index]
+        end = self.offsets[index + 1]
+        return zip(self.target_nodes[start:end], self.requirements[start:end], self.compiled_requirements[start:end])
@@ -1,6 +1,7 @@
-from typing import Dict, Optional
-
-import networkx
+import collections
+import weakref
+from array import array
+from typing import Dict, Optional, List, Tuple
 
 from randovania.game_description.area import Area
 from randovania.game_description.game_patches import GamePatches
@@ -10,6 +11,137 @@ from randovania.game_description.resources.resource_info import ResourceInfo
 from randovania.game_description.world_list import WorldList
 
 
+# Marks distances in AreaDistances not calculated yet, or of unreachable areas.
+_NO_DISTANCE = 0xFFFF
+
+
+class AreaDistances:
+    """
+    The shortest distance, in number of rooms, from each area of a WorldList to all others, given the dock and
+    elevator connections of a GamePatches.
+    Stored as a matrix of area indices. Each row is calculated the first time a distance from that area is needed.
+    """
+    areas: Tuple[Area, ...]
+    _area_indices: Dict[Area, int]
+    _adjacency: List[Tuple[int, ...]]
+    _matrix: array
+    _calculated_rows: bytearray
+
+    def __init__(self, world_list: WorldList, patches: Optional[GamePatches], ignore_elevators: bool):
+        dock_connections = patches.dock_connection if patches is not None else {}
+        elevator_connections = patches.elevator_connection if patches is not None else {}
+
+        self.areas = tuple(world_list.all_areas)
+        self._area_indices = {area: i for i, area in enumerate(self.areas)}
+
+        self._adjacency = []
+        for world in world_list.worlds:
+            for area in world.areas:
+                new_areas = set()
+                for node in area.nodes:
+                    if isinstance(node, DockNode):
+                        connection = dock_connections.get((area.area_asset_id, node.dock_index),
+                                                          node.default_connection)
+                        new_areas.add(world.area_by_asset_id(connection.area_asset_id))
+                    elif isinstance(node, TeleporterNode) and not ignore_elevators:
+                        connection = elevator_connections.get(node.teleporter_instance_id, node.default_connection)
+                        new_areas.add(world_list.area_by_area_location(connection))
+
+                self._adjacency.append(tuple(sorted(self._area_indices[next_area] for next_area in new_areas)))
+
+        self._matrix = array("H", [_NO_DISTANCE]) * (len(self.areas) * len(self.areas))
+        self._calculated_rows = bytearray(len(self.areas))
+
+    def _row_for(self, source: int) -> int:
+        """
+        Runs a breadth-first search from the given area index, if not done before.
+        :param source:
+        :return: The offset of the row in the matrix.
+        """
+        offset = source * len(self.areas)
+        if not self._calculated_rows[source]:
+            matrix = self._matrix
+            adjacency = self._adjacency
+            matrix[offset + source] = 0
+            queue = collections.deque([source])
+            while queue:
+                current = queue.popleft()
+                next_distance = matrix[offset + current] + 1
+                for target in adjacency[current]:
+                    if matrix[offset + target] == _NO_DISTANCE:
+                        matrix[offset + target] = next_distance
+                        queue.append(target)
+            self._calculated_rows[source] = 1
+        return offset
+
+    def distance(self, source: Area, target: Area) -> Optional[int]:
+        """
+        The shortest distance from source to target.
+        :param source:
+        :param target:
+        :return: None, if target can't be reached from source.
+        """
+        value = self._matrix[self._row_for(self._area_indices[source]) + self._area_indices[target]]
+        return value if value != _NO_DISTANCE else None
+
+    def distances_from(self, source: Area, cutoff: Optional[int] = None) -> Dict[Area, int]:
+        """
+        The shortest distance from source to all reachable areas.
+        :param source:
+        :param cutoff: Exclude areas with a length longer that cutoff.
+        :return:
+        """
+        offset = self._row_for(self._area_indices[source])
+        limit = _NO_DISTANCE if cutoff is None else min(cutoff + 1, _NO_DISTANCE)
+        matrix = self._matrix
+        return {
+            area: matrix[offset + i]
+            for i, area in enumerate(self.areas)
+            if matrix[offset + i] < limit
+        }
+
+
+# How many different connections are kept for each world list. The process-wide world lists of
+# default_database are used with the patches of every seed, so it can't grow without bound.
+_AREA_DISTANCES_PER_WORLD_LIST = 8
+_area_distances_cache: "weakref.WeakKeyDictionary[WorldList, Tuple[tuple, collections.OrderedDict]]" = \
+    weakref.WeakKeyDictionary()
+
+
+def area_distances_for(world_list: WorldList,
+                       patches: Optional[GamePatches] = None,
+                       ignore_elevators: bool = True,
+                       ) -> AreaDistances:
+    """
+    Gets the AreaDistances of the given world list and connections, shared by calls with equal connections.
+    Only the most recently used connections of each world list are kept.
+    :param world_list:
+    :param patches:
+    :param ignore_elevators:
+    :return:
+    """
+    nodes, by_connections = _area_distances_cache.get(world_list, (None, None))
+    if nodes is not world_list.all_nodes:
+        # The world list was changed since
+        by_connections = collections.OrderedDict()
+        _area_distances_cache[world_list] = (world_list.all_nodes, by_connections)
+
+    key = (
+        ignore_elevators,
+        frozenset(patches.dock_connection.items()) if patches is not None else frozenset(),
+        frozenset(patches.elevator_connection.items()) if patches is not None and not ignore_elevators
+        else frozenset(),
+    )
+    result = by_connections.get(key)
+    if result is None:
+        result = by_connections[key] = AreaDistances(world_list, patches, ignore_elevators)
+        if len(by_connections) > _AREA_DISTANCES_PER_WORLD_LIST:
+            by_connections.popitem(last=False)
+    else:
+        by_connections.move_to_end(key)
+    return result
+
+
 def distances_to_node(world_list: WorldList, starting_node: Node,
                       *,
                       ignore_elevators: bool = True,
@@ -25,40 +157,13 @@ def distances_to_node(world_list: WorldList, starting_node: Node,
     :param patches:
     :return: Dict keyed by area to shortest distance to starting_node.
     """
-    g = networkx.DiGraph()
-
-    dock_connections = patches.dock_connection if patches is not None else {}
-    elevator_connections = patches.elevator_connection if patches is not None else {}
-
-    for area in world_list.all_areas:
-        g.add_node(area)
-
-    for world in world_list.worlds:
-        for area in world.areas:
-            new_areas = set()
-            for node in area.nodes:
-                if isinstance(node, DockNode):
-                    connection = dock_connections.get((area.area_asset_id, node.dock_index), node.default_connection)
-                    new_areas.add(world.area_by_asset_id(connection.area_asset_id))
-                elif isinstance(node, TeleporterNode) and not ignore_elevators:
-                    connection = elevator_connections.get(node.teleporter_instance_id, node.default_connection)
-                    new_areas.add(world_list.area_by_area_location(connection))
-
-            for next_area in new_areas:
-                g.add_edge(area, next_area)
-
-    return networkx.single_source_shortest_path_length(g, world_list.nodes_to_area(starting_node), cutoff)
+    distances = area_distances_for(world_list, patches, ignore_elevators)
+    return distances.distances_from(world_list.nodes_to_area(starting_node), cutoff)
 
 
 def pickup_index_to_node(world_list: WorldList, index: PickupIndex) -> PickupNode:
-    for node in world_list.all_nodes:
-        if isinstance(node, PickupNode) and node.pickup_index == index:
-            return node
-    raise ValueError(f"PickupNode with {index} not found.")
+    return world_list.node_from_pickup_index(index)
 
 
 def node_with_resource(world_list: WorldList, resource: ResourceInfo) -> ResourceNode:
-    for node in world_list.all_nodes:
-        if isinstance(node, ResourceNode) and node.resource() == resource:
-            return node
-    raise ValueError(f"ResourceNode with {resource} not found.")
+    return world_list.node_with_resource(resource)
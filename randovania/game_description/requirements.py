@@ -1,7 +1,10 @@
 import dataclasses
+import threading
+import weakref
+from collections import defaultdict
 from functools import lru_cache
 from math import ceil
-from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple, List, Type, Union
+from typing import NamedTuple, Optional, Iterable, FrozenSet, Iterator, Tuple, List, Type, Union, TypeVar, Dict
 
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources
@@ -47,13 +50,13 @@ class Requirement:
     @lru_cache()
     def trivial(cls) -> "Requirement":
         # empty RequirementAnd.satisfied is True
-        return RequirementAnd([])
+        return intern_requirement(RequirementAnd([]))
 
     @classmethod
     @lru_cache()
     def impossible(cls) -> "Requirement":
         # empty RequirementOr.satisfied is False
-        return RequirementOr([])
+        return intern_requirement(RequirementOr([]))
 
     def __lt__(self, other: "Requirement"):
         return str(self) < str(other)
@@ -61,10 +64,59 @@ class Requirement:
     def iterate_resource_requirements(self):
         raise NotImplementedError()
 
+    @property
+    def _intern_key(self) -> tuple:
+        """A key that is equal for all structurally equal requirements, used by `intern_requirement`."""
+        raise NotImplementedError()
+
+    def __getstate__(self):
+        # The compiled form caches indices that are only valid in this process and hashes aren't stable across
+        # processes, so the caches are never copied.
+        return {
+            key: value
+            for key, value in self.__dict__.items()
+            if not key.startswith("_cached") and key != "_compiled_requirement"
+        }
+
+    def __deepcopy__(self, memodict):
+        # Requirements are immutable, so copies can share them
+        return self
+
+
+R = TypeVar("R", bound=Requirement)
+
+# Structurally equal requirements share a single instance, as long as any of them is still in use
+_interned_requirements: "weakref.WeakValueDictionary[tuple, Requirement]" = weakref.WeakValueDictionary()
+
+
+def intern_requirement(requirement: R) -> R:
+    """
+    Gets the shared instance of requirements equal to the given one, making the given one the shared instance if
+    there's none yet.
+    Items of RequirementAnd and RequirementOr aren't interned by this function, so they should be interned first.
+    :param requirement:
+    :return:
+    """
+    return _interned_requirements.setdefault(requirement._intern_key, requirement)
+
+
+def _patch_key(requirement: Requirement, static_resources: CurrentResources, damage_multiplier: float) -> tuple:
+    """
+    The parts of the arguments to patch_requirements that can change the result for the given requirement.
+    """
+    if requirement._cached_resources is None:
+        requirement._cached_resources = tuple({individual.resource: None
+                                               for individual in requirement.iterate_resource_requirements()})
+    return (damage_multiplier, *(static_resources.get(resource) for resource in requirement._cached_resources))
+
 
 class RequirementAnd(Requirement):
     items: Tuple[Requirement, ...]
     _cached_hash = None
+    _cached_simplify = None
+    _cached_as_set = None
+    _cached_patches: Optional[Dict[tuple, Requirement]] = None
+    _cached_resources: Optional[Tuple[ResourceInfo, ...]] = None
 
     def __init__(self, items: Iterable[Requirement]):
         self.items = tuple(items)
@@ -86,11 +138,24 @@ class RequirementAnd(Requirement):
 
     def patch_requirements(self, static_resources: CurrentResources, damage_multiplier: float,
                            ) -> Requirement:
-        return RequirementAnd(
+        key = _patch_key(self, static_resources, damage_multiplier)
+        if self._cached_patches is None:
+            self._cached_patches = {}
+        elif key in self._cached_patches:
+            return self._cached_patches[key]
+
+        result = intern_requirement(RequirementAnd(
             item.patch_requirements(static_resources, damage_multiplier) for item in self.items
-        )
+        ))
+        self._cached_patches[key] = result
+        return result
 
     def simplify(self) -> Requirement:
+        if self._cached_simplify is None:
+            self._cached_simplify = intern_requirement(self._simplify())
+        return self._cached_simplify
+
+    def _simplify(self) -> Requirement:
         new_items = _expand_items(self.items, RequirementAnd, Requirement.trivial())
         if Requirement.impossible() in new_items:
             return Requirement.impossible()
@@ -102,17 +167,19 @@ class RequirementAnd(Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        result = RequirementSet.trivial()
-        for item in self.items:
-            result = result.union(item.as_set)
-        return result
+        if self._cached_as_set is None:
+            result = RequirementSet.trivial()
+            for item in self.items:
+                result = result.union(item.as_set)
+            self._cached_as_set = result
+        return self._cached_as_set
 
     @property
     def sorted(self) -> Tuple[Requirement]:
         return tuple(sorted(self.items))
 
     def __eq__(self, other):
-        return isinstance(other, RequirementAnd) and self.items == other.items
+        return self is other or (isinstance(other, RequirementAnd) and self.items == other.items)
 
     def __hash__(self) -> int:
         if self._cached_hash is None:
@@ -133,10 +200,18 @@ class RequirementAnd(Requirement):
         for item in self.items:
             yield from item.iterate_resource_requirements()
 
+    @property
+    def _intern_key(self) -> tuple:
+        return RequirementAnd, self.items
+
 
 class RequirementOr(Requirement):
     items: Tuple[Requirement, ...]
     _cached_hash = None
+    _cached_simplify = None
+    _cached_as_set = None
+    _cached_patches: Optional[Dict[tuple, Requirement]] = None
+    _cached_resources: Optional[Tuple[ResourceInfo, ...]] = None
 
     def __init__(self, items: Iterable[Requirement]):
         self.items = tuple(items)
@@ -159,11 +234,24 @@ class RequirementOr(Requirement):
 
     def patch_requirements(self, static_resources: CurrentResources, damage_multiplier: float,
                            ) -> Requirement:
-        return RequirementOr(
+        key = _patch_key(self, static_resources, damage_multiplier)
+        if self._cached_patches is None:
+            self._cached_patches = {}
+        elif key in self._cached_patches:
+            return self._cached_patches[key]
+
+        result = intern_requirement(RequirementOr(
             item.patch_requirements(static_resources, damage_multiplier) for item in self.items
-        )
+        ))
+        self._cached_patches[key] = result
+        return result
 
     def simplify(self) -> Requirement:
+        if self._cached_simplify is None:
+            self._cached_simplify = intern_requirement(self._simplify())
+        return self._cached_simplify
+
+    def _simplify(self) -> Requirement:
         new_items = _expand_items(self.items, RequirementOr, Requirement.impossible())
         if Requirement.trivial() in new_items:
             return Requirement.trivial()
@@ -211,17 +299,19 @@ class RequirementOr(Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        alternatives = set()
-        for item in self.items:
-            alternatives |= item.as_set.alternatives
-        return RequirementSet(alternatives)
+        if self._cached_as_set is None:
+            alternatives = set()
+            for item in self.items:
+                alternatives |= item.as_set.alternatives
+            self._cached_as_set = RequirementSet(alternatives)
+        return self._cached_as_set
 
     @property
     def sorted(self) -> Tuple[Requirement]:
         return tuple(sorted(self.items))
 
     def __eq__(self, other):
-        return isinstance(other, RequirementOr) and self.items == other.items
+        return self is other or (isinstance(other, RequirementOr) and self.items == other.items)
 
     def __hash__(self) -> int:
         if self._cached_hash is None:
@@ -242,6 +332,10 @@ class RequirementOr(Requirement):
         for item in self.items:
             yield from item.iterate_resource_requirements()
 
+    @property
+    def _intern_key(self) -> tuple:
+        return RequirementOr, self.items
+
 
 def _expand_items(items: Tuple[Requirement, ...],
                   cls: Type[Union[RequirementAnd, RequirementOr]],
@@ -267,6 +361,10 @@ class ResourceRequirement(Requirement):
     resource: ResourceInfo
     amount: int
     negate: bool
+    _cached_hash = None
+    _cached_as_set = None
+    _cached_bit = None
+    _cached_interned = None
 
     @classmethod
     def with_data(cls,
@@ -307,6 +405,15 @@ class ResourceRequirement(Requirement):
     def simplify(self) -> Requirement:
         return self
 
+    def __eq__(self, other):
+        return self is other or (other.__class__ is ResourceRequirement and self.resource == other.resource
+                                 and self.amount == other.amount and self.negate == other.negate)
+
+    def __hash__(self) -> int:
+        if self._cached_hash is None:
+            object.__setattr__(self, "_cached_hash", hash((self.resource, self.amount, self.negate)))
+        return self._cached_hash
+
     def __repr__(self):
         return "{} {} {}".format(
             self.resource,
@@ -330,11 +437,11 @@ class ResourceRequirement(Requirement):
         return self._as_comparison_tuple < other._as_comparison_tuple
 
     def multiply_amount(self, multiplier: float) -> "ResourceRequirement":
-        return ResourceRequirement(
+        return intern_requirement(ResourceRequirement(
             self.resource,
             self.amount * multiplier,
             self.negate,
-        )
+        ))
 
     def patch_requirements(self, static_resources: CurrentResources, damage_multiplier: float,
                            ) -> Requirement:
@@ -351,15 +458,21 @@ class ResourceRequirement(Requirement):
 
     @property
     def as_set(self) -> "RequirementSet":
-        return RequirementSet([
-            RequirementList([
-                self
-            ])
-        ])
+        if self._cached_as_set is None:
+            object.__setattr__(self, "_cached_as_set", RequirementSet([
+                RequirementList([
+                    self
+                ])
+            ]))
+        return self._cached_as_set
 
     def iterate_resource_requirements(self):
         yield self
 
+    @property
+    def _intern_key(self) -> tuple:
+        return ResourceRequirement, self.resource, self.amount, self.negate
+
 
 class RequirementTemplate(Requirement):
     database: ResourceDatabase
@@ -391,7 +504,7 @@ class RequirementTemplate(Requirement):
         return self.template_requirement.as_set
 
     def __eq__(self, other):
-        return isinstance(other, RequirementTemplate) and self.template_name == other.template_name
+        return self is other or (isinstance(other, RequirementTemplate) and self.template_name == other.template_name)
 
     def __hash__(self) -> int:
         return hash(self.template_name)
@@ -402,23 +515,117 @@ class RequirementTemplate(Requirement):
     def iterate_resource_requirements(self):
         yield from self.template_requirement.iterate_resource_requirements()
 
+    @property
+    def _intern_key(self) -> tuple:
+        # Templates are only equivalent when they use the same database
+        return RequirementTemplate, id(self.database), self.template_name
+
+
+# Each distinct ResourceRequirement in use gets a bit, so a RequirementList can be represented by an int with the bits
+# of all its items set. Bits are only valid inside this process.
+# The bit is stored on the interned instance, which every requirement using that bit keeps alive, so it can be reused
+# once that instance is collected.
+_requirement_bits_lock = threading.Lock()
+_next_requirement_bit = 0
+_free_requirement_bits: List[int] = []
+
+
+def _release_bit(bit: int):
+    # Called by the garbage collector, possibly while the lock is held. Appending is atomic, so no lock is needed.
+    _free_requirement_bits.append(bit)
+
+
+def _bit_for(requirement: ResourceRequirement) -> int:
+    global _next_requirement_bit
+
+    bit = requirement._cached_bit
+    if bit is None:
+        with _requirement_bits_lock:
+            interned = intern_requirement(requirement)
+            bit = interned._cached_bit
+            if bit is None:
+                if _free_requirement_bits:
+                    bit = _free_requirement_bits.pop()
+                else:
+                    bit = 1 << _next_requirement_bit
+                    _next_requirement_bit += 1
+                object.__setattr__(interned, "_cached_bit", bit)
+                weakref.finalize(interned, _release_bit, bit)
+
+            if interned is not requirement:
+                object.__setattr__(requirement, "_cached_interned", interned)
+                object.__setattr__(requirement, "_cached_bit", bit)
+    return bit
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _minimal_masks(masks: Iterable[int]) -> List[int]:
+    """
+    Removes all masks that are a superset of another mask.
+    Masks are processed from fewest bits to most, so every possible subset of a mask was already decided on. Kept masks
+    are indexed by their lowest bit, which must be one of the bits of any mask they're a subset of.
+    :param masks: Distinct masks
+    :return:
+    """
+    masks = sorted(masks, key=_popcount)
+    if masks and masks[0] == 0:
+        # The empty list is a subset of everything
+        return [0]
+
+    kept_by_lowest_bit: Dict[int, List[int]] = defaultdict(list)
+    result = []
+
+    for mask in masks:
+        remaining = mask
+        redundant = False
+        while remaining and not redundant:
+            lowest_bit = remaining & -remaining
+            remaining ^= lowest_bit
+            for kept in kept_by_lowest_bit.get(lowest_bit, ()):
+                if kept & ~mask == 0:
+                    redundant = True
+                    break
+
+        if not redundant:
+            kept_by_lowest_bit[mask & -mask].append(mask)
+            result.append(mask)
+
+    return result
+
 
 class RequirementList:
     items: FrozenSet[ResourceRequirement]
     _cached_hash: Optional[int] = None
+    _cached_mask: Optional[int] = None
 
     def __deepcopy__(self, memodict):
         return self
 
+    def __getstate__(self):
+        return {"items": self.items}
+
     def __init__(self, items: Iterable[ResourceRequirement]):
         self.items = frozenset(items)
 
+    @property
+    def mask(self) -> int:
+        """An int with the bit of each item set. Lists have the same mask only if they have the same items."""
+        if self._cached_mask is None:
+            mask = 0
+            for item in self.items:
+                mask |= _bit_for(item)
+            self._cached_mask = mask
+        return self._cached_mask
+
     def __eq__(self, other):
-        return isinstance(
-            other, RequirementList) and self.items == other.items
+        return self is other or (isinstance(other, RequirementList) and self.items == other.items)
 
     def __lt__(self, other: "RequirementList"):
-        return self.items < other.items
+        mask, other_mask = self.mask, other.mask
+        return mask != other_mask and mask & ~other_mask == 0
 
     def __hash__(self) -> int:
         if self._cached_hash is None:
@@ -494,12 +701,11 @@ class RequirementSet:
         Redundant alternatives (Bombs or Bombs + Space Jump) are automatically removed.
         :param alternatives:
         """
-        input_set = frozenset(alternatives)
-        self.alternatives = frozenset(
-            requirement
-            for requirement in input_set
-            if not any(other < requirement for other in input_set)
-        )
+        by_mask = {
+            alternative.mask: alternative
+            for alternative in alternatives
+        }
+        self.alternatives = frozenset(by_mask[mask] for mask in _minimal_masks(by_mask.keys()))
 
     def __deepcopy__(self, memodict):
         return self
@@ -554,12 +760,33 @@ class RequirementSet:
             requirement_list.satisfied(current_resources, current_energy)
             for requirement_list in self.alternatives)
 
+    @property
+    def _is_trivial(self) -> bool:
+        return len(self.alternatives) == 1 and next(iter(self.alternatives)).mask == 0
+
     def union(self, other: "RequirementSet") -> "RequirementSet":
         """Create a new RequirementSet that is only satisfied when both are satisfied"""
-        return RequirementSet(
-            a.union(b)
-            for a in self.alternatives
-            for b in other.alternatives)
+        if other._is_trivial:
+            return self
+        if self._is_trivial:
+            return other
+
+        # Only build the lists that aren't redundant
+        pairs_by_mask = {}
+        for a in self.alternatives:
+            for b in other.alternatives:
+                pairs_by_mask.setdefault(a.mask | b.mask, (a, b))
+
+        alternatives = []
+        for mask in _minimal_masks(pairs_by_mask.keys()):
+            a, b = pairs_by_mask[mask]
+            alternative = a.union(b)
+            alternative._cached_mask = mask
+            alternatives.append(alternative)
+
+        result = RequirementSet.__new__(RequirementSet)
+        result.alternatives = frozenset(alternatives)
+        return result
 
     def expand_alternatives(self, other: "RequirementSet") -> "RequirementSet":
         """Create a new RequirementSet that is satisfied when either are satisfied."""
@@ -0,0 +1,173 @@
+import threading
+from typing import Dict, Hashable, Iterator, List, Optional, Tuple
+
+# Dense indices are shared by every ResourceCollection in the process. Resources from a ResourceDatabase, as well as
+# PickupIndex, TranslatorGate and LogbookAsset, receive their index the first time they're used.
+_resource_to_index: Dict[Hashable, int] = {}
+_index_to_resource: List[Hashable] = []
+_index_lock = threading.Lock()
+
+
+def resource_index_for(resource: Hashable) -> int:
+    """
+    Gets the dense index assigned to the given resource, assigning a new one if needed.
+    :param resource:
+    :return:
+    """
+    index = _resource_to_index.get(resource)
+    if index is None:
+        with _index_lock:
+            index = _resource_to_index.get(resource)
+            if index is None:
+                index = len(_index_to_resource)
+                _index_to_resource.append(resource)
+                _resource_to_index[resource] = index
+    return index
+
+
+def resource_for_index(index: int) -> Hashable:
+    return _index_to_resource[index]
+
+
+class ResourceCollection:
+    """
+    Quantities of resources, stored in a list indexed by each resource's dense index.
+    Copies share the list until one of them is modified.
+    A resource present with quantity 0 is distinct from an absent resource, matching the semantics of a dict.
+    """
+    __slots__ = ("_quantities", "_owned")
+
+    _quantities: List[Optional[int]]
+    _owned: bool
+
+    def __init__(self):
+        self._quantities = []
+        self._owned = True
+
+    @classmethod
+    def from_dict(cls, resources) -> "ResourceCollection":
+        if isinstance(resources, ResourceCollection):
+            return resources.copy()
+
+        result = cls()
+        for resource, quantity in resources.items():
+            result[resource] = quantity
+        return result
+
+    @property
+    def quantities(self) -> List[Optional[int]]:
+        """
+        The raw list of quantities, indexed by `resource_index_for`. None means the resource is absent.
+        Must not be modified.
+        """
+        return self._quantities
+
+    def copy(self) -> "ResourceCollection":
+        result = ResourceCollection.__new__(ResourceCollection)
+        result._quantities = self._quantities
+        result._owned = False
+        self._owned = False
+        return result
+
+    def _writable_quantities(self, index: int) -> List[Optional[int]]:
+        if not self._owned:
+            self._quantities = list(self._quantities)
+            self._owned = True
+
+        quantities = self._quantities
+        if index >= len(quantities):
+            quantities.extend([None] * (index + 1 - len(quantities)))
+        return quantities
+
+    def get(self, resource, default=None):
+        index = _resource_to_index.get(resource)
+        if index is None or index >= len(self._quantities):
+            return default
+        value = self._quantities[index]
+        return default if value is None else value
+
+    def __getitem__(self, resource) -> int:
+        value = self.get(resource)
+        if value is None:
+            raise KeyError(resource)
+        return value
+
+    def __setitem__(self, resource, quantity: int):
+        index = resource_index_for(resource)
+        self._writable_quantities(index)[index] = quantity
+
+    def __delitem__(self, resource):
+        if resource not in self:
+            raise KeyError(resource)
+        index = _resource_to_index[resource]
+        self._writable_quantities(index)[index] = None
+
+    def pop(self, resource, *default):
+        value = self.get(resource)
+        if value is None:
+            if default:
+                return default[0]
+            raise KeyError(resource)
+        del self[resource]
+        return value
+
+    def __contains__(self, resource) -> bool:
+        return self.get(resource) is not None
+
+    def add_resource_gain(self, resource_gain) -> "ResourceCollection":
+        """
+        Adds all resources from the given gain to this collection
+        :param resource_gain:
+        :return: self
+        """
+        for resource, quantity in resource_gain:
+            index = resource_index_for(resource)
+            quantities = self._writable_quantities(index)
+            current = quantities[index]
+            quantities[index] = quantity if current is None else current + quantity
+        return self
+
+    def items(self) -> Iterator[Tuple[Hashable, int]]:
+        for index, quantity in enumerate(self._quantities):
+            if quantity is not None:
+                yield _index_to_resource[index], quantity
+
+    def keys(self) -> Iterator[Hashable]:
+        for resource, _ in self.items():
+            yield resource
+
+    def values(self) -> Iterator[int]:
+        for quantity in self._quantities:
+            if quantity is not None:
+                yield quantity
+
+    def __iter__(self):
+        return self.keys()
+
+    def __len__(self) -> int:
+        return len(self._quantities) - self._quantities.count(None)
+
+    def as_dict(self) -> dict:
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, ResourceCollection):
+            return self.as_dict() == other.as_dict()
+        if isinstance(other, dict):
+            return self.as_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "ResourceCollection({!r})".format(self.as_dict())
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memodict):
+        return self.copy()
+
+    def __reduce__(self):
+        # Dense indices are only valid inside this process
+        return ResourceCollection.from_dict, (self.as_dict(),)
@@ -1,16 +1,24 @@
+import collections
 import copy
 import re
-from typing import List, Dict, Iterator, Tuple, Iterable
+from typing import List, Dict, Iterator, Tuple, Iterable, Optional
 
 from randovania.game_description.area import Area
 from randovania.game_description.area_location import AreaLocation
+from randovania.game_description.compiled_requirement import compile_requirement
 from randovania.game_description.dock import DockConnection
 from randovania.game_description.game_patches import GamePatches
-from randovania.game_description.node import Node, DockNode, TeleporterNode, PickupNode, PlayerShipNode
+from randovania.game_description.node_adjacency import NodeAdjacency
+from randovania.game_description.node import Node, DockNode, TeleporterNode, PickupNode, PlayerShipNode, ResourceNode
 from randovania.game_description.requirements import Requirement
-from randovania.game_description.resources.resource_info import CurrentResources
+from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_info import CurrentResources, ResourceInfo
 from randovania.game_description.world import World
 
+# How many different dock and elevator patches keep their NodeAdjacency. Patched games are shared by every seed of
+# a preset, so it can't grow without bound.
+_ADJACENCY_CACHE_SIZE = 8
+
 
 class WorldList:
     worlds: List[World]
@@ -19,6 +27,14 @@ class WorldList:
     _nodes_to_world: Dict[Node, World]
     _ids_to_area: Dict[AreaLocation, Area]
     _nodes: Tuple[Node, ...]
+    _area_to_world: Dict[Area, World]
+    _asset_id_to_world: Dict[int, World]
+    _area_asset_id_to_location: Dict[int, AreaLocation]
+    _name_to_node: Dict[Tuple[Optional[str], str, str], Node]
+    _pickup_index_to_node: Dict[PickupIndex, PickupNode]
+    _resource_to_node: Dict[ResourceInfo, ResourceNode]
+    _adjacency_cache: "collections.OrderedDict[tuple, NodeAdjacency]"
+    _last_adjacency: Optional[Tuple[tuple, NodeAdjacency]]
 
     def __deepcopy__(self, memodict):
         return WorldList(
@@ -27,11 +43,38 @@ class WorldList:
 
     def __init__(self, worlds: List[World]):
         self.worlds = worlds
+        self._adjacency_cache = collections.OrderedDict()
         self.refresh_node_cache()
 
     def refresh_node_cache(self):
         self._nodes_to_area, self._nodes_to_world, self._ids_to_area = _calculate_nodes_to_area_world(self.worlds)
         self._nodes = tuple(self._iterate_over_nodes())
+        self._refresh_lookups()
+        self._clear_adjacency_cache()
+
+    def _refresh_lookups(self):
+        # When more than one match, the lookups keep the first one, like searching in order would.
+        self._area_to_world = {}
+        self._asset_id_to_world = {}
+        self._area_asset_id_to_location = {}
+        self._name_to_node = {}
+        for world in self.worlds:
+            self._asset_id_to_world.setdefault(world.world_asset_id, world)
+            for area in world.areas:
+                self._area_to_world.setdefault(area, world)
+                self._area_asset_id_to_location.setdefault(area.area_asset_id,
+                                                           AreaLocation(world.world_asset_id, area.area_asset_id))
+                for node in area.nodes:
+                    for world_name in (world.name, world.dark_name, None):
+                        self._name_to_node.setdefault((world_name, area.name, node.name), node)
+
+        self._pickup_index_to_node = {}
+        self._resource_to_node = {}
+        for node in self._nodes:
+            if isinstance(node, ResourceNode):
+                self._resource_to_node.setdefault(node.resource(), node)
+                if isinstance(node, PickupNode):
+                    self._pickup_index_to_node.setdefault(node.pickup_index, node)
 
     def _iterate_over_nodes(self) -> Iterator[Node]:
         for world in self.worlds:
@@ -44,16 +87,16 @@ class WorldList:
         raise KeyError("Unknown name: {}".format(world_name))
 
     def world_by_asset_id(self, asset_id: int) -> World:
-        for world in self.worlds:
-            if world.world_asset_id == asset_id:
-                return world
-        raise KeyError("Unknown asset_id: {}".format(asset_id))
+        try:
+            return self._asset_id_to_world[asset_id]
+        except KeyError:
+            raise KeyError("Unknown asset_id: {}".format(asset_id)) from None
 
     def world_with_area(self, area: Area) -> World:
-        for world in self.worlds:
-            if area in world.areas:
-                return world
-        raise KeyError("Unknown area: {}".format(area))
+        try:
+            return self._area_to_world[area]
+        except KeyError:
+            raise KeyError("Unknown area: {}".format(area)) from None
 
     @property
     def all_areas(self) -> Iterator[Area]:
@@ -101,20 +144,22 @@ class WorldList:
         if match is None:
             raise ValueError("Invalid name: {}".format(name))
 
-        world_name, area_name, node_name = match.group(1, 2, 3)
-        for world in self.worlds:
-            if world_name is not None and world_name not in (world.name, world.dark_name):
-                continue
+        try:
+            return self._name_to_node[match.group(1, 2, 3)]
+        except KeyError:
+            raise ValueError("Unknown name: {}".format(name)) from None
 
-            for area in world.areas:
-                if area.name != area_name:
-                    continue
+    def node_from_pickup_index(self, index: PickupIndex) -> PickupNode:
+        try:
+            return self._pickup_index_to_node[index]
+        except KeyError:
+            raise ValueError(f"PickupNode with {index} not found.") from None
 
-                for node in area.nodes:
-                    if node.name == node_name:
-                        return node
-
-        raise ValueError("Unknown name: {}".format(name))
+    def node_with_resource(self, resource: ResourceInfo) -> ResourceNode:
+        try:
+            return self._resource_to_node[resource]
+        except KeyError:
+            raise ValueError(f"ResourceNode with {resource} not found.") from None
 
     def nodes_to_world(self, node: Node) -> World:
         return self._nodes_to_world[node]
@@ -198,15 +243,60 @@ class WorldList:
         yield from self.connections_from(node, patches)
         yield from self.area_connections_from(node)
 
+    def adjacency_for(self, patches: GamePatches) -> NodeAdjacency:
+        """
+        Gets the result of `potential_nodes_from` for all nodes, calculated once for each distinct dock and
+        elevator patches. Only the most recently used patches are kept.
+        Changes to the nodes or connections require `refresh_node_cache` or `patch_requirements`.
+        :param patches:
+        :return:
+        """
+        connections = (patches.elevator_connection, patches.dock_connection, patches.dock_weakness)
+
+        # Comparing with a copy of the last connections is much cheaper than creating the key,
+        # and still notices changes made in place
+        if self._last_adjacency is not None:
+            last_connections, adjacency = self._last_adjacency
+            if last_connections == connections:
+                return adjacency
+
+        key = (
+            frozenset(patches.elevator_connection.items()),
+            frozenset(patches.dock_connection.items()),
+            frozenset(patches.dock_weakness.items()),
+        )
+        adjacency = self._adjacency_cache.get(key)
+        if adjacency is None:
+            adjacency = NodeAdjacency(
+                (node, self.potential_nodes_from(node, patches))
+                for world in self.worlds
+                for area in world.areas
+                for node in area.nodes
+            )
+            self._adjacency_cache[key] = adjacency
+            if len(self._adjacency_cache) > _ADJACENCY_CACHE_SIZE:
+                self._adjacency_cache.popitem(last=False)
+        else:
+            self._adjacency_cache.move_to_end(key)
+
+        self._last_adjacency = (tuple(copy.copy(connection) for connection in connections), adjacency)
+        return adjacency
+
+    def _clear_adjacency_cache(self):
+        self._adjacency_cache.clear()
+        self._last_adjacency = None
+
     def patch_requirements(self, static_resources: CurrentResources, damage_multiplier: float) -> None:
         """
         Patches all Node connections, assuming the given resources will never change their quantity.
         This is removes all checking for tricks and difficulties in runtime since these never change.
         All damage requirements are multiplied by the given multiplier.
+        The patched requirements are then compiled, so reach calculations can use `compile_requirement` cheaply.
         :param static_resources:
         :param damage_multiplier:
         :return:
         """
+        self._clear_adjacency_cache()
         for world in self.worlds:
             for area in world.areas:
                 for node in area.nodes:
@@ -215,9 +305,11 @@ class WorldList:
                         object.__setattr__(node.default_dock_weakness, "requirement",
                                            requirement.patch_requirements(static_resources,
                                                                           damage_multiplier).simplify())
+                        compile_requirement(node.default_dock_weakness.requirement)
                 for connections in area.connections.values():
                     for target, value in connections.items():
                         connections[target] = value.patch_requirements(static_resources, damage_multiplier).simplify()
+                        compile_requirement(connections[target])
 
     def area_by_area_location(self, location: AreaLocation) -> Area:
         return self._ids_to_area[location]
@@ -226,11 +318,10 @@ class WorldList:
         return self.world_by_asset_id(location.world_asset_id)
 
     def area_to_area_location(self, area: Area) -> AreaLocation:
-        for world in self.worlds:
-            result = AreaLocation(world.world_asset_id, area.area_asset_id)
-            if result in self._ids_to_area:
-                return result
-        raise RuntimeError(f"Unknown area: {area}")
+        try:
+            return self._area_asset_id_to_location[area.area_asset_id]
+        except KeyError:
+            raise RuntimeError(f"Unknown area: {area}") from None
 
     def node_to_area_location(self, node: Node) -> AreaLocation:
         return AreaLocation(
@@ -239,6 +330,7 @@ class WorldList:
         )
 
     def add_new_node(self, area: Area, node: Node):
+        self._clear_adjacency_cache()
         self._nodes_to_area[node] = area
         self._nodes_to_world[node] = self.world_with_area(area)
 
@@ -5,17 +5,33 @@ from typing import Tuple
 
 from randovania import get_data_path
 from randovania.games.game import RandovaniaGame
+from randovania.games.prime import fast_binary_data
 from randovania.games.prime.binary_data import decode_file_path
 
 
+def _is_converted_from(fast_binary_path: Path, source_path: Path) -> bool:
+    if not source_path.exists():
+        return True
+    try:
+        return fast_binary_data.read_source_hash(fast_binary_path) == fast_binary_data.hash_source(source_path)
+    except ValueError:
+        return False
+
+
 @functools.lru_cache()
 def read_json_then_binary(game: RandovaniaGame) -> Tuple[Path, dict]:
     json_path = get_data_path().joinpath("json_data", f"{game.value}.json")
+    binary_path = get_data_path().joinpath("binary_data", f"{game.value}.bin")
+    fast_binary_path = binary_path.with_suffix(f".{fast_binary_data.FILE_EXTENSION}")
+
+    source_path = json_path if json_path.exists() else binary_path
+    if fast_binary_path.exists() and _is_converted_from(fast_binary_path, source_path):
+        return fast_binary_path, fast_binary_data.decode_file_path(fast_binary_path)
+
     if json_path.exists():
         with json_path.open("r") as open_file:
             return json_path, json.load(open_file)
 
-    binary_path = get_data_path().joinpath("binary_data", f"{game.value}.bin")
     return binary_path, decode_file_path(binary_path)
 
 
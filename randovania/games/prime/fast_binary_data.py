@@ -0,0 +1,378 @@
+"""
+A game database format made for loading quickly. Decoding gives the same data as the JSON files.
+
+The header records a hash of the file the database was converted from, so it's only used while that file is
+unchanged. It's followed by sections, all little-endian:
+- strings: a table of offsets into a blob of utf-8 strings. Every string is stored once and referenced by index.
+- ints and floats: the numbers that don't fit in the value stream. Ints too big even for these are kept as strings.
+- requirements: fixed-width records, with `and`/`or` pointing to a range of the flattened `children`. Identical
+  requirements are stored once.
+- values: the rest of the data, as a stream of uint32 tags and operands.
+
+Decoding reads the memory-mapped file directly and builds all of the data at once, but each string and requirement
+is decoded only once, however many times it's referenced.
+"""
+import hashlib
+import mmap
+import struct
+import sys
+from array import array
+from pathlib import Path
+from typing import BinaryIO, Dict, Any, List, Optional, Tuple
+
+current_format_version = 2
+FILE_EXTENSION = "rdb"
+
+_MAGIC_NUMBER = b"Rdb."
+_SECTIONS = ("string_offsets", "strings", "ints", "floats", "requirements", "children", "values")
+_SOURCE_HASH_SIZE = hashlib.sha256().digest_size
+_HEADER = struct.Struct(f"<4sI{_SOURCE_HASH_SIZE}s" + "II" * len(_SECTIONS))
+
+# kind, resource type, negate, index or first child or string, amount or child count
+_REQUIREMENT = struct.Struct("<BBBxII")
+_REQUIREMENT_KINDS = ("resource", "and", "or", "template")
+_MAX_UINT32 = 0xFFFFFFFF
+
+_TAG_NONE = 0
+_TAG_FALSE = 1
+_TAG_TRUE = 2
+_TAG_SMALL_INT = 3
+_TAG_INT = 4
+_TAG_FLOAT = 5
+_TAG_STRING = 6
+_TAG_LIST = 7
+_TAG_DICT = 8
+_TAG_REQUIREMENT = 9
+_TAG_BIG_INT = 10
+
+
+def _little_endian_array(type_code: str, data: bytes) -> array:
+    result = array(type_code)
+    result.frombytes(data)
+    if sys.byteorder != "little":
+        result.byteswap()
+    return result
+
+
+def _array_bytes(values: array) -> bytes:
+    if sys.byteorder != "little":
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _is_requirement(value: Any) -> bool:
+    if not isinstance(value, dict) or list(value.keys()) != ["type", "data"]:
+        return False
+
+    kind = value["type"]
+    data = value["data"]
+    if kind == "resource":
+        return (isinstance(data, dict) and list(data.keys()) == ["type", "index", "amount", "negate"]
+                and all(type(data[key]) is int and 0 <= data[key] for key in ("type", "index", "amount"))
+                and data["type"] <= 0xFF and data["index"] <= _MAX_UINT32 and data["amount"] <= _MAX_UINT32
+                and type(data["negate"]) is bool)
+
+    elif kind in ("and", "or"):
+        return isinstance(data, list) and all(_is_requirement(item) for item in data)
+
+    elif kind == "template":
+        return isinstance(data, str)
+
+    return False
+
+
+class _Encoder:
+    def __init__(self):
+        self.strings: Dict[str, int] = {}
+        self.ints = array("q")
+        self.floats = array("d")
+        self.requirement_ids: Dict[Any, int] = {}
+        self.requirements = bytearray()
+        self.children = array("I")
+        self.values = array("I")
+
+    def string(self, value: str) -> int:
+        result = self.strings.get(value)
+        if result is None:
+            result = self.strings[value] = len(self.strings)
+        return result
+
+    def requirement(self, value: dict) -> int:
+        kind = value["type"]
+        data = value["data"]
+
+        if kind == "resource":
+            record = (0, data["type"], int(data["negate"]), data["index"], data["amount"])
+
+        elif kind == "template":
+            record = (3, 0, 0, self.string(data), 0)
+
+        else:
+            child_ids = tuple(self.requirement(item) for item in data)
+            key = (kind, child_ids)
+            if key in self.requirement_ids:
+                return self.requirement_ids[key]
+            first_child = len(self.children)
+            self.children.extend(child_ids)
+            record = (_REQUIREMENT_KINDS.index(kind), 0, 0, first_child, len(child_ids))
+            self.requirement_ids[key] = len(self.requirement_ids)
+            self.requirements += _REQUIREMENT.pack(*record)
+            return self.requirement_ids[key]
+
+        result = self.requirement_ids.get(record)
+        if result is None:
+            result = self.requirement_ids[record] = len(self.requirement_ids)
+            self.requirements += _REQUIREMENT.pack(*record)
+        return result
+
+    def value(self, value: Any):
+        values = self.values
+
+        if value is None:
+            values.append(_TAG_NONE)
+
+        elif value is False or value is True:
+            values.append(_TAG_TRUE if value else _TAG_FALSE)
+
+        elif type(value) is int:
+            if 0 <= value <= _MAX_UINT32:
+                values.extend((_TAG_SMALL_INT, value))
+            elif not -2 ** 63 <= value < 2 ** 63:
+                values.extend((_TAG_BIG_INT, self.string(str(value))))
+            else:
+                values.extend((_TAG_INT, len(self.ints)))
+                self.ints.append(value)
+
+        elif type(value) is float:
+            values.extend((_TAG_FLOAT, len(self.floats)))
+            self.floats.append(value)
+
+        elif isinstance(value, str):
+            values.extend((_TAG_STRING, self.string(value)))
+
+        elif isinstance(value, list):
+            values.extend((_TAG_LIST, len(value)))
+            for item in value:
+                self.value(item)
+
+        elif _is_requirement(value):
+            values.extend((_TAG_REQUIREMENT, self.requirement(value)))
+
+        elif isinstance(value, dict):
+            values.extend((_TAG_DICT, len(value)))
+            for key, item in value.items():
+                if not isinstance(key, str):
+                    raise ValueError(f"Unsupported key: {key!r}")
+                values.append(self.string(key))
+                self.value(item)
+
+        else:
+            raise ValueError(f"Unsupported value: {value!r}")
+
+
+def hash_source(source_path: Path) -> bytes:
+    """
+    The hash of a file, as stored in the header of the databases converted from it.
+    :param source_path:
+    :return:
+    """
+    return hashlib.sha256(source_path.read_bytes()).digest()
+
+
+def encode(data: Dict, x: BinaryIO, source_hash: bytes = bytes(_SOURCE_HASH_SIZE)) -> None:
+    """
+    Encodes the given data.
+    :param data:
+    :param x:
+    :param source_hash: The `hash_source` of the file the data was read from.
+    :return:
+    """
+    if len(source_hash) != _SOURCE_HASH_SIZE:
+        raise ValueError(f"Expected a source hash of {_SOURCE_HASH_SIZE} bytes, got {len(source_hash)}")
+
+    encoder = _Encoder()
+    encoder.value(data)
+
+    string_offsets = array("I", [0])
+    strings = bytearray()
+    for string in encoder.strings.keys():
+        strings += string.encode("utf-8")
+        string_offsets.append(len(strings))
+
+    sections = [
+        _array_bytes(string_offsets),
+        bytes(strings),
+        _array_bytes(encoder.ints),
+        _array_bytes(encoder.floats),
+        bytes(encoder.requirements),
+        _array_bytes(encoder.children),
+        _array_bytes(encoder.values),
+    ]
+
+    header = []
+    offset = _HEADER.size
+    for section in sections:
+        # Keep every section aligned for its widest element
+        offset += -offset % 8
+        header.extend((offset, len(section)))
+        offset += len(section)
+
+    x.write(_HEADER.pack(_MAGIC_NUMBER, current_format_version, source_hash, *header))
+    position = _HEADER.size
+    for section_offset, section in zip(header[::2], sections):
+        x.write(b"\x00" * (section_offset - position))
+        x.write(section)
+        position = section_offset + len(section)
+
+
+def _read_header(buffer) -> Tuple[bytes, List[int]]:
+    if len(buffer) < _HEADER.size:
+        raise ValueError("Not a fast binary game database")
+
+    magic_number, format_version, source_hash, *header = _HEADER.unpack_from(buffer)
+    if magic_number != _MAGIC_NUMBER:
+        raise ValueError("Not a fast binary game database")
+    if format_version != current_format_version:
+        raise ValueError(f"Unsupported format version {format_version}, expected {current_format_version}")
+
+    return source_hash, header
+
+
+class _Decoder:
+    def __init__(self, buffer):
+        _, header = _read_header(buffer)
+
+        sections = {
+            name: (header[2 * i], header[2 * i + 1])
+            for i, name in enumerate(_SECTIONS)
+        }
+        for name, (offset, size) in sections.items():
+            if offset + size > len(buffer):
+                raise ValueError(f"Section {name} goes past the end of the file")
+
+        def section(name: str) -> bytes:
+            offset, size = sections[name]
+            return buffer[offset:offset + size]
+
+        self.buffer = buffer
+        self.strings_offset = sections["strings"][0]
+        self.string_offsets = _little_endian_array("I", section("string_offsets"))
+        self.ints = _little_endian_array("q", section("ints"))
+        self.floats = _little_endian_array("d", section("floats"))
+        self.requirements_offset = sections["requirements"][0]
+        self.children = _little_endian_array("I", section("children"))
+        self.values = _little_endian_array("I", section("values")).tolist()
+
+        self.decoded_strings: List[Optional[str]] = [None] * (len(self.string_offsets) - 1)
+        self.decoded_requirements: List[Optional[dict]] = [None] * (sections["requirements"][1] // _REQUIREMENT.size)
+
+    def string(self, index: int) -> str:
+        result = self.decoded_strings[index]
+        if result is None:
+            start = self.strings_offset + self.string_offsets[index]
+            end = self.strings_offset + self.string_offsets[index + 1]
+            result = self.decoded_strings[index] = str(self.buffer[start:end], "utf-8")
+        return result
+
+    def requirement(self, index: int) -> dict:
+        result = self.decoded_requirements[index]
+        if result is not None:
+            return result
+
+        kind, resource_type, negate, first, second = _REQUIREMENT.unpack_from(
+            self.buffer, self.requirements_offset + index * _REQUIREMENT.size)
+
+        if kind == 0:
+            data = {"type": resource_type, "index": first, "amount": second, "negate": bool(negate)}
+        elif kind == 3:
+            data = self.string(first)
+        else:
+            data = [self.requirement(child) for child in self.children[first:first + second]]
+
+        result = self.decoded_requirements[index] = {"type": _REQUIREMENT_KINDS[kind], "data": data}
+        return result
+
+    def value(self, position: int):
+        """
+        Decodes the value starting at the given position of the stream.
+        :param position:
+        :return: The value, and the position after it.
+        """
+        values = self.values
+        tag = values[position]
+
+        if tag == _TAG_SMALL_INT:
+            return values[position + 1], position + 2
+
+        elif tag == _TAG_STRING:
+            return self.string(values[position + 1]), position + 2
+
+        elif tag == _TAG_DICT:
+            result = {}
+            position += 2
+            for _ in range(values[position - 1]):
+                key = self.string(values[position])
+                result[key], position = self.value(position + 1)
+            return result, position
+
+        elif tag == _TAG_LIST:
+            result = []
+            position += 2
+            for _ in range(values[position - 1]):
+                item, position = self.value(position)
+                result.append(item)
+            return result, position
+
+        elif tag == _TAG_REQUIREMENT:
+            return self.requirement(values[position + 1]), position + 2
+
+        elif tag == _TAG_NONE:
+            return None, position + 1
+
+        elif tag == _TAG_FALSE:
+            return False, position + 1
+
+        elif tag == _TAG_TRUE:
+            return True, position + 1
+
+        elif tag == _TAG_INT:
+            return self.ints[values[position + 1]], position + 2
+
+        elif tag == _TAG_FLOAT:
+            return self.floats[values[position + 1]], position + 2
+
+        elif tag == _TAG_BIG_INT:
+            return int(self.string(values[position + 1])), position + 2
+
+        else:
+            raise ValueError(f"Unknown tag {tag} at position {position}")
+
+
+def decode(buffer) -> Dict:
+    """
+    Decodes the given encoded database.
+    Identical requirements are the same object in the result, so it shouldn't be modified.
+    :param buffer: Any object supporting the buffer protocol, such as bytes or a mmap.
+    :return:
+    """
+    result, _ = _Decoder(buffer).value(0)
+    if not isinstance(result, dict):
+        raise ValueError("Fast binary game database doesn't contain a dict")
+    return result
+
+
+def read_source_hash(file_path: Path) -> bytes:
+    """
+    Reads only the header of the given file.
+    :param file_path:
+    :return: The hash of the file the database was converted from.
+    """
+    with file_path.open("rb") as data_file:
+        return _read_header(data_file.read(_HEADER.size))[0]
+
+
+def decode_file_path(file_path: Path) -> Dict:
+    with file_path.open("rb") as data_file:
+        with mmap.mmap(data_file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return decode(data)
@@ -122,9 +122,13 @@ class RelativeFormatter(LocationFormatter):
         }
 
     def _calculate_distance(self, source_location: PickupIndex, target: Area) -> int:
-        source = self._index_to_node[source_location]
-        return node_search.distances_to_node(self.world_list, source,
-                                             patches=self.patches, ignore_elevators=False)[target]
+        source = self.world_list.nodes_to_area(self._index_to_node[source_location])
+        distances = node_search.area_distances_for(self.world_list, self.patches, ignore_elevators=False)
+        distance = distances.distance(source, target)
+        if distance is None:
+            raise ValueError(f"{self.world_list.area_name(target)} can't be reached from "
+                             f"{self.world_list.area_name(source)}")
+        return distance
 
     def relative_format(self, determiner: Determiner, pickup: str, hint: Hint, other_area: Area, other_name: str,
                         ) -> str:
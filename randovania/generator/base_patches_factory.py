@@ -2,7 +2,7 @@ import copy
 import dataclasses
 from random import Random
 
-from randovania.game_description import data_reader
+from randovania.game_description import default_database
 from randovania.game_description.area_location import AreaLocation
 from randovania.game_description.assignment import GateAssignment
 from randovania.game_description.echoes_game_specific import EchoesGameSpecific
@@ -66,7 +66,7 @@ def add_elevator_connections_to_patches(layout_configuration: EchoesConfiguratio
         if rng is None:
             raise MissingRng("Elevator")
 
-        world_list = data_reader.decode_data(layout_configuration.game_data).world_list
+        world_list = default_database.game_description_for(layout_configuration.game).world_list
         areas_to_not_change = {
             2278776548,  # Sky Temple Gateway
             2068511343,  # Sky Temple Energy Controller
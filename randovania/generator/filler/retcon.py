@@ -1,18 +1,24 @@
 import collections
+import contextlib
 import dataclasses
+import io
 import itertools
+import logging
 import math
+import multiprocessing
+import pickle
 import pprint
 import re
 from random import Random
 from typing import Tuple, Iterator, NamedTuple, Set, AbstractSet, Union, Dict, \
-    DefaultDict, Mapping, FrozenSet, Callable, List, TypeVar, Any, Optional
+    DefaultDict, Mapping, FrozenSet, Callable, List, TypeVar, Any, Optional, Hashable
 
+from randovania import profiler
 from randovania.game_description.assignment import PickupTarget
 from randovania.game_description.game_description import calculate_interesting_resources, GameDescription
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.hint import Hint, HintType
-from randovania.game_description.node import ResourceNode, Node
+from randovania.game_description.node import ResourceNode
 from randovania.game_description.requirements import RequirementList
 from randovania.game_description.resources.logbook_asset import LogbookAsset
 from randovania.game_description.resources.pickup_entry import PickupEntry
@@ -31,6 +37,7 @@ from randovania.resolver.random_lib import select_element_with_weight
 from randovania.resolver.state import State
 
 X = TypeVar("X")
+logger = logging.getLogger(__name__)
 
 _RESOURCES_WEIGHT_MULTIPLIER = 1
 _INDICES_WEIGHT_MULTIPLIER = 1
@@ -74,14 +81,6 @@ class UncollectedState(NamedTuple):
         )
 
 
-def find_node_with_resource(resource: ResourceInfo,
-                            haystack: Iterator[Node],
-                            ) -> ResourceNode:
-    for node in haystack:
-        if isinstance(node, ResourceNode) and node.resource() == resource:
-            return node
-
-
 def _calculate_reach_for_progression(reach: GeneratorReach,
                                      progression: PickupEntry,
                                      ) -> GeneratorReach:
@@ -209,12 +208,19 @@ class PlayerState:
             if not isinstance(action, PickupEntry) or _items_for_pickup(action) <= num_available_indices
         ]
 
+    def weight_for_action(self, action: Action, current_uncollected: UncollectedState) -> float:
+        return _weight_for_action(self.reach, action, current_uncollected)
+
     def weighted_potential_actions(self, status_update: Callable[[str], None], num_available_indices: int,
+                                   jobs: int = 1,
+                                   pool: Optional["_WeightPool"] = None,
                                    ) -> Dict[Action, float]:
         """
         Weights all potential actions based on current criteria.
         :param status_update:
         :param num_available_indices: The number of indices available for placement.
+        :param jobs: When more than 1, weight the actions using this many processes. The result is the same.
+        :param pool: Processes to weight the actions with, instead of starting new ones.
         :return:
         """
         actions_weights: Dict[Action, float] = {}
@@ -228,19 +234,18 @@ class PlayerState:
             options_considered += 1
             status_update("Checked {} of {} options.".format(options_considered, len(actions)))
 
-        for action in actions:
-            if isinstance(action, PickupEntry):
-                base_weight = _calculate_weights_for(_calculate_reach_for_progression(self.reach, action),
-                                                     current_uncollected,
-                                                     action.name)
-                weight = base_weight * action.probability_multiplier + action.probability_offset
+        weights = None
+        if pool is not None and len(actions) > 1:
+            weights = pool.weights(self, actions, current_uncollected)
+        elif len(actions) > 1 and _can_weight_in_parallel(jobs):
+            with _WeightPool([self], jobs) as new_pool:
+                weights = new_pool.weights(self, actions, current_uncollected)
 
-            else:
-                weight = _calculate_weights_for(
-                    advance_to_with_reach_copy(self.reach, self.reach.state.act_on_node(action)),
-                    current_uncollected,
-                    action.name)
+        if weights is None:
+            weights = (self.weight_for_action(action, current_uncollected) for action in actions)
 
+        # Weights arrive in the same order as the actions, so the result doesn't depend on the number of jobs
+        for action, weight in zip(actions, weights):
             actions_weights[action] = weight
             update_for_option()
 
@@ -283,6 +288,143 @@ class PlayerState:
         )
 
 
+def _weight_for_action(reach: GeneratorReach, action: Action, current_uncollected: UncollectedState) -> float:
+    if isinstance(action, PickupEntry):
+        base_weight = _calculate_weights_for(_calculate_reach_for_progression(reach, action),
+                                             current_uncollected,
+                                             action.name)
+        return base_weight * action.probability_multiplier + action.probability_offset
+
+    else:
+        return _calculate_weights_for(
+            advance_to_with_reach_copy(reach, reach.state.act_on_node(action)),
+            current_uncollected,
+            action.name)
+
+
+# Set in each worker process of `_WeightPool`
+_worker_shared_objects: Optional[List[Any]] = None
+
+
+def _can_weight_in_parallel(jobs: int) -> bool:
+    if jobs <= 1:
+        return False
+
+    # Daemonic processes, such as the workers of a multiprocessing.Pool, can't have children.
+    if multiprocessing.current_process().daemon:
+        logger.warning("Weighting actions in a single process instead of %d, as this process can't start others.",
+                       jobs)
+        return False
+
+    return True
+
+
+def _shared_objects(games: List[GameDescription]) -> List[Any]:
+    """
+    Objects that never change, which the processes of a `_WeightPool` have a copy of.
+    They're sent as their position in this list instead of being pickled, so it must only depend on the games' contents.
+    :param games:
+    :return:
+    """
+    result: List[Any] = []
+    for game in games:
+        result.extend((game, game.world_list, game.resource_database))
+        result.extend(game.world_list.worlds)
+        result.extend(game.world_list.all_areas)
+        result.extend(game.world_list.all_nodes)
+        result.extend(_all_resources(game))
+    return result
+
+
+def _all_resources(game: GameDescription) -> Iterator[Hashable]:
+    database = game.resource_database
+    for resources in (database.item, database.event, database.trick, database.damage, database.version,
+                      database.misc):
+        yield from resources
+
+    for node in game.world_list.all_nodes:
+        if node.is_resource_node:
+            yield node.resource()
+
+
+class _SharedObjectPickler(pickle.Pickler):
+    def __init__(self, file, shared_ids: Dict[int, int]):
+        super().__init__(file, pickle.HIGHEST_PROTOCOL)
+        self._shared_ids = shared_ids
+
+    def persistent_id(self, obj):
+        return self._shared_ids.get(id(obj))
+
+
+class _SharedObjectUnpickler(pickle.Unpickler):
+    def __init__(self, file, shared_objects: List[Any]):
+        super().__init__(file)
+        self._shared_objects = shared_objects
+
+    def persistent_load(self, pid):
+        return self._shared_objects[pid]
+
+
+def _initialize_weight_worker(games: List[GameDescription]):
+    global _worker_shared_objects
+    _worker_shared_objects = _shared_objects(games)
+
+
+def _weights_in_worker(task: Tuple[bytes, int, int]) -> List[float]:
+    payload, start, stop = task
+    reach, actions, current_uncollected = _SharedObjectUnpickler(io.BytesIO(payload), _worker_shared_objects).load()
+    return [_weight_for_action(reach, action, current_uncollected) for action in actions[start:stop]]
+
+
+class _WeightPool:
+    """
+    Processes that weight the potential actions of any of the given players, started once with a copy of each game.
+    For each batch of actions, the current reach of the player is sent along.
+    """
+    _shared_objects: List[Any]
+    _shared_ids: Dict[int, int]
+
+    def __init__(self, player_states: List[PlayerState], jobs: int):
+        """
+        :param player_states: Every player that may have actions weighted by this pool.
+        :param jobs: How many processes to use.
+        """
+        games = [player_state.game for player_state in player_states]
+        self._shared_objects = _shared_objects(games)
+        self._shared_ids = {id(obj): position for position, obj in enumerate(self._shared_objects)}
+        self._jobs = jobs
+
+        # Spawned instead of forked, as the caller may have other threads and fork isn't available everywhere
+        self._pool = multiprocessing.get_context("spawn").Pool(processes=jobs, initializer=_initialize_weight_worker,
+                                                               initargs=(games,))
+
+    def __enter__(self) -> "_WeightPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        self._pool.terminate()
+        self._pool.join()
+
+    def weights(self, player_state: PlayerState, actions: List[Action],
+                current_uncollected: UncollectedState) -> List[float]:
+        """
+        Calculates the weight of each action.
+        :param player_state:
+        :param actions:
+        :param current_uncollected:
+        :return: The weights, in the same order as `actions`.
+        """
+        payload = io.BytesIO()
+        _SharedObjectPickler(payload, self._shared_ids).dump((player_state.reach, actions, current_uncollected))
+
+        chunk_size = -(-len(actions) // self._jobs)
+        tasks = [(payload.getvalue(), start, start + chunk_size) for start in range(0, len(actions), chunk_size)]
+        return list(itertools.chain.from_iterable(self._pool.map(_weights_in_worker, tasks)))
+
+
 def _get_next_player(rng: Random, player_states: List[PlayerState], num_indices: int) -> Optional[PlayerState]:
     """
     Gets the next player a pickup should be placed for.
@@ -321,15 +463,18 @@ def _get_next_player(rng: Random, player_states: List[PlayerState], num_indices:
             raise UnableToGenerate(f"No players with possible actions after {total_actions} total actions.")
 
 
+@profiler.phase("retcon_playthrough_filler")
 def retcon_playthrough_filler(rng: Random,
                               player_states: List[PlayerState],
                               status_update: Callable[[str], None],
+                              jobs: int = 1,
                               ) -> Tuple[Dict[PlayerState, GamePatches], Tuple[str, ...]]:
     """
     Runs the retcon logic.
     :param rng:
     :param player_states:
     :param status_update:
+    :param jobs: How many processes to use when weighting the potential actions.
     :return: A GamePatches for each player and a sequence of placed items.
     """
     debug.debug_print("{}\nRetcon filler started with major items:\n{}".format(
@@ -355,43 +500,47 @@ def retcon_playthrough_filler(rng: Random,
 
     actions_log = []
 
-    while True:
-        all_locations_weighted = _calculate_all_pickup_indices_weight(player_states)
-        current_player = _get_next_player(rng, player_states, len(all_locations_weighted))
-        if current_player is None:
-            break
-
-        weighted_actions = current_player.weighted_potential_actions(action_report, len(all_locations_weighted))
-        try:
-            action = select_element_with_weight(weighted_actions, rng=rng)
-        except StopIteration:
-            # All actions had weight 0. Select one randomly instead.
-            # No need to check if potential_actions is empty, _get_next_player only return players with actions
-            action = rng.choice(list(weighted_actions.keys()))
-
-        if isinstance(action, PickupEntry):
-            log_entry = _assign_pickup_somewhere(action, current_player, player_states, rng, all_locations_weighted)
-            actions_log.append(log_entry)
-            debug.debug_print(f"\n>>>> {log_entry}")
-
-            # TODO: this item is potentially dangerous and we should remove the invalidated paths
-            current_player.pickups_left.remove(action)
-            current_player.num_actions += 1
-
-            count_pickups_left = sum(len(player_state.pickups_left) for player_state in player_states)
-            last_message = "{} items left.".format(count_pickups_left)
-            status_update(last_message)
+    # Started once, so only the reaches have to be sent to the processes afterwards
+    use_pool = _can_weight_in_parallel(jobs)
+    with _WeightPool(player_states, jobs) if use_pool else contextlib.nullcontext() as pool:
+        while True:
+            all_locations_weighted = _calculate_all_pickup_indices_weight(player_states)
+            current_player = _get_next_player(rng, player_states, len(all_locations_weighted))
+            if current_player is None:
+                break
+
+            weighted_actions = current_player.weighted_potential_actions(action_report, len(all_locations_weighted),
+                                                                         pool=pool)
+            try:
+                action = select_element_with_weight(weighted_actions, rng=rng)
+            except StopIteration:
+                # All actions had weight 0. Select one randomly instead.
+                # No need to check if potential_actions is empty, _get_next_player only return players with actions
+                action = rng.choice(list(weighted_actions.keys()))
 
-        else:
-            last_message = "Triggered an event out of {} options.".format(len(weighted_actions))
-            status_update(last_message)
-            debug_print_collect_event(action, current_player.game)
+            if isinstance(action, PickupEntry):
+                log_entry = _assign_pickup_somewhere(action, current_player, player_states, rng, all_locations_weighted)
+                actions_log.append(log_entry)
+                debug.debug_print(f"\n>>>> {log_entry}")
+
+                # TODO: this item is potentially dangerous and we should remove the invalidated paths
+                current_player.pickups_left.remove(action)
+                current_player.num_actions += 1
+
+                count_pickups_left = sum(len(player_state.pickups_left) for player_state in player_states)
+                last_message = "{} items left.".format(count_pickups_left)
+                status_update(last_message)
+
+            else:
+                last_message = "Triggered an event out of {} options.".format(len(weighted_actions))
+                status_update(last_message)
+                debug_print_collect_event(action, current_player.game)
 
-            # This action is potentially dangerous. Use `act_on` to remove invalid paths
-            current_player.reach.act_on(action)
+                # This action is potentially dangerous. Use `act_on` to remove invalid paths
+                current_player.reach.act_on(action)
 
-        current_player.reach = advance_reach_with_possible_unsafe_resources(current_player.reach)
-        current_player.update_for_new_state()
+            current_player.reach = advance_reach_with_possible_unsafe_resources(current_player.reach)
+            current_player.update_for_new_state()
 
     all_patches = {player_state: player_state.reach.state.patches for player_state in player_states}
     return all_patches, tuple(actions_log)
@@ -591,12 +740,12 @@ def pickup_placement_spoiler_entry(owner_index: int, action: PickupEntry, game:
     world_list = game.world_list
     if hint is not None:
         hint_string = " with hint at {}".format(
-            world_list.node_name(find_node_with_resource(hint, world_list.all_nodes),
+            world_list.node_name(world_list.node_with_resource(hint),
                                  with_world=True, distinguish_dark_aether=True))
     else:
         hint_string = ""
 
-    pickup_node = find_node_with_resource(pickup_index, world_list.all_nodes)
+    pickup_node = world_list.node_with_resource(pickup_index)
     return "{4}{0} at {3}{1}{2}".format(
         action.name,
         world_list.node_name(pickup_node, with_world=True, distinguish_dark_aether=True),
@@ -615,6 +764,6 @@ def print_new_resources(game: GameDescription,
     if debug.debug_level() > 1:
         for index, count in seen_count.items():
             if count == 1:
-                node = find_node_with_resource(index, world_list.all_nodes)
+                node = world_list.node_with_resource(index)
                 print("-> New {}: {}".format(label, world_list.node_name(node, with_world=True)))
         print("")
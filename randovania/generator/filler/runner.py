@@ -3,6 +3,7 @@ import dataclasses
 from random import Random
 from typing import List, Tuple, Callable, TypeVar, Set, Dict, FrozenSet, Union, Iterator, Optional
 
+from randovania import profiler
 from randovania.game_description import node_search
 from randovania.game_description.area import Area
 from randovania.game_description.game_description import GameDescription
@@ -152,6 +153,7 @@ def _get_relative_hint_providers():
     ]
 
 
+@profiler.phase("add_hints_precision")
 def add_hints_precision(player_state: PlayerState,
                         patches: GamePatches,
                         rng: Random,
@@ -214,6 +216,7 @@ def replace_hints_without_precision_with_jokes(patches: GamePatches,
     })
 
 
+@profiler.phase("fill_unassigned_hints")
 def fill_unassigned_hints(patches: GamePatches,
                           world_list: WorldList,
                           rng: Random,
@@ -311,9 +314,11 @@ class FillerResults:
     action_log: Tuple[str, ...]
 
 
+@profiler.phase("run_filler")
 def run_filler(rng: Random,
                player_pools: Dict[int, PlayerPool],
                status_update: Callable[[str], None],
+               jobs: int = 1,
                ) -> FillerResults:
     """
     Runs the filler logic for the given configuration and item pool.
@@ -323,6 +328,7 @@ def run_filler(rng: Random,
     :param player_pools:
     :param rng:
     :param status_update:
+    :param jobs: How many processes to use when weighting the potential actions.
     :return:
     """
 
@@ -336,7 +342,6 @@ def run_filler(rng: Random,
         rng.shuffle(player_expansions[index])
 
         new_game, state = bootstrap.logic_bootstrap(pool.configuration, pool.game, pool.patches)
-        new_game.patch_requirements(state.resources, pool.configuration.damage_strictness.value)
 
         major_configuration = pool.configuration.major_items_configuration
         player_states.append(PlayerState(
@@ -353,7 +358,8 @@ def run_filler(rng: Random,
         ))
 
     try:
-        filler_result, actions_log = retcon_playthrough_filler(rng, player_states, status_update=status_update)
+        filler_result, actions_log = retcon_playthrough_filler(rng, player_states, status_update=status_update,
+                                                               jobs=jobs)
     except UnableToGenerate as e:
         message = "{}\n\n{}".format(
             str(e),
@@ -1,11 +1,10 @@
 import dataclasses
-import multiprocessing.dummy
+import multiprocessing
+import queue
 from random import Random
-from typing import Iterator, Optional, Callable, List, Dict
+from typing import Iterator, Optional, Callable, List, Dict, Tuple
 
-import tenacity
-
-from randovania import VERSION
+from randovania import VERSION, profiler
 from randovania.game_description import data_reader, default_database
 from randovania.game_description.assignment import PickupAssignment, PickupTarget
 from randovania.game_description.game_description import GameDescription
@@ -16,13 +15,15 @@ from randovania.generator import base_patches_factory
 from randovania.generator.filler.filler_library import filter_unassigned_pickup_nodes, UnableToGenerate
 from randovania.generator.filler.runner import run_filler, FillerPlayerResult, PlayerPool, FillerResults
 from randovania.generator.item_pool import pool_creator
+from randovania.generator.layout_cache import LayoutCache
 from randovania.layout.available_locations import RandomizationMode
 from randovania.layout.echoes_configuration import EchoesConfiguration
 from randovania.layout.layout_description import LayoutDescription
 from randovania.layout.permalink import Permalink
 from randovania.layout.preset import Preset
 from randovania.resolver import resolver
-from randovania.resolver.exceptions import GenerationFailure, InvalidConfiguration, ImpossibleForSolver
+from randovania.resolver.exceptions import GenerationFailure, InvalidConfiguration, ImpossibleForSolver, \
+    ResolverTimeout
 from randovania.resolver.state import State
 
 
@@ -32,11 +33,15 @@ def _iterate_previous_states(state: State) -> Iterator[State]:
         state = state.previous_state
 
 
+@profiler.phase("generate_description")
 def generate_description(permalink: Permalink,
                          status_update: Optional[Callable[[str], None]],
                          validate_after_generation: bool,
                          timeout: Optional[int] = 600,
                          attempts: int = 15,
+                         jobs: int = 1,
+                         concurrent_attempts: int = 1,
+                         layout_cache: Optional[LayoutCache] = None,
                          ) -> LayoutDescription:
     """
     Creates a LayoutDescription for the given Permalink.
@@ -45,41 +50,54 @@ def generate_description(permalink: Permalink,
     :param validate_after_generation:
     :param timeout: Abort generation after this many seconds.
     :param attempts: Attempt this many generations.
+    :param jobs: How many processes the filler uses to weight its potential actions. Doesn't change the result.
+    :param concurrent_attempts: When more than 1, run this many attempts at the same time in separate processes.
+    Doesn't change the result. These processes can't start others, so `jobs` is ignored.
+    :param layout_cache: Where to look for a layout previously generated for this permalink, and to add the new one.
     :return:
     """
     if status_update is None:
         status_update = id
 
-    try:
-        result = _async_create_description(
-            permalink=permalink,
-            status_update=status_update,
-            attempts=attempts,
-        )
-    except UnableToGenerate as e:
-        raise GenerationFailure("Could not generate a game with the given settings",
-                                permalink=permalink, source=e) from e
-
-    if validate_after_generation and permalink.player_count == 1:
-        with multiprocessing.dummy.Pool(1) as dummy_pool:
-            resolve_params = {
-                "configuration": permalink.presets[0].configuration,
-                "patches": result.all_patches[0],
-                "status_update": status_update,
-            }
-            final_state_async = dummy_pool.apply_async(func=resolver.resolve,
-                                                       kwds=resolve_params)
-
-            try:
-                final_state_by_resolve = final_state_async.get(timeout)
-            except multiprocessing.TimeoutError as e:
-                raise GenerationFailure("Timeout reached when validating possibility",
-                                        permalink=permalink, source=e) from e
-
-            if final_state_by_resolve is None:
-                # Why is final_state_by_distribution not OK?
-                raise GenerationFailure("Generated game was considered impossible by the solver",
-                                        permalink=permalink, source=ImpossibleForSolver())
+    should_validate = validate_after_generation and permalink.player_count == 1
+    cached = layout_cache.get(permalink) if layout_cache is not None else None
+
+    if cached is not None:
+        result = cached.layout
+        if cached.validated:
+            should_validate = False
+    else:
+        try:
+            result = _async_create_description(
+                permalink=permalink,
+                status_update=status_update,
+                attempts=attempts,
+                jobs=jobs,
+                concurrent_attempts=concurrent_attempts,
+            )
+        except UnableToGenerate as e:
+            raise GenerationFailure("Could not generate a game with the given settings",
+                                    permalink=permalink, source=e) from e
+
+    if should_validate:
+        try:
+            final_state_by_resolve = resolver.resolve(
+                configuration=permalink.presets[0].configuration,
+                patches=result.all_patches[0],
+                status_update=status_update,
+                timeout=timeout,
+            )
+        except ResolverTimeout as e:
+            raise GenerationFailure("Timeout reached when validating possibility",
+                                    permalink=permalink, source=e) from e
+
+        if final_state_by_resolve is None:
+            # Why is final_state_by_distribution not OK?
+            raise GenerationFailure("Generated game was considered impossible by the solver",
+                                    permalink=permalink, source=ImpossibleForSolver())
+
+    if layout_cache is not None and (cached is None or should_validate):
+        layout_cache.put(permalink, result, validated=should_validate)
 
     return result
 
@@ -93,6 +111,7 @@ def _validate_item_pool_size(item_pool: List[PickupEntry], game: GameDescription
                 len(item_pool), game.world_list.num_pickup_nodes, min_starting_items))
 
 
+@profiler.phase("distribute_remaining_items")
 def _distribute_remaining_items(rng: Random,
                                 filler_results: Dict[int, FillerPlayerResult],
                                 ) -> Dict[int, GamePatches]:
@@ -133,35 +152,129 @@ def _distribute_remaining_items(rng: Random,
 def _async_create_description(permalink: Permalink,
                               status_update: Callable[[str], None],
                               attempts: int,
+                              jobs: int = 1,
+                              concurrent_attempts: int = 1,
                               ) -> LayoutDescription:
     """
     :param permalink:
     :param status_update:
+    :param attempts:
+    :param jobs:
+    :param concurrent_attempts:
     :return:
     """
-    rng = Random(permalink.as_bytes)
-
-    presets = {
-        i: permalink.get_preset(i)
-        for i in range(permalink.player_count)
-    }
-
-    retrying = tenacity.Retrying(
-        stop=tenacity.stop_after_attempt(attempts),
-        retry=tenacity.retry_if_exception_type(UnableToGenerate),
-        reraise=True
-    )
+    if concurrent_attempts > 1:
+        all_patches, action_log = _create_in_concurrent_attempts(permalink, status_update, max(attempts, 1),
+                                                                 concurrent_attempts)
+    else:
+        all_patches, action_log = _create_in_sequential_attempts(permalink, status_update, max(attempts, 1), jobs)
 
-    filler_results = retrying(_create_pools_and_fill, rng, presets, status_update)
-    all_patches = _distribute_remaining_items(rng, filler_results.player_results)
     return LayoutDescription(
         permalink=permalink,
         version=VERSION,
         all_patches=all_patches,
-        item_order=filler_results.action_log,
+        item_order=action_log,
     )
 
 
+def _presets_for(permalink: Permalink) -> Dict[int, Preset]:
+    return {
+        i: permalink.get_preset(i)
+        for i in range(permalink.player_count)
+    }
+
+
+def rng_for_attempt(permalink: Permalink, attempt: int) -> Random:
+    """
+    The Random used by the given attempt, so an attempt's result doesn't depend on the ones before it.
+    :param permalink:
+    :param attempt:
+    :return:
+    """
+    if attempt == 0:
+        return Random(permalink.as_bytes)
+    return Random(permalink.as_bytes + attempt.to_bytes(4, "big"))
+
+
+def _create_description_attempt(permalink: Permalink, attempt: int,
+                                 status_update: Callable[[str], None] = id,
+                                 jobs: int = 1,
+                                 ) -> Tuple[Dict[int, GamePatches], Tuple[str, ...]]:
+    rng = rng_for_attempt(permalink, attempt)
+    filler_results = _create_pools_and_fill(rng, _presets_for(permalink), status_update, jobs)
+    return _distribute_remaining_items(rng, filler_results.player_results), filler_results.action_log
+
+
+def _create_in_sequential_attempts(permalink: Permalink,
+                                   status_update: Callable[[str], None],
+                                   attempts: int,
+                                   jobs: int,
+                                   ) -> Tuple[Dict[int, GamePatches], Tuple[str, ...]]:
+    """
+    Runs the given number of attempts one after another, returning the first successful one.
+    :param permalink:
+    :param status_update:
+    :param attempts:
+    :param jobs:
+    :return:
+    """
+    for attempt in range(attempts):
+        try:
+            return _create_description_attempt(permalink, attempt, status_update, jobs)
+        except UnableToGenerate:
+            if attempt + 1 == attempts:
+                raise
+            status_update("Attempt {} failed".format(attempt + 1))
+
+
+def _create_in_concurrent_attempts(permalink: Permalink,
+                                   status_update: Callable[[str], None],
+                                   attempts: int,
+                                   processes: int,
+                                   ) -> Tuple[Dict[int, GamePatches], Tuple[str, ...]]:
+    """
+    Runs the given number of attempts in a process pool, returning the successful attempt with the lowest number.
+    Attempts are checked in order, so the result is the same as running them one after another.
+    :param permalink:
+    :param status_update:
+    :param attempts:
+    :param processes:
+    :return:
+    """
+    status_update("Running {} attempts with {} processes".format(attempts, processes))
+
+    # Filled by the pool's result thread, so status_update is only called from this one
+    finished_attempts = queue.SimpleQueue()
+
+    with multiprocessing.Pool(processes=min(processes, attempts)) as pool:
+        results = [
+            pool.apply_async(_create_description_attempt, (permalink, attempt),
+                             callback=lambda _, a=attempt: finished_attempts.put((a, None)),
+                             error_callback=lambda e, a=attempt: finished_attempts.put((a, e)))
+            for attempt in range(attempts)
+        ]
+
+        finished = set()
+        next_attempt = 0
+        while True:
+            attempt, error = finished_attempts.get()
+            finished.add(attempt)
+            if error is None:
+                status_update("Attempt {} succeeded".format(attempt + 1))
+            else:
+                status_update("Attempt {} failed".format(attempt + 1))
+
+            while next_attempt in finished:
+                try:
+                    # Leaving the `with` terminates the attempts that are still running
+                    return results[next_attempt].get()
+                except UnableToGenerate:
+                    if next_attempt + 1 == len(results):
+                        raise
+                    next_attempt += 1
+
+
+@profiler.phase("create_player_pool")
 def create_player_pool(rng: Random, configuration: EchoesConfiguration,
                        player_index: int, num_players: int) -> PlayerPool:
     game = default_database.game_description_for(configuration.game)
@@ -188,12 +301,14 @@ def create_player_pool(rng: Random, configuration: EchoesConfiguration,
 def _create_pools_and_fill(rng: Random,
                            presets: Dict[int, Preset],
                            status_update: Callable[[str], None],
+                           jobs: int = 1,
                            ) -> FillerResults:
     """
     Runs the rng-dependant parts of the generation, with retries
     :param rng:
     :param presets:
     :param status_update:
+    :param jobs:
     :return:
     """
     player_pools: Dict[int, PlayerPool] = {}
@@ -206,7 +321,7 @@ def _create_pools_and_fill(rng: Random,
     for player_pool in player_pools.values():
         _validate_item_pool_size(player_pool.pickups, player_pool.game, player_pool.configuration)
 
-    return run_filler(rng, player_pools, status_update)
+    return run_filler(rng, player_pools, status_update, jobs=jobs)
 
 
 def _assign_remaining_items(rng: Random,
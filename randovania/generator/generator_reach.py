@@ -1,10 +1,16 @@
 import copy
 from typing import Iterator, Optional, Set, Dict, List, NamedTuple, Tuple
 
+from randovania import profiler
+from randovania.game_description.compiled_requirement import compile_requirement
 from randovania.game_description.game_description import GameDescription
+from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import Node, ResourceNode, PickupNode
+from randovania.game_description.node_adjacency import NodeAdjacency
 from randovania.game_description.requirements import RequirementSet, Requirement, RequirementAnd, \
     ResourceRequirement
+from randovania.game_description.resources.resource_collection import ResourceCollection, resource_index_for, \
+    resource_for_index
 from randovania.generator import graph as graph_module
 from randovania.resolver.state import State
 
@@ -58,30 +64,133 @@ def filter_out_dangerous_actions(resource_nodes: Iterator[ResourceNode],
             yield resource_node
 
 
+_Edge = Tuple[Node, Node]
+
+
+class _UnreachableEdges:
+    """
+    The edges whose requirements weren't satisfied, indexed by the resources that can change that.
+    """
+    paths: Dict[_Edge, Requirement]
+    _order: Dict[_Edge, int]
+    _by_resource: Dict[int, Set[_Edge]]
+    _with_damage: Set[_Edge]
+    _counter: int
+
+    def __init__(self):
+        self.paths = {}
+        self._order = {}
+        self._by_resource = {}
+        self._with_damage = set()
+        self._counter = 0
+
+    def __getstate__(self):
+        # Dense indices are only valid inside this process
+        state = dict(self.__dict__)
+        state["_by_resource"] = {resource_for_index(index): edges for index, edges in self._by_resource.items()}
+        return state
+
+    def __setstate__(self, state):
+        state["_by_resource"] = {resource_index_for(resource): edges
+                                 for resource, edges in state["_by_resource"].items()}
+        self.__dict__.update(state)
+
+    def copy(self) -> "_UnreachableEdges":
+        result = _UnreachableEdges()
+        result.paths = copy.copy(self.paths)
+        result._order = copy.copy(self._order)
+        result._by_resource = {index: set(edges) for index, edges in self._by_resource.items()}
+        result._with_damage = set(self._with_damage)
+        result._counter = self._counter
+        return result
+
+    def add(self, edge: _Edge, requirement: Requirement):
+        if edge not in self.paths:
+            self._order[edge] = self._counter
+            self._counter += 1
+        self.paths[edge] = requirement
+
+        # Entries of removed edges are left in the index, and skipped when found
+        compiled = compile_requirement(requirement)
+        for index in compiled.resource_indices:
+            self._by_resource.setdefault(index, set()).add(edge)
+        if compiled.has_damage:
+            self._with_damage.add(edge)
+
+    def remove(self, edge: _Edge):
+        del self.paths[edge]
+        del self._order[edge]
+
+    def affected_by(self, changed_indices: Set[int], energy_changed: bool) -> List[Tuple[_Edge, Requirement]]:
+        """
+        Lists the edges whose requirements can have changed, in the order they were added.
+        :param changed_indices: The resources whose quantity changed
+        :param energy_changed: If the energy changed
+        :return:
+        """
+        edges = set()
+        for index in changed_indices:
+            edges.update(self._by_resource.get(index, ()))
+        if energy_changed:
+            edges.update(self._with_damage)
+
+        return [(edge, self.paths[edge])
+                for edge in sorted((edge for edge in edges if edge in self.paths), key=self._order.__getitem__)]
+
+
 class GeneratorReach:
     _digraph: graph_module.BaseGraph
     _state: State
     _game: GameDescription
-    _reachable_paths: Optional[Dict[int, List[Node]]]
     _reachable_costs: Optional[Dict[int, int]]
     _node_reachable_cache: Dict[int, bool]
-    _unreachable_paths: Dict[Tuple[Node, Node], Requirement]
-    _safe_nodes: Optional[Set[int]]
+    _unreachable: _UnreachableEdges
+    _owns_unreachable: bool
+    _resources_at_last_check: ResourceCollection
+    _energy_at_last_check: int
+    _safe_component: Optional[graph_module.IncrementalComponent]
     _is_node_safe_cache: Dict[Node, bool]
+    _adjacency: Optional[NodeAdjacency]
+    _adjacency_patches: Optional[GamePatches]
 
     def __deepcopy__(self, memodict):
+        return self.fork()
+
+    def __getstate__(self):
+        # For sending the reach to other processes. The history of the state isn't needed to keep advancing, and the
+        # adjacency is cached by the world list there as well.
+        state = copy.copy(self._state)
+        state.previous_state = None
+        result = dict(self.__dict__)
+        result["_state"] = state
+        result["_adjacency"] = None
+        result["_adjacency_patches"] = None
+        return result
+
+    def fork(self) -> "GeneratorReach":
+        """
+        Creates a copy of this reach that can be advanced independently.
+        Both share the graph and all data until one of them modifies it, so forking is cheap.
+        The caches are shared as well: they're only ever replaced when the state changes, never cleared in place.
+        :return:
+        """
         reach = GeneratorReach(
             self._game,
             self._state,
             self._digraph.copy()
         )
-        reach._unreachable_paths = copy.copy(self._unreachable_paths)
-        reach._reachable_paths = self._reachable_paths
+        reach._unreachable = self._unreachable
+        reach._owns_unreachable = self._owns_unreachable = False
+        reach._resources_at_last_check = self._resources_at_last_check
+        reach._energy_at_last_check = self._energy_at_last_check
         reach._reachable_costs = self._reachable_costs
-        reach._safe_nodes = self._safe_nodes
+        if self._safe_component is not None:
+            reach._safe_component = self._safe_component.copy()
 
-        reach._node_reachable_cache = copy.copy(self._node_reachable_cache)
-        reach._is_node_safe_cache = copy.copy(self._is_node_safe_cache)
+        reach._node_reachable_cache = self._node_reachable_cache
+        reach._is_node_safe_cache = self._is_node_safe_cache
+        reach._adjacency = self._adjacency
+        reach._adjacency_patches = self._adjacency_patches
         return reach
 
     def __init__(self,
@@ -93,10 +202,16 @@ class GeneratorReach:
         self._game = game
         self._state = state
         self._digraph = graph
-        self._unreachable_paths = {}
-        self._reachable_paths = None
+        self._unreachable = _UnreachableEdges()
+        self._owns_unreachable = True
+        self._resources_at_last_check = state.resources.copy()
+        self._energy_at_last_check = state.energy
+        self._reachable_costs = None
+        self._safe_component = None
         self._node_reachable_cache = {}
         self._is_node_safe_cache = {}
+        self._adjacency = None
+        self._adjacency_patches = None
 
     @classmethod
     def reach_from_state(cls,
@@ -108,26 +223,54 @@ class GeneratorReach:
         reach._expand_graph([GraphPath(None, initial_state.node, Requirement.trivial())])
         return reach
 
-    def _potential_nodes_from(self, node: Node) -> Iterator[Tuple[Node, Requirement, bool]]:
+    def _current_adjacency(self) -> NodeAdjacency:
+        # The generator never modifies patches in place, so it's enough to check for a new GamePatches
+        if self._adjacency_patches is not self._state.patches:
+            self._adjacency = self._game.world_list.adjacency_for(self._state.patches)
+            self._adjacency_patches = self._state.patches
+        return self._adjacency
+
+    def _potential_nodes_from(self, node: Node, adjacency: NodeAdjacency) -> Iterator[Tuple[Node, Requirement, bool]]:
         extra_requirement = _extra_requirement_for_node(self._game, node)
         requirement_to_leave = node.requirement_to_leave(self._state.patches, self._state.resources)
 
-        for target_node, requirement in self._game.world_list.potential_nodes_from(node, self.state.patches):
-            if target_node is None:
-                continue
+        if requirement_to_leave == Requirement.trivial():
+            requirement_to_leave = None
+
+        resources = self._state.resources
+        energy = self._state.energy
+        extra_satisfied = True
+        if requirement_to_leave is not None:
+            extra_satisfied = compile_requirement(requirement_to_leave).satisfied(resources, energy)
+        if extra_requirement is not None and extra_satisfied:
+            extra_satisfied = compile_requirement(extra_requirement).satisfied(resources, energy)
 
-            if requirement_to_leave != Requirement.trivial():
+        for target_node, requirement, compiled in adjacency.connections_from(node):
+            satisfied = extra_satisfied and compiled.satisfied(resources, energy)
+
+            if requirement_to_leave is not None:
                 requirement = RequirementAnd([requirement, requirement_to_leave])
 
             if extra_requirement is not None:
                 requirement = RequirementAnd([requirement, extra_requirement])
 
-            satisfied = requirement.satisfied(self._state.resources, self._state.energy)
             yield target_node, requirement, satisfied
 
+    @property
+    def _unreachable_paths(self) -> Dict[_Edge, Requirement]:
+        return self._unreachable.paths
+
+    def _writable_unreachable(self) -> _UnreachableEdges:
+        if not self._owns_unreachable:
+            self._unreachable = self._unreachable.copy()
+            self._owns_unreachable = True
+        return self._unreachable
+
     def _expand_graph(self, paths_to_check: List[GraphPath]):
         # print("!! _expand_graph", len(paths_to_check))
-        self._reachable_paths = None
+        profiler.count_reach_calculation()
+        self._reachable_costs = None
+        adjacency = self._current_adjacency()
         while paths_to_check:
             path = paths_to_check.pop(0)
 
@@ -135,14 +278,14 @@ class GeneratorReach:
                 continue
 
             path.add_to_graph(self._digraph)
+            if path.previous_node is not None and self._safe_component is not None:
+                self._safe_component.add_edge(self._digraph, path.previous_node.index, path.node.index)
 
-            for target_node, requirement, satisfied in self._potential_nodes_from(path.node):
+            for target_node, requirement, satisfied in self._potential_nodes_from(path.node, adjacency):
                 if satisfied:
                     paths_to_check.append(GraphPath(path.node, target_node, requirement))
                 else:
-                    self._unreachable_paths[path.node, target_node] = requirement
-
-        self._safe_nodes = None
+                    self._writable_unreachable().add((path.node, target_node), requirement)
 
     def _can_advance(self,
                      node: Node,
@@ -159,30 +302,22 @@ class GeneratorReach:
             return True
 
     def _calculate_safe_nodes(self):
-        if self._safe_nodes is not None:
-            return
-
-        for component in self._digraph.strongly_connected_components():
-            if self._state.node.index in component:
-                assert self._safe_nodes is None
-                self._safe_nodes = component
-
-        assert self._safe_nodes is not None
+        if self._safe_component is None:
+            self._safe_component = graph_module.IncrementalComponent(self._digraph, self._state.node.index)
 
-    def _calculate_reachable_paths(self):
-        if self._reachable_paths is not None:
+    def _calculate_reachable_costs(self):
+        if self._reachable_costs is not None:
             return
 
         all_nodes = self.game.world_list.all_nodes
 
-        def weight(source: int, target: int, attributes):
+        def weight(target: int) -> int:
             if self._can_advance(all_nodes[target]):
                 return 0
             else:
                 return 1
 
-        self._reachable_costs, self._reachable_paths = self._digraph.multi_source_dijkstra({self.state.node.index},
-                                                                                           weight=weight)
+        self._reachable_costs, _ = self._digraph.zero_one_bfs({self.state.node.index}, weight=weight)
 
     def is_reachable_node(self, node: Node) -> bool:
         index = node.index
@@ -191,7 +326,7 @@ class GeneratorReach:
         if cached_value is not None:
             return cached_value
 
-        self._calculate_reachable_paths()
+        self._calculate_reachable_costs()
 
         cost = self._reachable_costs.get(index)
         if cost is not None:
@@ -212,9 +347,9 @@ class GeneratorReach:
         An iterator of all nodes there's an path from the reach's starting point. Similar to is_reachable_node
         :return:
         """
-        self._calculate_reachable_paths()
+        self._calculate_reachable_costs()
         all_nodes = self.game.world_list.all_nodes
-        for index in self._reachable_paths.keys():
+        for index in self._reachable_costs.keys():
             yield all_nodes[index]
 
     @property
@@ -243,7 +378,7 @@ class GeneratorReach:
             return is_safe
 
         self._calculate_safe_nodes()
-        self._is_node_safe_cache[node] = node.index in self._safe_nodes
+        self._is_node_safe_cache[node] = node.index in self._safe_component.nodes
         return self._is_node_safe_cache[node]
 
     def advance_to(self, new_state: State,
@@ -252,31 +387,40 @@ class GeneratorReach:
         assert new_state.previous_state == self.state
         # assert self.is_reachable_node(new_state.node)
 
+        # The caches might be shared with forks, so they're replaced instead of modified
         if is_safe or self.is_safe_node(new_state.node):
-            for index, _ in list(filter(lambda x: not x[1], self._node_reachable_cache.items())):
-                del self._node_reachable_cache[index]
-
-            for node, _ in list(filter(lambda x: not x[1], self._is_node_safe_cache.items())):
-                del self._is_node_safe_cache[node]
+            self._node_reachable_cache = {index: True for index, value in self._node_reachable_cache.items() if value}
+            self._is_node_safe_cache = {node: True for node, value in self._is_node_safe_cache.items() if value}
         else:
             self._node_reachable_cache = {}
             self._is_node_safe_cache = {}
 
+        # Nodes in the same strongly connected component share it
+        if self._safe_component is not None and new_state.node.index not in self._safe_component.nodes:
+            self._safe_component = None
+
         self._state = new_state
 
+        # The state's resources might have been modified in place, so compare with a copy of what was last checked
+        changed_indices = _changed_resource_indices(self._resources_at_last_check, new_state.resources)
+        energy_changed = new_state.energy != self._energy_at_last_check
+        self._resources_at_last_check = new_state.resources.copy()
+        self._energy_at_last_check = new_state.energy
+
         paths_to_check: List[GraphPath] = []
 
         edges_to_remove = []
-        # Check if we can expand the corners of our graph
-        # TODO: check if expensive. We filter by only nodes that depends on a new resource
-        for edge, requirement in self._unreachable_paths.items():
-            if requirement.satisfied(self._state.resources, self._state.energy):
+        # Check if we can expand the corners of our graph, looking only at edges that depend on what changed
+        for edge, requirement in self._unreachable.affected_by(changed_indices, energy_changed):
+            if compile_requirement(requirement).satisfied(self._state.resources, self._state.energy):
                 from_node, to_node = edge
                 paths_to_check.append(GraphPath(from_node, to_node, requirement))
                 edges_to_remove.append(edge)
 
-        for edge in edges_to_remove:
-            del self._unreachable_paths[edge]
+        if edges_to_remove:
+            unreachable = self._writable_unreachable()
+            for edge in edges_to_remove:
+                unreachable.remove(edge)
 
         self._expand_graph(paths_to_check)
 
@@ -301,6 +445,9 @@ class GeneratorReach:
             for edge in edges_to_remove:
                 self._digraph.remove_edge(*edge)
 
+            if edges_to_remove:
+                self._safe_component = None
+
         self.advance_to(new_state)
 
     def shortest_path_from(self, node: Node) -> Dict[Node, Tuple[Node, ...]]:
@@ -322,6 +469,21 @@ class GeneratorReach:
         return results
 
 
+def _changed_resource_indices(old: ResourceCollection, new: ResourceCollection) -> Set[int]:
+    old_quantities = old.quantities
+    new_quantities = new.quantities
+    if old_quantities is new_quantities:
+        return set()
+
+    changed = set()
+    for index in range(max(len(old_quantities), len(new_quantities))):
+        old_quantity = (old_quantities[index] if index < len(old_quantities) else None) or 0
+        new_quantity = (new_quantities[index] if index < len(new_quantities) else None) or 0
+        if old_quantity != new_quantity:
+            changed.add(index)
+    return changed
+
+
 def _extra_requirement_for_node(game: GameDescription, node: Node) -> Optional[Requirement]:
     extra_requirement = None
 
@@ -399,7 +561,7 @@ def advance_reach_with_possible_unsafe_resources(previous_reach: GeneratorReach)
 
     for action in get_collectable_resource_nodes_of_reach(previous_reach):
         # print("Trying to collect {} and it's not dangerous. Copying...".format(action.name))
-        next_reach = copy.deepcopy(previous_reach)
+        next_reach = previous_reach.fork()
         next_reach.act_on(action)
         collect_all_safe_resources_in_reach(next_reach)
 
@@ -437,7 +599,7 @@ def advance_to_with_reach_copy(base_reach: GeneratorReach, state: State) -> Gene
     :param state:
     :return:
     """
-    potential_reach = copy.deepcopy(base_reach)
+    potential_reach = base_reach.fork()
     potential_reach.advance_to(state)
     collect_all_safe_resources_in_reach(potential_reach)
     return potential_reach
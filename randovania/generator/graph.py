@@ -1,7 +1,6 @@
+import collections
 import copy
-from typing import Dict, Iterator, Tuple, Set, Callable
-
-import networkx
+from typing import Dict, Iterator, Tuple, Set, Callable, List, Optional
 
 from randovania.game_description.requirements import Requirement
 
@@ -28,10 +27,11 @@ class BaseGraph:
     def edges_data(self) -> Iterator[Tuple[int, int, Requirement]]:
         raise NotImplementedError()
 
-    def multi_source_dijkstra(self, sources: Set[int], weight: Callable[[int, int, Requirement], float]):
+    def zero_one_bfs(self, sources: Set[int], weight: Callable[[int], int],
+                     ) -> Tuple[Dict[int, int], Dict[int, Optional[int]]]:
         raise NotImplementedError()
 
-    def single_source_dijkstra_path(self, source: int):
+    def single_source_dijkstra_path(self, source: int) -> Dict[int, List[int]]:
         raise NotImplementedError()
 
     def strongly_connected_components(self) -> Iterator[Set[int]]:
@@ -39,7 +39,16 @@ class BaseGraph:
 
 
 class RandovaniaGraph(BaseGraph):
+    """
+    A graph where copies share the edges with the original, each copying only the parts it modifies.
+    `edges` and `reverse_edges` must not be modified directly.
+    """
     edges: Dict[int, Dict[int, Requirement]]
+    reverse_edges: Dict[int, Set[int]]
+    _owns_edges: bool
+    _owned_sources: Set[int]
+    _owns_reverse_edges: bool
+    _owned_targets: Set[int]
 
     @classmethod
     def new(cls):
@@ -47,24 +56,65 @@ class RandovaniaGraph(BaseGraph):
 
     def __init__(self, edges: Dict[int, Dict[int, Requirement]]):
         self.edges = edges
+        self._owns_edges = True
+        self._owned_sources = set(edges.keys())
+
+        self.reverse_edges = {}
+        for source, targets in edges.items():
+            for target in targets:
+                self.reverse_edges.setdefault(target, set()).add(source)
+        self._owns_reverse_edges = True
+        self._owned_targets = set(self.reverse_edges.keys())
 
     def copy(self):
-        return RandovaniaGraph(
-            {
-                source: copy.copy(data)
-                for source, data in self.edges.items()
-            },
-        )
+        result = RandovaniaGraph.__new__(RandovaniaGraph)
+        result.edges = self.edges
+        result.reverse_edges = self.reverse_edges
+        result._owns_edges = self._owns_edges = False
+        result._owns_reverse_edges = self._owns_reverse_edges = False
+        result._owned_sources = set()
+        result._owned_targets = set()
+        self._owned_sources = set()
+        self._owned_targets = set()
+        return result
+
+    def _writable_edges_from(self, source: int) -> Dict[int, Requirement]:
+        if not self._owns_edges:
+            self.edges = copy.copy(self.edges)
+            self._owns_edges = True
+
+        if source not in self._owned_sources:
+            self.edges[source] = copy.copy(self.edges[source])
+            self._owned_sources.add(source)
+
+        return self.edges[source]
+
+    def _writable_edges_to(self, target: int) -> Set[int]:
+        if not self._owns_reverse_edges:
+            self.reverse_edges = copy.copy(self.reverse_edges)
+            self._owns_reverse_edges = True
+
+        if target not in self._owned_targets:
+            self.reverse_edges[target] = set(self.reverse_edges.get(target, ()))
+            self._owned_targets.add(target)
+
+        return self.reverse_edges[target]
 
     def add_node(self, node: int):
         if node not in self.edges:
+            if not self._owns_edges:
+                self.edges = copy.copy(self.edges)
+                self._owns_edges = True
             self.edges[node] = {}
+            self._owned_sources.add(node)
 
     def add_edge(self, previous_node: int, next_node: int, requirement: Requirement):
-        self.edges[previous_node][next_node] = requirement
+        self._writable_edges_from(previous_node)[next_node] = requirement
+        self._writable_edges_to(next_node).add(previous_node)
 
     def remove_edge(self, previous: int, target: int):
-        self.edges[previous].pop(target)
+        self._writable_edges_from(previous).pop(target)
+        self._writable_edges_to(target).remove(previous)
 
     def has_edge(self, previous_node: int, next_node: int) -> bool:
         return next_node in self.edges.get(previous_node, {})
@@ -77,28 +127,187 @@ class RandovaniaGraph(BaseGraph):
             for target, requirement in data.items():
                 yield source, target, requirement
 
-    def multi_source_dijkstra(self, sources: Set[int], weight: Callable[[int, int, Requirement], float]):
-        return networkx.multi_source_dijkstra(self, sources, weight=weight)
-
-    def single_source_dijkstra_path(self, source: int):
-        return networkx.single_source_dijkstra_path(self, source, weight="unweighted")
+    def zero_one_bfs(self, sources: Set[int], weight: Callable[[int], int],
+                     ) -> Tuple[Dict[int, int], Dict[int, Optional[int]]]:
+        """
+        Calculates the cost of reaching every node reachable from the given sources.
+        :param sources:
+        :param weight: The cost of entering the given node. Must be either 0 or 1, and is calculated once per node.
+        :return: The cost of each reachable node and its predecessor in a cheapest path, for use with `path_to`.
+        """
+        edges = self.edges
+        costs = {}
+        predecessors = {}
+        weights = {}
+        finished = set()
+
+        queue = collections.deque()
+        for source in sources:
+            costs[source] = 0
+            predecessors[source] = None
+            queue.append(source)
+
+        while queue:
+            node = queue.popleft()
+            if node in finished:
+                continue
+            finished.add(node)
+
+            cost = costs[node]
+            for target in edges[node]:
+                target_weight = weights.get(target)
+                if target_weight is None:
+                    target_weight = weights[target] = weight(target)
+
+                target_cost = cost + target_weight
+                previous_cost = costs.get(target)
+                if previous_cost is None or target_cost < previous_cost:
+                    costs[target] = target_cost
+                    predecessors[target] = node
+                    if target_weight == 0:
+                        queue.appendleft(target)
+                    else:
+                        queue.append(target)
+
+        return costs, predecessors
+
+    def single_source_dijkstra_path(self, source: int) -> Dict[int, List[int]]:
+        """
+        Calculates the path with the fewest edges from the given source to each reachable node.
+        :param source:
+        :return:
+        """
+        edges = self.edges
+        paths = {source: [source]}
+        queue = collections.deque([source])
+        while queue:
+            node = queue.popleft()
+            for target in edges[node]:
+                if target not in paths:
+                    paths[target] = paths[node] + [target]
+                    queue.append(target)
+        return paths
 
     def strongly_connected_components(self) -> Iterator[Set[int]]:
-        yield from networkx.strongly_connected_components(self)
-
-    # Networkx compatibility API
-    def is_multigraph(self):
-        return False
-
-    def is_directed(self):
-        return True
-
-    @property
-    def _succ(self):
-        return self.edges
-
-    def __iter__(self):
-        yield from self.edges.keys()
-
-    def __getitem__(self, n):
-        return self.edges[n].keys()
+        """
+        Tarjan's algorithm, using an explicit stack instead of recursion.
+        :return:
+        """
+        edges = self.edges
+        index_of = {}
+        low_link = {}
+        stack = []
+        on_stack = set()
+
+        for root in edges:
+            if root in index_of:
+                continue
+
+            index_of[root] = low_link[root] = len(index_of)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(edges[root]))]
+
+            while work:
+                node, targets = work[-1]
+                for target in targets:
+                    if target not in index_of:
+                        index_of[target] = low_link[target] = len(index_of)
+                        stack.append(target)
+                        on_stack.add(target)
+                        work.append((target, iter(edges[target])))
+                        break
+                    elif target in on_stack and index_of[target] < low_link[node]:
+                        low_link[node] = index_of[target]
+                else:
+                    work.pop()
+                    if work:
+                        parent = work[-1][0]
+                        if low_link[node] < low_link[parent]:
+                            low_link[parent] = low_link[node]
+
+                    if low_link[node] == index_of[node]:
+                        component = set()
+                        while True:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            component.add(member)
+                            if member == node:
+                                break
+                        yield component
+
+
+def path_to(predecessors: Dict[int, Optional[int]], target: int) -> List[int]:
+    """
+    Reconstructs the path to the given node, using the predecessors calculated by `zero_one_bfs`.
+    :param predecessors:
+    :param target:
+    :return:
+    """
+    path = []
+    node = target
+    while node is not None:
+        path.append(node)
+        node = predecessors[node]
+    path.reverse()
+    return path
+
+
+def _expand_reached(start: int, reached: Set[int], adjacency) -> List[int]:
+    new_nodes = [start]
+    reached.add(start)
+    queue = [start]
+    while queue:
+        node = queue.pop()
+        for neighbour in adjacency.get(node, ()):
+            if neighbour not in reached:
+                reached.add(neighbour)
+                new_nodes.append(neighbour)
+                queue.append(neighbour)
+    return new_nodes
+
+
+class IncrementalComponent:
+    """
+    The strongly connected component of a node: the nodes it reaches that also reach it.
+    Adding edges to the graph only makes both sets bigger, so they're extended with `add_edge` instead of recalculated.
+    Removing edges invalidates it.
+    """
+    root: int
+    forward: Set[int]
+    backward: Set[int]
+    nodes: Set[int]
+
+    def __init__(self, graph: RandovaniaGraph, root: int):
+        self.root = root
+        self.forward = set()
+        self.backward = set()
+        _expand_reached(root, self.forward, graph.edges)
+        _expand_reached(root, self.backward, graph.reverse_edges)
+        self.nodes = self.forward & self.backward
+
+    def copy(self) -> "IncrementalComponent":
+        result = IncrementalComponent.__new__(IncrementalComponent)
+        result.root = self.root
+        result.forward = set(self.forward)
+        result.backward = set(self.backward)
+        result.nodes = set(self.nodes)
+        return result
+
+    def add_edge(self, graph: RandovaniaGraph, source: int, target: int):
+        """
+        Updates the component after the given edge was added to the graph.
+        :param graph:
+        :param source:
+        :param target:
+        :return:
+        """
+        if source in self.forward and target not in self.forward:
+            for node in _expand_reached(target, self.forward, graph.edges):
+                if node in self.backward:
+                    self.nodes.add(node)
+
+        if target in self.backward and source not in self.backward:
+            for node in _expand_reached(source, self.backward, graph.reverse_edges):
+                if node in self.forward:
+                    self.nodes.add(node)
@@ -0,0 +1,118 @@
+"""
+An on-disk cache of generated layouts. Generating is deterministic given the permalink and the Randovania version,
+so entries are keyed by both. The directory can be shared by many processes and machines.
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+from randovania import VERSION
+from randovania.layout.layout_description import LayoutDescription
+from randovania.layout.permalink import Permalink
+
+DEFAULT_MAX_SIZE = 200 * 1024 * 1024
+_ENTRY_SUFFIX = ".json"
+
+
+class CachedLayout(NamedTuple):
+    layout: LayoutDescription
+    validated: bool
+
+
+@dataclasses.dataclass(frozen=True)
+class LayoutCache:
+    """
+    Entries are evicted, least recently used first, when the files in the cache take more than `max_size` bytes.
+    """
+    path: Path
+    max_size: int = DEFAULT_MAX_SIZE
+
+    def _path_for(self, permalink: Permalink) -> Path:
+        key = hashlib.blake2b(VERSION.encode("utf-8") + b"\0" + permalink.as_bytes, digest_size=20).hexdigest()
+        return self.path.joinpath(key + _ENTRY_SUFFIX)
+
+    def get(self, permalink: Permalink) -> Optional[CachedLayout]:
+        """
+        Gets the layout generated for the given permalink, if it's in the cache.
+        :param permalink:
+        :return:
+        """
+        entry_path = self._path_for(permalink)
+        try:
+            with entry_path.open() as entry_file:
+                data = json.load(entry_file)
+            layout = LayoutDescription.from_json_dict(data["layout"])
+        except FileNotFoundError:
+            return None
+        except (ValueError, KeyError, TypeError):
+            # Partially written or otherwise broken entry
+            self._remove(entry_path)
+            return None
+
+        if layout.permalink.as_bytes != permalink.as_bytes:
+            return None
+
+        try:
+            # The modification time is the last use, for the eviction
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        return CachedLayout(layout, data["validated"])
+
+    def put(self, permalink: Permalink, layout: LayoutDescription, validated: bool):
+        """
+        Adds the layout generated for the given permalink, then evicts entries if the cache is too big.
+        :param permalink:
+        :param layout:
+        :param validated: If the layout was checked to be possible by the resolver.
+        :return:
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+        entry_path = self._path_for(permalink)
+
+        # Other processes never see a partially written entry
+        temporary_path = self.path.joinpath("{}.tmp".format(uuid.uuid4().hex))
+        with temporary_path.open("w") as entry_file:
+            json.dump({"validated": validated, "layout": layout.as_json}, entry_file)
+        temporary_path.replace(entry_path)
+
+        self.evict()
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        for entry_path in self.path.glob("*" + _ENTRY_SUFFIX):
+            self._remove(entry_path)
+
+    def evict(self):
+        """
+        Removes the least recently used entries until all fit in `max_size`.
+        """
+        entries = []
+        total_size = 0
+        for entry_path in self.path.glob("*" + _ENTRY_SUFFIX):
+            try:
+                stat = entry_path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, entry_path, stat.st_size))
+            total_size += stat.st_size
+
+        entries.sort()
+        for _, entry_path, size in entries:
+            if total_size <= self.max_size:
+                break
+            self._remove(entry_path)
+            total_size -= size
+
+    @staticmethod
+    def _remove(entry_path: Path):
+        try:
+            entry_path.unlink()
+        except FileNotFoundError:
+            pass
@@ -79,7 +79,7 @@ class DataEditorWindow(QMainWindow, Ui_DataEditorWindow):
     def open_internal_data(cls, game: RandovaniaGame, edit_mode: bool) -> "DataEditorWindow":
         default_data.read_json_then_binary.cache_clear()
         path, data = default_data.read_json_then_binary(game)
-        if path.suffix == ".bin":
+        if path.suffix != ".json":
             path = None
         return DataEditorWindow(data, path, True, edit_mode)
 
@@ -20,6 +20,7 @@ from randovania.game_description.item.item_category import ItemCategory
 from randovania.game_description.node import LogbookNode, LoreType
 from randovania.game_description.resources.trick_resource_info import TrickResourceInfo
 from randovania.games.game import RandovaniaGame
+from randovania.generator.layout_cache import LayoutCache
 from randovania.gui.data_editor import DataEditorWindow
 from randovania.gui.dialog.login_prompt_dialog import LoginPromptDialog
 from randovania.gui.dialog.permalink_dialog import PermalinkDialog
@@ -138,6 +139,8 @@ class MainWindow(WindowManager, Ui_MainWindow):
         self.menu_action_edit_existing_database.triggered.connect(self._open_data_editor_prompt)
         self.menu_action_validate_seed_after.triggered.connect(self._on_validate_seed_change)
         self.menu_action_timeout_generation_after_a_time_limit.triggered.connect(self._on_generate_time_limit_change)
+        self.menu_action_use_layout_cache.triggered.connect(self._on_use_layout_cache_change)
+        self.menu_action_clear_layout_cache.triggered.connect(self._on_menu_action_clear_layout_cache)
         self.menu_action_dark_mode.triggered.connect(self._on_menu_action_dark_mode)
         self.menu_action_open_auto_tracker.triggered.connect(self._open_auto_tracker)
         self.menu_action_previously_generated_games.triggered.connect(self._on_menu_action_previously_generated_games)
@@ -374,6 +377,7 @@ class MainWindow(WindowManager, Ui_MainWindow):
         self.menu_action_validate_seed_after.setChecked(self._options.advanced_validate_seed_after)
         self.menu_action_timeout_generation_after_a_time_limit.setChecked(
             self._options.advanced_timeout_during_generation)
+        self.menu_action_use_layout_cache.setChecked(self._options.advanced_use_layout_cache)
         self.menu_action_dark_mode.setChecked(self._options.dark_mode)
 
         self.generate_seed_tab.on_options_changed(self._options)
@@ -529,6 +533,14 @@ class MainWindow(WindowManager, Ui_MainWindow):
         with self._options as options:
             options.advanced_timeout_during_generation = is_checked
 
+    def _on_use_layout_cache_change(self):
+        is_checked = self.menu_action_use_layout_cache.isChecked()
+        with self._options as options:
+            options.advanced_use_layout_cache = is_checked
+
+    def _on_menu_action_clear_layout_cache(self):
+        LayoutCache(self._options.layout_cache_path).clear()
+
     def _on_menu_action_dark_mode(self):
         with self._options as options:
             options.dark_mode = self.menu_action_dark_mode.isChecked()
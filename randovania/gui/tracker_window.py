@@ -1,4 +1,5 @@
 import collections
+import copy
 import functools
 import json
 import typing
@@ -34,7 +35,7 @@ from randovania.layout import translator_configuration
 from randovania.layout.echoes_configuration import EchoesConfiguration
 from randovania.layout.elevators import LayoutElevators
 from randovania.layout.translator_configuration import LayoutTranslatorRequirement
-from randovania.resolver.bootstrap import logic_bootstrap
+from randovania.resolver.bootstrap import logic_bootstrap, move_state_to_game
 from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 from randovania.resolver.state import State, add_pickup_to_state
@@ -119,9 +120,10 @@ class TrackerWindow(QMainWindow, Ui_TrackerWindow):
 
         player_pool = generator.create_player_pool(Random(0), self.layout_configuration, 0, 1)
         pool_patches = player_pool.patches
-        self.game_description, self._initial_state = logic_bootstrap(layout_configuration,
-                                                                     player_pool.game,
-                                                                     pool_patches)
+        game, self._initial_state = logic_bootstrap(layout_configuration, player_pool.game, pool_patches)
+        # The tracker keeps its own copy instead of the patched game shared with the generator and resolver
+        self.game_description = copy.deepcopy(game)
+        move_state_to_game(self._initial_state, self.game_description)
         self.logic = Logic(self.game_description, layout_configuration)
 
         self._initial_state.resources["add_self_as_requirement_to_resources"] = 1
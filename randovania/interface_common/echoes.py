@@ -1,9 +1,10 @@
 import multiprocessing
 from concurrent.futures.process import ProcessPoolExecutor
 from multiprocessing.connection import Connection
-from typing import Callable
+from typing import Callable, Optional
 
 from randovania.generator import generator
+from randovania.generator.layout_cache import LayoutCache
 from randovania.layout.layout_description import LayoutDescription
 from randovania.layout.permalink import Permalink
 from randovania.resolver import debug
@@ -13,7 +14,8 @@ def _generate_layout_worker(output_pipe: Connection,
                             permalink: Permalink,
                             validate_after_generation: bool,
                             timeout_during_generation: bool,
-                            debug_level: int):
+                            debug_level: int,
+                            layout_cache: Optional[LayoutCache]):
     def status_update(message: str):
         output_pipe.send(message)
         if output_pipe.poll():
@@ -27,6 +29,7 @@ def _generate_layout_worker(output_pipe: Connection,
     return generator.generate_description(permalink,
                                           status_update=status_update,
                                           validate_after_generation=validate_after_generation,
+                                          layout_cache=layout_cache,
                                           **extra_args)
 
 
@@ -34,6 +37,7 @@ def generate_layout(permalink: Permalink,
                     status_update: Callable[[str], None],
                     validate_after_generation: bool,
                     timeout_during_generation: bool,
+                    layout_cache: Optional[LayoutCache] = None,
                     ) -> LayoutDescription:
     receiving_pipe, output_pipe = multiprocessing.Pipe(True)
 
@@ -46,7 +50,7 @@ def generate_layout(permalink: Permalink,
 
     with ProcessPoolExecutor(max_workers=1) as executor:
         future = executor.submit(_generate_layout_worker, output_pipe, permalink, validate_after_generation,
-                                 timeout_during_generation, debug_level)
+                                 timeout_during_generation, debug_level, layout_cache)
 
         future.add_done_callback(on_done)
 
@@ -49,9 +49,11 @@ _SERIALIZER_FOR_FIELD = {
     "last_changelog_displayed": Serializer(identity, str),
     "advanced_validate_seed_after": Serializer(identity, bool),
     "advanced_timeout_during_generation": Serializer(identity, bool),
+    "advanced_use_layout_cache": Serializer(identity, bool),
     "auto_save_spoiler": Serializer(identity, bool),
     "dark_mode": Serializer(identity, bool),
     "output_directory": Serializer(str, Path),
+    "layout_cache_directory": Serializer(str, Path),
     "selected_preset_name": Serializer(identity, str),
     "cosmetic_patches": Serializer(lambda p: p.as_json, CosmeticPatches.from_json_dict),
     "displayed_alerts": Serializer(serialize_alerts, decode_alerts),
@@ -87,9 +89,11 @@ class Options:
     _last_changelog_displayed: str
     _advanced_validate_seed_after: Optional[bool] = None
     _advanced_timeout_during_generation: Optional[bool] = None
+    _advanced_use_layout_cache: Optional[bool] = None
     _auto_save_spoiler: Optional[bool] = None
     _dark_mode: Optional[bool] = None
     _output_directory: Optional[Path] = None
+    _layout_cache_directory: Optional[Path] = None
     _selected_preset_name: Optional[str] = None
     _cosmetic_patches: Optional[CosmeticPatches] = None
     _displayed_alerts: Optional[Set[InfoAlert]] = None
@@ -217,6 +221,7 @@ class Options:
         self._check_editable_and_mark_dirty()
         self._advanced_validate_seed_after = None
         self._advanced_timeout_during_generation = None
+        self._advanced_use_layout_cache = None
         self._auto_save_spoiler = None
         self._cosmetic_patches = None
         self._displayed_alerts = None
@@ -238,6 +243,10 @@ class Options:
     def tracker_files_path(self) -> Path:
         return self._data_dir.joinpath("tracker")
 
+    @property
+    def layout_cache_path(self) -> Path:
+        return _return_with_default(self._layout_cache_directory, lambda: self._data_dir.joinpath("layout_cache"))
+
     @property
     def data_dir(self) -> Path:
         return self._data_dir
@@ -261,6 +270,14 @@ class Options:
     def output_directory(self, value: Optional[Path]):
         self._edit_field("output_directory", value)
 
+    @property
+    def layout_cache_directory(self) -> Optional[Path]:
+        return self._layout_cache_directory
+
+    @layout_cache_directory.setter
+    def layout_cache_directory(self, value: Optional[Path]):
+        self._edit_field("layout_cache_directory", value)
+
     @property
     def auto_save_spoiler(self) -> bool:
         return _return_with_default(self._auto_save_spoiler, lambda: False)
@@ -354,6 +371,14 @@ class Options:
     def advanced_timeout_during_generation(self, value: bool):
         self._edit_field("advanced_timeout_during_generation", value)
 
+    @property
+    def advanced_use_layout_cache(self) -> bool:
+        return _return_with_default(self._advanced_use_layout_cache, lambda: True)
+
+    @advanced_use_layout_cache.setter
+    def advanced_use_layout_cache(self, value: bool):
+        self._edit_field("advanced_use_layout_cache", value)
+
     ######
 
     def _check_editable_and_mark_dirty(self):
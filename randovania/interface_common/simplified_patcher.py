@@ -4,6 +4,7 @@ from pathlib import Path
 from randovania.game_description.echoes_game_specific import EchoesGameSpecific
 from randovania.games.prime import iso_packager, claris_randomizer
 from randovania.games.prime.banner_patcher import patch_game_name_and_id
+from randovania.generator.layout_cache import LayoutCache
 from randovania.interface_common import echoes
 from randovania.interface_common.options import Options
 from randovania.interface_common.players_configuration import PlayersConfiguration
@@ -66,6 +67,7 @@ def generate_layout(options: Options,
         status_update=ConstantPercentageCallback(progress_update, -1),
         validate_after_generation=options.advanced_validate_seed_after,
         timeout_during_generation=options.advanced_timeout_during_generation,
+        layout_cache=LayoutCache(options.layout_cache_path) if options.advanced_use_layout_cache else None,
     )
 
 
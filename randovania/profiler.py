@@ -0,0 +1,149 @@
+"""
+Records the wall time, call count and reach calculations of each phase of generating and validating a game.
+Phases are only recorded while inside `profiling()`, and only for the current process.
+"""
+import contextlib
+import dataclasses
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+_current_profile: Optional["GenerationProfile"] = None
+_reach_calculations = 0
+
+
+@dataclasses.dataclass()
+class PhaseStatistics:
+    calls: int = 0
+    seconds: float = 0.0
+    reach_calculations: int = 0
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "calls": self.calls,
+            "seconds": self.seconds,
+            "reach_calculations": self.reach_calculations,
+        }
+
+
+@dataclasses.dataclass(frozen=True)
+class PhaseEvent:
+    name: str
+    depth: int
+    start: float
+    seconds: float
+    reach_calculations: int
+
+
+class GenerationProfile:
+    """
+    The phases recorded by `profiling`. Statistics of a phase include the phases nested in it.
+    """
+    phases: Dict[str, PhaseStatistics]
+    events: List[PhaseEvent]
+    start: float
+    seconds: float
+    _depth: int
+
+    def __init__(self):
+        self.phases = {}
+        self.events = []
+        self.start = time.perf_counter()
+        self.seconds = 0.0
+        self._depth = 0
+
+    def _record(self, name: str, start: float, seconds: float, reach_calculations: int):
+        statistics = self.phases.get(name)
+        if statistics is None:
+            statistics = self.phases[name] = PhaseStatistics()
+        statistics.calls += 1
+        statistics.seconds += seconds
+        statistics.reach_calculations += reach_calculations
+        self.events.append(PhaseEvent(name, self._depth, start - self.start, seconds, reach_calculations))
+
+    @property
+    def as_json(self) -> dict:
+        return {
+            "seconds": self.seconds,
+            "phases": {
+                name: statistics.as_json
+                for name, statistics in self.phases.items()
+            },
+        }
+
+    @property
+    def as_chrome_trace(self) -> dict:
+        """
+        The phases in the Trace Event Format, which can be opened by chrome://tracing and similar tools.
+        """
+        pid = os.getpid()
+        return {
+            "traceEvents": [
+                {
+                    "name": event.name,
+                    "ph": "X",
+                    "ts": event.start * 1_000_000,
+                    "dur": event.seconds * 1_000_000,
+                    "pid": pid,
+                    "tid": 0,
+                    "args": {"reach_calculations": event.reach_calculations},
+                }
+                for event in sorted(self.events, key=lambda it: (it.start, it.depth))
+            ],
+            "displayTimeUnit": "ms",
+        }
+
+    def save_json(self, path: Path):
+        with path.open("w") as open_file:
+            json.dump(self.as_json, open_file, indent=4)
+
+    def save_chrome_trace(self, path: Path):
+        with path.open("w") as open_file:
+            json.dump(self.as_chrome_trace, open_file)
+
+
+@contextlib.contextmanager
+def profiling() -> Iterator[GenerationProfile]:
+    """
+    Records all phases run inside this context in the returned GenerationProfile.
+    :return:
+    """
+    global _current_profile
+    previous_profile = _current_profile
+    profile = GenerationProfile()
+    _current_profile = profile
+    try:
+        yield profile
+    finally:
+        profile.seconds = time.perf_counter() - profile.start
+        _current_profile = previous_profile
+
+
+@contextlib.contextmanager
+def phase(name: str) -> Iterator[None]:
+    """
+    Records the given phase in the current profile, if there's one. Can also be used as a decorator.
+    :param name:
+    :return:
+    """
+    profile = _current_profile
+    if profile is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    reach_calculations = _reach_calculations
+    profile._depth += 1
+    try:
+        yield
+    finally:
+        profile._depth -= 1
+        profile._record(name, start, time.perf_counter() - start, _reach_calculations - reach_calculations)
+
+
+def count_reach_calculation():
+    global _reach_calculations
+    _reach_calculations += 1
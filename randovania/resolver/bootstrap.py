@@ -1,3 +1,4 @@
+import collections
 import copy
 from typing import Tuple
 
@@ -51,6 +52,9 @@ _minimal_logic_custom_item_count = {
     46: 100
 }
 
+_PATCHED_GAMES_CACHE_SIZE = 8
+_patched_games: "collections.OrderedDict[tuple, Tuple[GameDescription, GameDescription]]" = collections.OrderedDict()
+
 _events_for_vanilla_item_loss_from_ship = {
     2,
     4,
@@ -116,7 +120,12 @@ def calculate_starting_state(game: GameDescription, patches: GamePatches) -> "St
     if initial_game_state is not None:
         add_resource_gain_to_current_resources(initial_game_state, initial_resources)
 
-    starting_state = State(
+    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
+    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
+    for resource in keys_to_remove:
+        del initial_resources[resource]
+
+    return State(
         initial_resources,
         (),
         99 + (100 * initial_resources.get(game.resource_database.energy_tank, 0)),
@@ -127,13 +136,6 @@ def calculate_starting_state(game: GameDescription, patches: GamePatches) -> "St
         game.world_list,
     )
 
-    # Being present with value 0 is troublesome since this dict is used for a simplify_requirements later on
-    keys_to_remove = [resource for resource, quantity in initial_resources.items() if quantity == 0]
-    for resource in keys_to_remove:
-        del initial_resources[resource]
-
-    return starting_state
-
 
 def version_resources_for_game(resource_database: ResourceDatabase) -> CurrentResources:
     # All version differences are patched out from the game
@@ -159,6 +161,43 @@ def misc_resources_for_configuration(configuration: EchoesConfiguration,
     }
 
 
+def patched_game(game: GameDescription, resources: CurrentResources, damage_multiplier: float) -> GameDescription:
+    """
+    Gets a copy of the given game with `patch_requirements` applied. The copy is shared by every call with the same
+    arguments, so neither the given game nor the result may be modified.
+    :param game:
+    :param resources:
+    :param damage_multiplier:
+    :return:
+    """
+    key = (id(game), frozenset(resources.items()), damage_multiplier)
+    entry = _patched_games.get(key)
+    if entry is not None:
+        _patched_games.move_to_end(key)
+        return entry[1]
+
+    new_game = copy.deepcopy(game)
+    new_game.patch_requirements(resources, damage_multiplier)
+
+    # The original game is kept alive, so its id isn't reused while the entry exists
+    _patched_games[key] = (game, new_game)
+    if len(_patched_games) > _PATCHED_GAMES_CACHE_SIZE:
+        _patched_games.popitem(last=False)
+
+    return new_game
+
+
+def move_state_to_game(state: State, game: GameDescription):
+    """
+    Makes the given state refer to the nodes of the given game, which must be a copy of the game it was created for.
+    :param state:
+    :param game:
+    :return:
+    """
+    state.node = game.world_list.all_nodes[state.node.index]
+    state.world_list = game.world_list
+
+
 def logic_bootstrap(configuration: EchoesConfiguration,
                     game: GameDescription,
                     patches: GamePatches,
@@ -166,11 +205,11 @@ def logic_bootstrap(configuration: EchoesConfiguration,
     """
     Core code for starting a new Logic/State.
     :param configuration:
-    :param game:
+    :param game: Not modified.
     :param patches:
-    :return:
+    :return: The patched game, shared with other calls for the same game and static resources so it must not be
+    modified, and a new starting state for it.
     """
-    game = copy.deepcopy(game)
     starting_state = calculate_starting_state(game, patches)
 
     if configuration.trick_level.minimal_logic:
@@ -186,6 +225,7 @@ def logic_bootstrap(configuration: EchoesConfiguration,
     for resource, quantity in static_resources.items():
         starting_state.resources[resource] = quantity
 
-    game.patch_requirements(starting_state.resources, configuration.damage_strictness.value)
+    new_game = patched_game(game, starting_state.resources, configuration.damage_strictness.value)
+    move_state_to_game(starting_state, new_game)
 
-    return game, starting_state
+    return new_game, starting_state
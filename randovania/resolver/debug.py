@@ -11,6 +11,10 @@ from randovania.resolver.logic import Logic
 
 _DEBUG_LEVEL = 0
 count = 0
+transposition_hits = 0
+transposition_misses = 0
+reach_calculations = 0
+reach_expansions = 0
 _current_indent = 0
 _last_printed_additional: dict = None
 
@@ -38,9 +42,14 @@ def _indent(offset=0):
 
 
 def log_resolve_start():
-    global _current_indent, _last_printed_additional
+    global _current_indent, _last_printed_additional, transposition_hits, transposition_misses
+    global reach_calculations, reach_expansions
     _current_indent = 0
     _last_printed_additional = {}
+    transposition_hits = 0
+    transposition_misses = 0
+    reach_calculations = 0
+    reach_expansions = 0
 
 
 def log_new_advance(state: "State", reach: "ResolverReach"):
@@ -65,11 +74,33 @@ def log_new_advance(state: "State", reach: "ResolverReach"):
             resource = None
 
         print("{}> {} for {}".format(_indent(1), n(state.node, world_list=world_list), resource))
+        if _DEBUG_LEVEL >= 2 and state.node_path_from_previous_state is not None:
+            print("{}  via {}".format(_indent(1), " -> ".join(n(node, world_list=world_list)
+                                                              for node in state.path_from_previous_state)))
         if _DEBUG_LEVEL >= 3:
             for node in reach.nodes:
                 print("{}: {}".format(_indent(), n(node, world_list=world_list)))
 
 
+def log_transposition_hit(state: "State"):
+    global transposition_hits
+    transposition_hits += 1
+    if _DEBUG_LEVEL > 1:
+        print("{}* Skip {}, dominated by a known dead end".format(_indent(),
+                                                                   n(state.node, world_list=state.world_list)))
+
+
+def log_transposition_miss():
+    global transposition_misses
+    transposition_misses += 1
+
+
+def log_calculated_reach(reach: "ResolverReach"):
+    global reach_calculations, reach_expansions
+    reach_calculations += 1
+    reach_expansions += reach.expanded_nodes
+
+
 def log_checking_satisfiable_actions():
     if _DEBUG_LEVEL > 1:
         print("{}# Satisfiable Actions".format(_indent()))
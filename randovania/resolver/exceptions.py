@@ -29,3 +29,7 @@ class ImpossibleForSolver(Exception):
 
 class InvalidConfiguration(Exception):
     pass
+
+
+class ResolverTimeout(Exception):
+    pass
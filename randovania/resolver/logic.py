@@ -4,6 +4,7 @@ from randovania.game_description.game_description import GameDescription
 from randovania.game_description.node import Node
 from randovania.game_description.requirements import RequirementSet
 from randovania.layout.echoes_configuration import EchoesConfiguration
+from randovania.resolver.transposition_table import TranspositionTable
 
 
 class Logic:
@@ -12,11 +13,22 @@ class Logic:
     game: GameDescription
     configuration: EchoesConfiguration
     additional_requirements: Dict[Node, RequirementSet]
+    additional_requirements_version: int
+    last_reach_at_node: Dict[Node, "ResolverReach"]
+    failed_states: TranspositionTable
 
     def __init__(self, game: GameDescription, configuration: EchoesConfiguration):
         self.game = game
         self.configuration = configuration
         self.additional_requirements = {}
+        self.additional_requirements_version = 0
+        self.last_reach_at_node = {}
+        self.failed_states = TranspositionTable(game.dangerous_resources,
+                                                game.resource_database.energy_tank)
 
     def get_additional_requirements(self, node: Node) -> RequirementSet:
         return self.additional_requirements.get(node, RequirementSet.trivial())
+
+    def set_additional_requirements(self, node: Node, requirements: RequirementSet):
+        self.additional_requirements[node] = requirements
+        self.additional_requirements_version += 1
@@ -1,15 +1,23 @@
-from typing import Optional, Tuple, Callable, FrozenSet
-
-from randovania.game_description import data_reader
+import copy
+import functools
+import multiprocessing
+import time
+from typing import Optional, Tuple, Callable, FrozenSet, NamedTuple, Generator, List
+
+from randovania import profiler
+from randovania.game_description import default_database
+from randovania.game_description.game_description import GameDescription
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import PickupNode, ResourceNode, EventNode, Node
 from randovania.game_description.requirements import RequirementSet, RequirementList
 from randovania.game_description.resources.resource_info import ResourceInfo
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
+from randovania.games.game import RandovaniaGame
 from randovania.layout.echoes_configuration import EchoesConfiguration
 from randovania.resolver import debug, event_pickup
 from randovania.resolver.bootstrap import logic_bootstrap
 from randovania.resolver.event_pickup import EventPickupNode
+from randovania.resolver.exceptions import ResolverTimeout
 from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 from randovania.resolver.state import State
@@ -78,14 +86,62 @@ def _should_check_if_action_is_safe(state: State,
     return False
 
 
-def _inner_advance_depth(state: State,
+def _calculate_reach(logic: Logic, state: State) -> ResolverReach:
+    """
+    Calculates the reach for the given state, extending the last reach calculated at the same node when possible.
+    """
+    previous_reach = logic.last_reach_at_node.get(state.node)
+    if previous_reach is None:
+        reach = ResolverReach.calculate_reach(logic, state)
+    else:
+        reach = ResolverReach.extend(previous_reach, state)
+
+    logic.last_reach_at_node[state.node] = reach
+    debug.log_calculated_reach(reach)
+    profiler.count_reach_calculation()
+    return reach
+
+
+class _AdvanceDepth(NamedTuple):
+    """Requests the engine to resolve the given state and send back the result."""
+    state: State
+    reach: Optional[ResolverReach]
+
+
+_Result = Tuple[Optional[State], bool]
+
+
+def _find_safe_action(state: State, logic: Logic, reach: ResolverReach) -> Optional[_AdvanceDepth]:
+    """
+    Searches for an action after which it's still possible to go back to the current node. Taking such an action
+    never needs to be undone.
+    :param state:
+    :param logic:
+    :param reach: The reach of the given state
+    :return: The state after the action, with its reach, or None if there's no safe action.
+    """
+    for action, energy in reach.possible_actions(state):
+        if _should_check_if_action_is_safe(state, action, logic.game.dangerous_resources,
+                                           logic.game.world_list.all_nodes):
+
+            potential_state = state.act_on_node(action, path=reach.node_path_to(action), new_energy=energy)
+            potential_reach = _calculate_reach(logic, potential_state)
+
+            # If we can go back to where we were, it's a simple safe node
+            if state.node in potential_reach.nodes:
+                return _AdvanceDepth(potential_state, potential_reach)
+
+    return None
+
+
+def _advance_depth_steps(state: State,
                          logic: Logic,
                          status_update: Callable[[str], None],
-                         *,
-                         reach: Optional[ResolverReach] = None,
-                         ) -> Tuple[Optional[State], bool]:
+                         reach: Optional[ResolverReach],
+                         ) -> Generator[_AdvanceDepth, _Result, _Result]:
     """
-
+    Resolves the given state. Instead of recursing, each state that needs to be resolved as part of this is yielded
+    as a _AdvanceDepth and its result is sent back.
     :param state:
     :param logic:
     :param status_update:
@@ -96,39 +152,40 @@ def _inner_advance_depth(state: State,
     if logic.game.victory_condition.satisfied(state.resources, state.energy):
         return state, True
 
+    # A state with no more than what a dead end had at the same node is also a dead end
+    failure = logic.failed_states.find_dominating_failure(state)
+    if failure is not None:
+        debug.log_transposition_hit(state)
+        # Keep the rollback information of a dead end at this node, like resolving the state would
+        current_requirements = logic.get_additional_requirements(state.node)
+        merged_requirements = current_requirements.union(failure.additional_requirements)
+        if merged_requirements != current_requirements:
+            logic.set_additional_requirements(state.node, merged_requirements)
+        return None, failure.has_action
+    debug.log_transposition_miss()
+
     if reach is None:
-        reach = ResolverReach.calculate_reach(logic, state)
+        reach = _calculate_reach(logic, state)
 
     debug.log_new_advance(state, reach)
     status_update("Resolving... {} total resources".format(len(state.resources)))
 
-    for action, energy in reach.possible_actions(state):
-        if _should_check_if_action_is_safe(state, action, logic.game.dangerous_resources,
-                                           logic.game.world_list.all_nodes):
-
-            potential_state = state.act_on_node(action, path=reach.path_to_node[action], new_energy=energy)
-            potential_reach = ResolverReach.calculate_reach(logic, potential_state)
+    safe_action = _find_safe_action(state, logic, reach)
+    if safe_action is not None:
+        new_result = yield safe_action
 
-            # If we can go back to where we were, it's a simple safe node
-            if state.node in potential_reach.nodes:
-                new_result = _inner_advance_depth(state=potential_state,
-                                                  logic=logic,
-                                                  status_update=status_update,
-                                                  reach=potential_reach)
-
-                if not new_result[1]:
-                    debug.log_rollback(state, True, True)
+        if not new_result[1]:
+            debug.log_rollback(state, True, True)
 
-                # If a safe node was a dead end, we're certainly a dead end as well
-                return new_result
+        # If a safe node was a dead end, we're certainly a dead end as well
+        return new_result
 
     debug.log_checking_satisfiable_actions()
     has_action = False
     for action, energy in reach.satisfiable_actions(state, logic.game.victory_condition):
-        new_result = _inner_advance_depth(
-            state=state.act_on_node(action, path=reach.path_to_node[action], new_energy=energy),
-            logic=logic,
-            status_update=status_update)
+        new_result = yield _AdvanceDepth(state.act_on_node(action, path=reach.node_path_to(action),
+                                                           new_energy=energy),
+                                         None)
 
         # We got a positive result. Send it back up
         if new_result[0] is not None:
@@ -146,33 +203,222 @@ def _inner_advance_depth(state: State,
 
         additional_requirements = additional_requirements.union(RequirementSet(additional))
 
-    logic.additional_requirements[state.node] = _simplify_additional_requirement_set(additional_requirements,
-                                                                                     state,
-                                                                                     logic.game.dangerous_resources)
+    additional_requirements = _simplify_additional_requirement_set(additional_requirements, state,
+                                                                   logic.game.dangerous_resources)
+    logic.set_additional_requirements(state.node, additional_requirements)
+    logic.failed_states.record_failure(state, has_action, additional_requirements)
     return None, has_action
 
 
-def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None]) -> Optional[State]:
-    return _inner_advance_depth(state, logic, status_update)[0]
+def _inner_advance_depth(state: State,
+                         logic: Logic,
+                         status_update: Callable[[str], None],
+                         *,
+                         reach: Optional[ResolverReach] = None,
+                         deadline: Optional[float] = None,
+                         ) -> _Result:
+    """
+    Resolves the given state, using an explicit stack of the states being resolved instead of recursion.
+    :param state:
+    :param logic:
+    :param status_update:
+    :param reach: A precalculated reach for the given state
+    :param deadline: Raise ResolverTimeout if still resolving after this value of `time.monotonic()`.
+    :return:
+    """
+    stack = [_advance_depth_steps(state, logic, status_update, reach)]
+    result = None
+
+    while stack:
+        if deadline is not None and time.monotonic() > deadline:
+            for steps in reversed(stack):
+                steps.close()
+            raise ResolverTimeout("Resolver did not finish before the deadline")
+
+        try:
+            request = stack[-1].send(result)
+        except StopIteration as finished:
+            stack.pop()
+            result = finished.value
+        else:
+            stack.append(_advance_depth_steps(request.state, logic, status_update, request.reach))
+            result = None
+
+    return result
+
+
+def advance_depth(state: State, logic: Logic, status_update: Callable[[str], None],
+                  deadline: Optional[float] = None) -> Optional[State]:
+    return _inner_advance_depth(state, logic, status_update, deadline=deadline)[0]
+
+
+# Each action taken by the resolver, as (index of the node in all_nodes, indices of the path to it, energy after it)
+_Step = Tuple[int, Tuple[int, ...], int]
+
+# The Logic and starting State of a process exploring branches for _advance_depth_in_parallel
+_worker_logic: Optional[Logic] = None
+_worker_starting_state: Optional[State] = None
+
+
+def _steps_to_state(starting_state: State, state: State, all_nodes: Tuple[Node, ...]) -> List[_Step]:
+    """
+    Lists the actions the resolver took to get from the starting state to the given state.
+    :param starting_state:
+    :param state: A state created from starting_state by calling State.act_on_node.
+    :param all_nodes:
+    :return:
+    """
+    node_index = {node: index for index, node in enumerate(all_nodes)}
+    steps = []
+    while state is not starting_state:
+        steps.append((node_index[state.node], tuple(node_index[node] for node in state.path_from_previous_state),
+                      state.energy))
+        state = state.previous_state
+    steps.reverse()
+    return steps
+
+
+def _replay_steps(starting_state: State, steps: List[_Step], all_nodes: Tuple[Node, ...]) -> State:
+    state = starting_state
+    for node_index, path_indices, energy in steps:
+        path = None
+        for index in path_indices:
+            path = (all_nodes[index], path)
+        state = state.act_on_node(all_nodes[node_index], path=path, new_energy=energy)
+    return state
+
+
+def _initialize_worker(configuration: EchoesConfiguration, patches: GamePatches):
+    global _worker_logic, _worker_starting_state
+    debug.set_level(0)
+    _worker_logic, _worker_starting_state = _create_logic_and_starting_state(configuration, patches)
+
+
+def _resolve_branch(steps: List[_Step], wall_deadline: Optional[float]) -> Optional[List[_Step]]:
+    """
+    Resolves a branch in a process created by _advance_depth_in_parallel.
+    :param steps: The actions that lead to the branch's state.
+    :param wall_deadline: Raise ResolverTimeout if still resolving after this value of `time.time()`.
+    :return: The actions that lead to the final state, or None if the branch is a dead end.
+    """
+    # Each branch starts without what was learned from other branches, so the result doesn't depend on which process
+    # explores which branch
+    logic = Logic(_worker_logic.game, _worker_logic.configuration)
+    all_nodes = logic.game.world_list.all_nodes
+    deadline = None
+    if wall_deadline is not None:
+        deadline = time.monotonic() + (wall_deadline - time.time())
+
+    state = _replay_steps(_worker_starting_state, steps, all_nodes)
+    final_state = _inner_advance_depth(state, logic, _quiet_print, deadline=deadline)[0]
+    if final_state is None:
+        return None
+    return _steps_to_state(_worker_starting_state, final_state, all_nodes)
+
+
+def _advance_depth_in_parallel(configuration: EchoesConfiguration,
+                               patches: GamePatches,
+                               starting_state: State,
+                               logic: Logic,
+                               status_update: Callable[[str], None],
+                               deadline: Optional[float],
+                               jobs: int,
+                               ) -> Optional[State]:
+    """
+    Takes safe actions and actions without alternatives until the resolver needs to choose between actions, then
+    explores each choice in a process pool. The first choice that can finish the game, in the order the resolver
+    would try them, is used; so the result does not depend on which process finishes first.
+    """
+    state = starting_state
+    while True:
+        if deadline is not None and time.monotonic() > deadline:
+            raise ResolverTimeout("Resolver did not finish before the deadline")
+
+        if logic.game.victory_condition.satisfied(state.resources, state.energy):
+            return state
+
+        reach = _calculate_reach(logic, state)
+        safe_action = _find_safe_action(state, logic, reach)
+        if safe_action is not None:
+            state = safe_action.state
+            continue
+
+        branches = [
+            state.act_on_node(action, path=reach.node_path_to(action), new_energy=energy)
+            for action, energy in reach.satisfiable_actions(state, logic.game.victory_condition)
+        ]
+        if not branches:
+            return None
+
+        # With a single choice, the result is the same as the result of taking it
+        if len(branches) > 1:
+            break
+        state = branches[0]
+
+    status_update("Resolving {} branches with {} processes".format(len(branches), jobs))
+    all_nodes = logic.game.world_list.all_nodes
+    wall_deadline = time.time() + (deadline - time.monotonic()) if deadline is not None else None
+
+    with multiprocessing.Pool(processes=jobs, initializer=_initialize_worker,
+                              initargs=(configuration, patches)) as pool:
+        results = [
+            pool.apply_async(_resolve_branch, (_steps_to_state(starting_state, branch, all_nodes), wall_deadline))
+            for branch in branches
+        ]
+        for result in results:
+            steps = result.get()
+            if steps is not None:
+                return _replay_steps(starting_state, steps, all_nodes)
+
+    return None
 
 
 def _quiet_print(s):
     pass
 
 
+@functools.lru_cache()
+def _game_with_event_pickups(game: RandovaniaGame) -> GameDescription:
+    game_description = copy.deepcopy(default_database.game_description_for(game))
+    event_pickup.replace_with_event_pickups(game_description)
+    return game_description
+
+
+def _create_logic_and_starting_state(configuration: EchoesConfiguration,
+                                     patches: GamePatches,
+                                     ) -> Tuple[Logic, State]:
+    game = _game_with_event_pickups(configuration.game)
+    new_game, starting_state = logic_bootstrap(configuration, game, patches)
+    logic = Logic(new_game, configuration)
+    starting_state.resources["add_self_as_requirement_to_resources"] = 1
+    return logic, starting_state
+
+
+@profiler.phase("resolve")
 def resolve(configuration: EchoesConfiguration,
             patches: GamePatches,
-            status_update: Optional[Callable[[str], None]] = None
+            status_update: Optional[Callable[[str], None]] = None,
+            timeout: Optional[float] = None,
+            jobs: int = 1,
             ) -> Optional[State]:
+    """
+    Checks if the game described by the given configuration and patches can be completed.
+    :param configuration:
+    :param patches:
+    :param status_update:
+    :param timeout: Raise ResolverTimeout if resolving takes more than this many seconds.
+    :param jobs: When more than 1, explore the first choice of actions using this many processes.
+    :return: The final state if possible, None otherwise.
+    """
+    deadline = time.monotonic() + timeout if timeout is not None else None
     if status_update is None:
         status_update = _quiet_print
 
-    game = data_reader.decode_data(configuration.game_data)
-    event_pickup.replace_with_event_pickups(game)
-
-    new_game, starting_state = logic_bootstrap(configuration, game, patches)
-    logic = Logic(new_game, configuration)
-    starting_state.resources["add_self_as_requirement_to_resources"] = 1
+    logic, starting_state = _create_logic_and_starting_state(configuration, patches)
     debug.log_resolve_start()
 
-    return advance_depth(starting_state, logic, status_update)
+    if jobs > 1:
+        return _advance_depth_in_parallel(configuration, patches, starting_state, logic, status_update, deadline,
+                                          jobs)
+
+    return advance_depth(starting_state, logic, status_update, deadline)
@@ -1,25 +1,99 @@
+import heapq
 import math
 from collections import defaultdict
-from typing import Dict, Set, Iterator, Tuple, FrozenSet
+from typing import Dict, Set, Iterator, Tuple, FrozenSet, Optional, List
 
 import typing
 
+from randovania.game_description.compiled_requirement import compile_requirement
 from randovania.game_description.game_description import calculate_interesting_resources
 from randovania.game_description.node import ResourceNode, Node
 from randovania.game_description.requirements import RequirementList, RequirementSet, SatisfiableRequirements, \
     RequirementAnd, Requirement
+from randovania.game_description.resources.resource_collection import resource_index_for
 from randovania.resolver import debug
 from randovania.resolver.logic import Logic
-from randovania.resolver.state import State
+from randovania.resolver.state import State, NodePath, path_as_tuple
+
+
+class _ReachSearch:
+    """
+    A best-first search over the nodes, always expanding the node with the most energy left.
+    Since moving never increases energy (except when reaching a heal node, which is accounted for when the node
+    is added), each node is expanded once, with the most energy it can be reached with.
+    Also has the data needed to continue the search when the state gains resources.
+    """
+    initial_state: State
+    logic_version: int
+    checked_nodes: Dict[Node, int]
+    blocked_edges: Dict[Tuple[Node, Node], Requirement]
+    requirements_by_node: Dict[Node, Set[RequirementList]]
+    expanded_nodes: int
+    _pending: Dict[Node, int]
+    _heap: List[Tuple[int, int, Node]]
+    _counter: int
+
+    def __init__(self, initial_state: State, logic: Logic):
+        self.initial_state = initial_state
+        self.logic_version = logic.additional_requirements_version
+        self.checked_nodes = {}
+        self.blocked_edges = {}
+        self.requirements_by_node = defaultdict(set)
+        self.expanded_nodes = 0
+        self._pending = {}
+        self._heap = []
+        self._counter = 0
+
+    def can_improve(self, node: Node, energy: int) -> bool:
+        """
+        Checks if reaching the given node with at most the given energy could be better than what was found so far.
+        """
+        return self.checked_nodes.get(node, -math.inf) < energy and self._pending.get(node, -math.inf) < energy
+
+    def push(self, node: Node, energy: int) -> bool:
+        """
+        Adds the given node to be expanded with the given energy, unless it's already reachable with as much energy.
+        :return: If the node was added
+        """
+        if node.heal:
+            energy = self.initial_state.maximum_energy
+
+        if self.checked_nodes.get(node, -math.inf) >= energy or self._pending.get(node, -math.inf) >= energy:
+            return False
+
+        self._pending[node] = energy
+        heapq.heappush(self._heap, (-energy, self._counter, node))
+        self._counter += 1
+        return True
+
+    def pop(self) -> Optional[Tuple[Node, int]]:
+        """
+        Removes the node with the most energy from the nodes to be expanded, and marks it as checked.
+        :return: The node and its energy, or None if there are no nodes left.
+        """
+        while self._heap:
+            negative_energy, _, node = heapq.heappop(self._heap)
+            energy = -negative_energy
+            if self._pending.get(node) != energy:
+                # A better entry for this node was added after this one
+                continue
+
+            del self._pending[node]
+            self.checked_nodes[node] = energy
+            self.expanded_nodes += 1
+            return node, energy
+
+        return None
 
 
 class ResolverReach:
     _nodes: Tuple[Node, ...]
     _energy_at_node: Dict[Node, int]
-    path_to_node: Dict[Node, Tuple[Node, ...]]
+    _path_to_node: Dict[Node, NodePath]
     _satisfiable_requirements: SatisfiableRequirements
     _safe_nodes: FrozenSet[Node]
     _logic: Logic
+    _search: Optional[_ReachSearch] = None
 
     @property
     def nodes(self) -> Iterator[Node]:
@@ -29,19 +103,31 @@ class ResolverReach:
     def satisfiable_requirements(self) -> SatisfiableRequirements:
         return self._satisfiable_requirements
 
+    @property
+    def expanded_nodes(self) -> int:
+        """How many nodes had their connections checked while calculating this reach."""
+        return self._search.expanded_nodes if self._search is not None else 0
+
+    def node_path_to(self, node: Node) -> NodePath:
+        """The path used to reach the given node, without the node itself."""
+        return self._path_to_node[node]
+
+    def path_to_node(self, node: Node) -> Tuple[Node, ...]:
+        return path_as_tuple(self._path_to_node[node])
+
     @property
     def satisfiable_as_requirement_set(self) -> RequirementSet:
         return RequirementSet(self._satisfiable_requirements)
 
     def __init__(self,
                  nodes: Dict[Node, int],
-                 path_to_node: Dict[Node, Tuple[Node, ...]],
+                 path_to_node: Dict[Node, NodePath],
                  requirements: SatisfiableRequirements,
                  logic: Logic):
         self._nodes = tuple(nodes.keys())
         self._energy_at_node = nodes
         self._logic = logic
-        self.path_to_node = path_to_node
+        self._path_to_node = path_to_node
         self._satisfiable_requirements = requirements
 
     @classmethod
@@ -49,58 +135,109 @@ class ResolverReach:
                         logic: Logic,
                         initial_state: State) -> "ResolverReach":
 
-        checked_nodes: Dict[Node, int] = {}
-
-        # Keys: nodes to check
-        # Value: how much energy was available when visiting that node
-        nodes_to_check: Dict[Node, int] = {
-            initial_state.node: initial_state.energy
-        }
+        search = _ReachSearch(initial_state, logic)
+        search.push(initial_state.node, initial_state.energy)
 
         reach_nodes: Dict[Node, int] = {}
-        requirements_by_node: Dict[Node, Set[RequirementList]] = defaultdict(set)
+        path_to_node: Dict[Node, NodePath] = {initial_state.node: None}
+
+        return cls._continue_search(logic, search, reach_nodes, path_to_node)
+
+    @classmethod
+    def extend(cls,
+               previous_reach: "ResolverReach",
+               new_state: State) -> "ResolverReach":
+        """
+        Calculates the reach for the given state, reusing the work of a reach calculated for a state at the same
+        node with a subset of the resources. Only edges that were blocked and depend on the gained resources are
+        checked again.
+        Falls back to calculating from scratch when the previous reach can't be reused.
+        :param previous_reach:
+        :param new_state:
+        :return:
+        """
+        logic = previous_reach._logic
+        previous = previous_reach._search
+
+        if previous is None or not _can_extend(previous, new_state, logic):
+            return cls.calculate_reach(logic, new_state)
+
+        changed_indices = _gained_resource_indices(previous.initial_state, new_state, logic)
+        if changed_indices is None:
+            return cls.calculate_reach(logic, new_state)
+
+        search = _ReachSearch(new_state, logic)
+        search.checked_nodes = dict(previous.checked_nodes)
+        search.blocked_edges = dict(previous.blocked_edges)
+        search.requirements_by_node = defaultdict(set)
+        for node, requirements in previous.requirements_by_node.items():
+            search.requirements_by_node[node] = set(requirements)
+
+        reach_nodes = dict(previous_reach._energy_at_node)
+        path_to_node = dict(previous_reach._path_to_node)
+
+        if not changed_indices:
+            return cls._continue_search(logic, search, reach_nodes, path_to_node)
+
+        for (node, target_node), requirement in previous.blocked_edges.items():
+            energy = search.checked_nodes[node]
+            requirement_to_leave = node.requirement_to_leave(new_state.patches, new_state.resources)
+
+            relevant_indices = compile_requirement(requirement).resource_indices
+            relevant_indices = relevant_indices.union(compile_requirement(requirement_to_leave).resource_indices)
+            if changed_indices.isdisjoint(relevant_indices) and not _additional_requirements_changed(
+                    logic, node, changed_indices):
+                continue
 
-        path_to_node: Dict[Node, Tuple[Node, ...]] = {}
-        path_to_node[initial_state.node] = tuple()
+            if not search.can_improve(target_node, energy):
+                continue
 
-        while nodes_to_check:
-            node = next(iter(nodes_to_check))
-            energy = nodes_to_check.pop(node)
+            damage = _damage_if_satisfied(logic, node, requirement, requirement_to_leave, new_state, energy)
+            if damage is not None:
+                del search.blocked_edges[node, target_node]
+                if search.push(target_node, energy - damage):
+                    path_to_node[target_node] = (node, path_to_node[node])
 
-            if node.heal:
-                energy = initial_state.maximum_energy
+        return cls._continue_search(logic, search, reach_nodes, path_to_node)
 
-            checked_nodes[node] = energy
+    @classmethod
+    def _continue_search(cls,
+                         logic: Logic,
+                         search: _ReachSearch,
+                         reach_nodes: Dict[Node, int],
+                         path_to_node: Dict[Node, NodePath],
+                         ) -> "ResolverReach":
+        initial_state = search.initial_state
+        requirements_by_node = search.requirements_by_node
+        adjacency = logic.game.world_list.adjacency_for(initial_state.patches)
+
+        while True:
+            node_and_energy = search.pop()
+            if node_and_energy is None:
+                break
+
+            node, energy = node_and_energy
             if node != initial_state.node:
                 reach_nodes[node] = energy
 
             requirement_to_leave = node.requirement_to_leave(initial_state.patches, initial_state.resources)
 
-            for target_node, requirement in logic.game.world_list.potential_nodes_from(node, initial_state.patches):
-                if target_node is None:
-                    continue
-
-                if checked_nodes.get(target_node, math.inf) <= energy or nodes_to_check.get(target_node,
-                                                                                            math.inf) <= energy:
+            for target_node, requirement, _ in adjacency.connections_from(node):
+                if not search.can_improve(target_node, energy):
                     continue
 
-                if requirement_to_leave != Requirement.trivial():
-                    requirement = RequirementAnd([requirement, requirement_to_leave])
-
-                # Check if the normal requirements to reach that node is satisfied
-                satisfied = requirement.satisfied(initial_state.resources, energy)
-                if satisfied:
-                    # If it is, check if we additional requirements figured out by backtracking is satisfied
-                    satisfied = logic.get_additional_requirements(node).satisfied(initial_state.resources,
-                                                                                  energy)
-
-                if satisfied:
-                    nodes_to_check[target_node] = energy - requirement.damage(initial_state.resources)
-                    path_to_node[target_node] = path_to_node[node] + (node,)
+                damage = _damage_if_satisfied(logic, node, requirement, requirement_to_leave, initial_state, energy)
+                if damage is not None:
+                    search.blocked_edges.pop((node, target_node), None)
+                    if search.push(target_node, energy - damage):
+                        path_to_node[target_node] = (node, path_to_node[node])
 
-                elif target_node:
+                else:
                     # If we can't go to this node, store the reason in order to build the satisfiable requirements.
                     # Note we ignore the 'additional requirements' here because it'll be added on the end.
+                    search.blocked_edges[node, target_node] = requirement
+                    if requirement_to_leave != Requirement.trivial():
+                        requirement = RequirementAnd([requirement, requirement_to_leave])
                     requirements_by_node[target_node].update(requirement.as_set.alternatives)
 
         # Discard satisfiable requirements of nodes reachable by other means
@@ -114,9 +251,11 @@ class ResolverReach:
         else:
             satisfiable_requirements = frozenset()
 
-        return ResolverReach(reach_nodes, path_to_node,
-                             satisfiable_requirements,
-                             logic)
+        reach = ResolverReach(reach_nodes, path_to_node,
+                              satisfiable_requirements,
+                              logic)
+        reach._search = search
+        return reach
 
     def possible_actions(self,
                          state: State) -> Iterator[Tuple[ResourceNode, int]]:
@@ -157,3 +296,72 @@ class ResolverReach:
             node = typing.cast(ResourceNode, node)
             if node.can_collect(state.patches, state.resources, self._logic.game.world_list.all_nodes):
                 yield node
+
+
+def _damage_if_satisfied(logic: Logic, node: Node, requirement: Requirement, requirement_to_leave: Requirement,
+                         state: State, energy: int) -> Optional[int]:
+    """
+    Checks if the connection from the given node can be used with the given energy.
+    :return: The damage taken by using the connection, or None if it can't be used.
+    """
+    compiled = compile_requirement(requirement)
+    compiled_to_leave = compile_requirement(requirement_to_leave)
+
+    # Check if the normal requirements to reach that node is satisfied
+    if not (compiled.satisfied(state.resources, energy) and compiled_to_leave.satisfied(state.resources, energy)):
+        return None
+
+    # If it is, check if we additional requirements figured out by backtracking is satisfied
+    if not logic.get_additional_requirements(node).satisfied(state.resources, energy):
+        return None
+
+    return compiled.damage(state.resources) + compiled_to_leave.damage(state.resources)
+
+
+def _can_extend(previous: _ReachSearch, new_state: State, logic: Logic) -> bool:
+    previous_state = previous.initial_state
+    return (previous.logic_version == logic.additional_requirements_version
+            and previous_state.node == new_state.node
+            and previous_state.patches is new_state.patches
+            and previous_state.energy == new_state.energy
+            and previous_state.maximum_energy == new_state.maximum_energy)
+
+
+def _gained_resource_indices(previous_state: State, new_state: State, logic: Logic) -> Optional[Set[int]]:
+    """
+    Calculates which resources the new state has more of than the previous.
+    :return: The indices of the changed resources, or None if the reach calculated for the previous state can't
+    be extended, such as when any resource was lost, a dangerous resource changed or a damage reduction was gained.
+    """
+    old_quantities = previous_state.resources.quantities
+    new_quantities = new_state.resources.quantities
+    if old_quantities is new_quantities:
+        return set()
+
+    changed = set()
+    for index in range(max(len(old_quantities), len(new_quantities))):
+        old = (old_quantities[index] if index < len(old_quantities) else None) or 0
+        new = (new_quantities[index] if index < len(new_quantities) else None) or 0
+        if old > new:
+            return None
+        elif old < new:
+            changed.add(index)
+
+    if changed and not changed.isdisjoint(_fixed_resource_indices(logic)):
+        return None
+
+    return changed
+
+
+def _fixed_resource_indices(logic: Logic) -> FrozenSet[int]:
+    """The resources that, when changed, requires recalculating the reach from scratch."""
+    game = logic.game
+    indices = {resource_index_for(resource) for resource in game.dangerous_resources}
+    for damage in game.resource_database.damage:
+        indices.update(resource_index_for(reduction.inventory_item) for reduction in damage.reductions)
+    return frozenset(indices)
+
+
+def _additional_requirements_changed(logic: Logic, node: Node, changed_indices: Set[int]) -> bool:
+    return any(resource_index_for(individual.resource) in changed_indices
+               for individual in logic.get_additional_requirements(node).all_individual)
@@ -1,17 +1,36 @@
-import copy
-from typing import Optional, Tuple, Iterator
+from typing import Optional, Tuple, Iterator, Union
 
 from randovania.game_description.game_patches import GamePatches
 from randovania.game_description.node import ResourceNode, Node
 from randovania.game_description.resources.logbook_asset import LogbookAsset
 from randovania.game_description.resources.pickup_entry import PickupEntry
 from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_collection import ResourceCollection
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.resource_info import ResourceInfo, CurrentResources, \
-    add_resource_gain_to_current_resources, add_resources_into_another, convert_resource_gain_to_current_resources
+    convert_resource_gain_to_current_resources
 from randovania.game_description.world_list import WorldList
 
 
+# A path as linked pairs of (last node, path before it). Paths that share a beginning share these pairs, so storing
+# one per node costs the same regardless of how long the paths are.
+NodePath = Optional[Tuple[Node, "NodePath"]]
+
+
+def path_as_tuple(path: NodePath) -> Tuple[Node, ...]:
+    """
+    Expands the given NodePath into all nodes it goes through, from first to last.
+    :param path:
+    :return:
+    """
+    result = []
+    while path is not None:
+        node, path = path
+        result.append(node)
+    result.reverse()
+    return tuple(result)
+
+
 def _energy_tank_difference(new_resources: CurrentResources,
                             old_resources: CurrentResources,
                             database: ResourceDatabase,
@@ -20,18 +39,18 @@ def _energy_tank_difference(new_resources: CurrentResources,
 
 
 class State:
-    resources: CurrentResources
+    resources: ResourceCollection
     collected_resource_nodes: Tuple[ResourceNode, ...]
     energy: int
     node: Node
     patches: GamePatches
     previous_state: Optional["State"]
-    path_from_previous_state: Tuple[Node, ...]
+    node_path_from_previous_state: NodePath
     resource_database: ResourceDatabase
     world_list: WorldList
 
     def __init__(self,
-                 resources: CurrentResources,
+                 resources: Union[CurrentResources, ResourceCollection],
                  collected_resource_nodes: Tuple[ResourceNode, ...],
                  energy: int,
                  node: Node,
@@ -40,11 +59,14 @@ class State:
                  resource_database: ResourceDatabase,
                  world_list: WorldList):
 
+        if not isinstance(resources, ResourceCollection):
+            resources = ResourceCollection.from_dict(resources)
+
         self.resources = resources
         self.collected_resource_nodes = collected_resource_nodes
         self.node = node
         self.patches = patches
-        self.path_from_previous_state = ()
+        self.node_path_from_previous_state = None
         self.previous_state = previous
         self.resource_database = resource_database
         self.world_list = world_list
@@ -52,11 +74,15 @@ class State:
         # We place this last because we need resource_database set
         self.energy = min(energy, self.maximum_energy)
 
+    @property
+    def path_from_previous_state(self) -> Tuple[Node, ...]:
+        return path_as_tuple(self.node_path_from_previous_state)
+
     def has_resource(self, resource: ResourceInfo) -> bool:
         return self.resources.get(resource, 0) > 0
 
     def copy(self) -> "State":
-        return State(copy.copy(self.resources),
+        return State(self.resources.copy(),
                      self.collected_resource_nodes,
                      self.energy,
                      self.node,
@@ -105,10 +131,9 @@ class State:
             raise ValueError(
                 "Trying to collect an uncollectable node'{}'".format(node))
 
-        new_resources = copy.copy(self.resources)
-        add_resource_gain_to_current_resources(node.resource_gain_on_collect(self.patches, self.resources,
-                                                                             self.world_list.all_nodes),
-                                               new_resources)
+        new_resources = self.resources.copy()
+        new_resources.add_resource_gain(node.resource_gain_on_collect(self.patches, self.resources,
+                                                                      self.world_list.all_nodes))
 
         energy = new_energy
         if _energy_tank_difference(new_resources, self.resources, self.resource_database) > 0:
@@ -117,17 +142,17 @@ class State:
         return State(new_resources, self.collected_resource_nodes + (node,), energy, self.node, self.patches, self,
                      self.resource_database, self.world_list)
 
-    def act_on_node(self, node: ResourceNode, path: Tuple[Node, ...] = (), new_energy: Optional[int] = None) -> "State":
+    def act_on_node(self, node: ResourceNode, path: NodePath = None, new_energy: Optional[int] = None) -> "State":
         if new_energy is None:
             new_energy = self.energy
         new_state = self.collect_resource_node(node, new_energy)
         new_state.node = node
-        new_state.path_from_previous_state = path
+        new_state.node_path_from_previous_state = path
         return new_state
 
     def assign_pickup_resources(self, pickup: PickupEntry) -> "State":
-        new_resources = copy.copy(self.resources)
-        add_resource_gain_to_current_resources(pickup.resource_gain(self.resources), new_resources)
+        new_resources = self.resources.copy()
+        new_resources.add_resource_gain(pickup.resource_gain(self.resources))
 
         energy = self.energy
         if _energy_tank_difference(new_resources, self.resources, self.resource_database) > 0:
@@ -150,8 +175,8 @@ class State:
         # Make sure there's no item percentage on starting items
         pickup_resources.pop(self.resource_database.item_percentage, None)
 
-        new_resources = copy.copy(self.resources)
-        add_resources_into_another(new_resources, pickup_resources)
+        new_resources = self.resources.copy()
+        new_resources.add_resource_gain(pickup_resources.items())
         new_patches = self.patches.assign_extra_initial_items(pickup_resources)
 
         if self.patches.game_specific is not None:
@@ -179,7 +204,7 @@ def add_pickup_to_state(state: State, pickup: PickupEntry):
     :param pickup:
     :return:
     """
-    add_resource_gain_to_current_resources(pickup.resource_gain(state.resources), state.resources)
+    state.resources.add_resource_gain(pickup.resource_gain(state.resources))
 
 
 def state_with_pickup(state: State,
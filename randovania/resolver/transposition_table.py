@@ -0,0 +1,116 @@
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple
+
+from randovania.game_description.node import Node
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.resources.resource_collection import resource_index_for
+from randovania.game_description.resources.resource_info import ResourceInfo
+from randovania.resolver.state import State
+
+
+class FailedState(NamedTuple):
+    signature: Tuple[int, ...]
+    total: int
+    dangerous: Tuple[int, ...]
+    energy: int
+    at_maximum_energy: bool
+    energy_tanks: int
+    has_action: bool
+    additional_requirements: RequirementSet
+
+
+def resource_signature(state: State) -> Tuple[int, ...]:
+    """
+    A canonical form of the state's resources: the quantity of each resource by its dense index, without trailing
+    zeros. Two states with the same resources always have the same signature.
+    :param state:
+    :return:
+    """
+    signature = [quantity or 0 for quantity in state.resources.quantities]
+    while signature and signature[-1] == 0:
+        signature.pop()
+    return tuple(signature)
+
+
+def _is_subset(signature: Tuple[int, ...], other: Tuple[int, ...]) -> bool:
+    if len(signature) > len(other):
+        return False
+    return all(quantity <= other_quantity for quantity, other_quantity in zip(signature, other))
+
+
+class TranspositionTable:
+    """
+    Remembers the states that the resolver found to be dead ends.
+    A new state at the same node whose resources are a subset of a failed state's, with no more energy, is also a
+    dead end and doesn't need to be explored again.
+    Dangerous resources must match exactly, since having fewer of them can open more paths.
+    Collecting an energy tank refills the energy, so a state missing energy tanks is only dominated by a failed state
+    that was already at its maximum energy.
+    """
+    _dangerous_indices: Tuple[int, ...]
+    _energy_tank_index: Optional[int]
+    _failed_by_node: Dict[Node, List[FailedState]]
+
+    def __init__(self, dangerous_resources: FrozenSet[ResourceInfo], energy_tank: Optional[ResourceInfo] = None):
+        """
+        :param dangerous_resources:
+        :param energy_tank: The resource that refills the energy when collected.
+        """
+        self._dangerous_indices = tuple(sorted(resource_index_for(resource) for resource in dangerous_resources))
+        self._energy_tank_index = resource_index_for(energy_tank) if energy_tank is not None else None
+        self._failed_by_node = {}
+
+    def _energy_tanks(self, signature: Tuple[int, ...]) -> int:
+        if self._energy_tank_index is None or self._energy_tank_index >= len(signature):
+            return 0
+        return signature[self._energy_tank_index]
+
+    def _split_dangerous(self, signature: Tuple[int, ...]) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+        if not self._dangerous_indices:
+            return signature, ()
+
+        safe = list(signature)
+        dangerous = []
+        for index in self._dangerous_indices:
+            if index < len(safe):
+                dangerous.append(safe[index])
+                safe[index] = 0
+            else:
+                dangerous.append(0)
+        return tuple(safe), tuple(dangerous)
+
+    def record_failure(self, state: State, has_action: bool, additional_requirements: RequirementSet):
+        """
+        :param state:
+        :param has_action: If the state had any action to try.
+        :param additional_requirements: What was set as the additional requirements of the node for this failure.
+        :return:
+        """
+        full_signature = resource_signature(state)
+        signature, dangerous = self._split_dangerous(full_signature)
+        self._failed_by_node.setdefault(state.node, []).append(
+            FailedState(signature, sum(signature), dangerous, state.energy, state.energy >= state.maximum_energy,
+                        self._energy_tanks(full_signature), has_action, additional_requirements)
+        )
+
+    def find_dominating_failure(self, state: State) -> Optional[FailedState]:
+        """
+        Searches for a failed state at the same node that has at least the same resources and energy as the given
+        state.
+        :param state:
+        :return: The failed state, or None if there's none.
+        """
+        failures = self._failed_by_node.get(state.node)
+        if not failures:
+            return None
+
+        full_signature = resource_signature(state)
+        signature, dangerous = self._split_dangerous(full_signature)
+        total = sum(signature)
+        energy_tanks = self._energy_tanks(full_signature)
+        for failure in failures:
+            if (total <= failure.total and state.energy <= failure.energy and dangerous == failure.dangerous
+                    and (failure.at_maximum_energy or energy_tanks == failure.energy_tanks)
+                    and _is_subset(signature, failure.signature)):
+                return failure
+
+        return None
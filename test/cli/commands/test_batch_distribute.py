@@ -1,7 +1,13 @@
+import json
+from concurrent.futures import Future, wait
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import patch, MagicMock
 
+import pytest
+
 from randovania.cli.commands import batch_distribute
 from randovania.layout.permalink import Permalink
+from randovania.resolver.exceptions import GenerationFailure
 
 
 @patch("randovania.generator.generator.generate_description", autospec=True)
@@ -13,8 +19,8 @@ def test_batch_distribute_helper(mock_perf_counter: MagicMock,
     base_permalink = MagicMock()
     seed_number = 5000
     validate = MagicMock()
-    output_dir = MagicMock()
     timeout = 67
+    layout_cache = MagicMock()
 
     expected_permalink = Permalink(
         seed_number=seed_number,
@@ -25,12 +31,184 @@ def test_batch_distribute_helper(mock_perf_counter: MagicMock,
     mock_perf_counter.side_effect = [1000, 5000]
 
     # Run
-    delta_time = batch_distribute.batch_distribute_helper(base_permalink, seed_number, timeout, validate, output_dir)
+    entry = batch_distribute.batch_distribute_helper(base_permalink, seed_number, timeout, validate,
+                                                     generator_jobs=3, layout_cache=layout_cache)
 
     # Assert
     mock_generate_description.assert_called_once_with(permalink=expected_permalink, status_update=None,
                                                       validate_after_generation=validate, timeout=timeout,
-                                                      attempts=0)
-    assert delta_time == 4000
-    output_dir.joinpath.assert_called_once_with("{}.json".format(seed_number))
-    mock_generate_description.return_value.save_to_file.assert_called_once_with(output_dir.joinpath.return_value)
+                                                      attempts=0, jobs=3, layout_cache=layout_cache)
+    assert entry == {
+        "seed_number": seed_number,
+        "seconds": 4000,
+        "layout": mock_generate_description.return_value.as_json,
+    }
+
+
+@patch("randovania.generator.generator.generate_description", autospec=True)
+def test_batch_distribute_helper_failure(mock_generate_description: MagicMock):
+    # Setup
+    mock_generate_description.side_effect = GenerationFailure("Could not generate", MagicMock(), MagicMock())
+
+    # Run
+    entry = batch_distribute.batch_distribute_helper(MagicMock(), 10, 30, False, profile=True)
+
+    # Assert
+    assert entry["seed_number"] == 10
+    assert entry["error"] == "Could not generate"
+    assert entry["seconds"] >= 0
+    assert "layout" not in entry
+    assert entry["profile"]["seconds"] >= 0
+
+
+def test_read_finished_seeds(tmp_path):
+    # Setup
+    output_path = tmp_path.joinpath("seeds.ndjson")
+    output_path.write_text('{"seed_number": 1, "seconds": 2}\n{"seed_number": 5, "error": "x"}\n{"seed_nu')
+
+    # Run
+    finished = batch_distribute.read_finished_seeds(output_path)
+
+    # Assert
+    assert finished == {1, 5}
+    assert output_path.read_text() == '{"seed_number": 1, "seconds": 2}\n{"seed_number": 5, "error": "x"}\n'
+    assert batch_distribute.read_finished_seeds(tmp_path.joinpath("missing.ndjson")) == set()
+
+
+class _SynchronousExecutor:
+    def __init__(self, max_workers, initializer, initargs):
+        initializer(*initargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+
+def test_batch_distribute_command_logic_resumes(tmp_path, mocker):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute.ProcessPoolExecutor", new=_SynchronousExecutor)
+    mock_preload: MagicMock = mocker.patch("randovania.cli.commands.batch_distribute._preload_games")
+    mock_helper: MagicMock = mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper",
+                                          side_effect=lambda permalink, seed_number, *args: {
+                                              "seed_number": seed_number, "seconds": 1.0, "layout": {},
+                                          })
+    permalink = mocker.patch("randovania.layout.permalink.Permalink.from_str").return_value
+    permalink.seed_number = 100
+
+    output_path = tmp_path.joinpath("seeds.ndjson")
+    output_path.write_text('{"seed_number": 101, "seconds": 2.0, "layout": {}}\n')
+
+    args = MagicMock()
+    args.process_count = 1
+    args.seed_count = 3
+    args.output = output_path
+    args.timeout = 30
+    args.validate = True
+    args.generator_jobs = 1
+    args.profile = False
+    args.layout_cache = None
+
+    # Run
+    batch_distribute.batch_distribute_command_logic(args)
+
+    # Assert
+    mock_preload.assert_called_once_with(permalink)
+    assert [call[0][1] for call in mock_helper.call_args_list] == [100, 102]
+    mock_helper.assert_called_with(permalink, 102, 30, True, 1, False, None)
+    assert sorted(json.loads(line)["seed_number"]
+                  for line in output_path.read_text().splitlines()) == [100, 101, 102]
+
+
+def test_batch_distribute_command_logic_bounded_futures(tmp_path, mocker):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute.ProcessPoolExecutor", new=_SynchronousExecutor)
+    mocker.patch("randovania.cli.commands.batch_distribute._preload_games")
+    mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper",
+                 side_effect=lambda permalink, seed_number, *args: {
+                     "seed_number": seed_number, "seconds": 1.0, "layout": {},
+                 })
+    mocker.patch("randovania.layout.permalink.Permalink.from_str").return_value.seed_number = 0
+    waited_sizes = []
+
+    def mock_wait(fs, return_when):
+        waited_sizes.append(len(fs))
+        return wait(fs, return_when=return_when)
+
+    mocker.patch("randovania.cli.commands.batch_distribute.wait", side_effect=mock_wait)
+    output_path = tmp_path.joinpath("seeds.ndjson")
+
+    args = MagicMock()
+    args.process_count = 2
+    args.seed_count = 10
+    args.output = output_path
+    args.layout_cache = None
+
+    # Run
+    batch_distribute.batch_distribute_command_logic(args)
+
+    # Assert
+    assert max(waited_sizes) == 4
+    assert len(output_path.read_text().splitlines()) == 10
+
+
+def _command_args(output_path, seed_count: int) -> MagicMock:
+    args = MagicMock()
+    args.process_count = 1
+    args.seed_count = seed_count
+    args.output = output_path
+    args.layout_cache = None
+    return args
+
+
+def test_batch_distribute_command_logic_output_directory(tmp_path, mocker):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute.ProcessPoolExecutor", new=_SynchronousExecutor)
+    mocker.patch("randovania.cli.commands.batch_distribute._preload_games")
+    mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper",
+                 side_effect=lambda permalink, seed_number, *args: {
+                     "seed_number": seed_number, "seconds": 1.0, "layout": {},
+                 })
+    mocker.patch("randovania.layout.permalink.Permalink.from_str").return_value.seed_number = 0
+
+    # Run
+    batch_distribute.batch_distribute_command_logic(_command_args(tmp_path, 2))
+
+    # Assert
+    assert [path.name for path in tmp_path.iterdir()] == [batch_distribute.OUTPUT_FILE_NAME]
+    assert len(tmp_path.joinpath(batch_distribute.OUTPUT_FILE_NAME).read_text().splitlines()) == 2
+
+
+class _BreakingExecutor(_SynchronousExecutor):
+    def submit(self, fn, *args):
+        if args[0] < 1:
+            return super().submit(fn, *args)
+        future = Future()
+        future.set_exception(BrokenProcessPool("A process died"))
+        return future
+
+
+def test_batch_distribute_command_logic_broken_pool(tmp_path, mocker, capsys):
+    # Setup
+    mocker.patch("randovania.cli.commands.batch_distribute.ProcessPoolExecutor", new=_BreakingExecutor)
+    mocker.patch("randovania.cli.commands.batch_distribute._preload_games")
+    mocker.patch("randovania.cli.commands.batch_distribute.batch_distribute_helper",
+                 side_effect=lambda permalink, seed_number, *args: {
+                     "seed_number": seed_number, "seconds": 1.0, "layout": {},
+                 })
+    mocker.patch("randovania.layout.permalink.Permalink.from_str").return_value.seed_number = 0
+    output_path = tmp_path.joinpath("seeds.ndjson")
+
+    # Run
+    with pytest.raises(SystemExit):
+        batch_distribute.batch_distribute_command_logic(_command_args(output_path, 5))
+
+    # Assert
+    assert batch_distribute.read_finished_seeds(output_path) == {0}
+    assert "4 seeds weren't generated" in capsys.readouterr().out
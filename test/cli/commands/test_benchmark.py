@@ -0,0 +1,91 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from randovania.cli.commands import benchmark
+from randovania.cli.commands.benchmark import BenchmarkRun, PresetResults
+from randovania.resolver.exceptions import GenerationFailure
+
+
+def _results(seconds, peak_memory=None) -> PresetResults:
+    return PresetResults([BenchmarkRun(value, peak_memory, True) for value in seconds])
+
+
+@pytest.mark.parametrize(("baseline", "current", "significant"), [
+    ([1.0, 1.1, 0.9, 1.0, 1.05], [2.0, 2.1, 1.9, 2.05, 2.0], True),
+    ([1.0, 1.1, 0.9, 1.0, 1.05], [1.0, 1.05, 0.95, 1.1, 1.0], False),
+    ([1.0, 1.1, 0.9, 1.0, 1.05] * 4, [1.2, 1.3, 1.1, 1.25, 1.2] * 4, True),
+])
+def test_permutation_p_value(baseline, current, significant):
+    # Run
+    p_value = benchmark.permutation_p_value(baseline, current)
+
+    # Assert
+    assert 0 < p_value <= 1
+    assert (p_value < 0.05) == significant
+
+
+def test_find_regressions():
+    # Setup
+    baseline = {
+        "Slower": _results([1.0, 1.1, 0.9, 1.0, 1.05], 1000),
+        "Same": _results([1.0, 1.1, 0.9, 1.0, 1.05], 1000),
+        "Faster": _results([2.0, 2.1, 1.9, 2.05, 2.0]),
+    }
+    current = {
+        "Slower": _results([2.0, 2.1, 1.9, 2.05, 2.0], 1000),
+        "Same": _results([1.0, 1.05, 0.95, 1.1, 1.0], 1000),
+        "Faster": _results([1.0, 1.1, 0.9, 1.0, 1.05]),
+        "New": _results([5.0]),
+    }
+
+    # Run
+    regressions = benchmark.find_regressions(baseline, current, 0.05)
+
+    # Assert
+    assert [(regression.preset_name, regression.metric) for regression in regressions] == [("Slower", "seconds")]
+
+
+def test_preset_results_json_round_trip():
+    # Setup
+    results = PresetResults([BenchmarkRun(1.5, 2000, True), BenchmarkRun(3.0, None, False)])
+
+    # Run
+    decoded = PresetResults.from_json(results.as_json)
+
+    # Assert
+    assert decoded == results
+    assert decoded.failures == 1
+    assert decoded.peak_memory == [2000]
+
+
+@pytest.mark.parametrize("success", [False, True])
+def test_run_benchmark_seed(mocker, success):
+    # Setup
+    mock_generate: MagicMock = mocker.patch("randovania.generator.generator.generate_description", autospec=True)
+    if not success:
+        mock_generate.side_effect = GenerationFailure("failed", MagicMock(), MagicMock())
+    mocker.patch("randovania.cli.commands.benchmark._peak_memory_kb", side_effect=[150000, 400000])
+
+    # Run
+    run = benchmark.run_benchmark_seed("Starter Preset", 1000, True, 30)
+
+    # Assert
+    mock_generate.assert_called_once()
+    assert mock_generate.call_args[1]["permalink"].seed_number == 1000
+    assert run.success == success
+    assert run.seconds >= 0
+    assert run.peak_memory == 250000
+
+
+def test_peak_memory_kb_from_status(tmp_path, mocker):
+    # Setup
+    status = tmp_path.joinpath("status")
+    status.write_text("Name:\tpython\nVmPeak:\t  900000 kB\nVmHWM:\t  123456 kB\nVmRSS:\t  100000 kB\n")
+    mocker.patch("randovania.cli.commands.benchmark._PROC_STATUS", new=status)
+
+    # Run
+    result = benchmark._peak_memory_kb()
+
+    # Assert
+    assert result == 123456
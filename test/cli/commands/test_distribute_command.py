@@ -4,12 +4,14 @@ from unittest.mock import MagicMock, ANY
 import pytest
 
 import randovania.cli.commands.distribute
+from randovania.generator.layout_cache import LayoutCache
 from randovania.layout.permalink import Permalink
 
 
 @pytest.mark.parametrize("preset_name", [None, "Starter Preset"])
 @pytest.mark.parametrize("no_retry", [False, True])
-def test_distribute_command_logic(no_retry: bool, preset_name: str, mocker, preset_manager):
+@pytest.mark.parametrize("layout_cache", [None, Path("cache")])
+def test_distribute_command_logic(no_retry: bool, preset_name: str, layout_cache, mocker, preset_manager):
     # Setup
     mock_generate: MagicMock = mocker.patch("randovania.generator.generator.generate_description", autospec=True)
     mock_from_str: MagicMock = mocker.patch("randovania.layout.permalink.Permalink.from_str", autospec=True)
@@ -19,9 +21,13 @@ def test_distribute_command_logic(no_retry: bool, preset_name: str, mocker, pres
     args.no_retry = no_retry
     args.preset_name = preset_name
     args.seed_number = 0
+    args.layout_cache = layout_cache
+    args.layout_cache_size = 10
     extra_args = {}
     if no_retry:
         extra_args["attempts"] = 0
+    if layout_cache is not None:
+        extra_args["layout_cache"] = LayoutCache(layout_cache, 10 * 1024 * 1024)
 
     if preset_name is None:
         permalink = mock_from_str.return_value
@@ -43,6 +49,7 @@ def test_distribute_command_logic(no_retry: bool, preset_name: str, mocker, pres
         status_update=ANY,
         validate_after_generation=args.validate,
         timeout=None,
+        concurrent_attempts=args.concurrent_attempts,
         **extra_args,
     )
 
@@ -5,6 +5,7 @@ import pytest
 from randovania.cli import prime_database
 from randovania.game_description.resources.resource_type import ResourceType
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
+from randovania.games.prime import fast_binary_data
 
 
 @pytest.mark.parametrize("expected_resource", [0, 1, 2])
@@ -43,3 +44,24 @@ def test_list_paths_with_resource_logic(mock_load_game_description: MagicMock,
         resource,
         None
     )
+
+
+@patch("randovania.cli.prime_database.decode_data_file", autospec=True)
+def test_convert_database_command_fast_binary(mock_decode_data_file: MagicMock, tmp_path):
+    # Setup
+    args = MagicMock()
+    args.decode_to_game_description = False
+    args.output_binary = None
+    args.output_fast_binary = tmp_path.joinpath("prime2.rdb")
+    args.json_database = tmp_path.joinpath("prime2.json")
+    args.json_database.write_text("{}")
+    mock_decode_data_file.return_value = {"game": "prime2", "worlds": []}
+
+    # Run
+    prime_database.convert_database_command_logic(args)
+
+    # Assert
+    mock_decode_data_file.assert_called_once_with(args)
+    assert fast_binary_data.decode_file_path(args.output_fast_binary) == {"game": "prime2", "worlds": []}
+    assert fast_binary_data.read_source_hash(args.output_fast_binary) == fast_binary_data.hash_source(
+        args.json_database)
@@ -0,0 +1,80 @@
+import pickle
+import random
+
+import pytest
+
+from randovania.game_description.compiled_requirement import compile_requirement
+from randovania.game_description.requirements import ResourceRequirement, RequirementAnd, RequirementOr, \
+    Requirement, MAX_DAMAGE
+from randovania.game_description.resources.damage_resource_info import DamageResourceInfo, DamageReduction
+from randovania.game_description.resources.item_resource_info import ItemResourceInfo
+from randovania.game_description.resources.resource_collection import ResourceCollection
+
+
+@pytest.fixture(name="items")
+def _items():
+    return [ItemResourceInfo(i, str(i), str(i), 10, None) for i in range(3)]
+
+
+def test_trivial_and_impossible():
+    resources = ResourceCollection()
+
+    assert compile_requirement(Requirement.trivial()).satisfied(resources, 0)
+    assert compile_requirement(Requirement.trivial()).damage(resources) == 0
+    assert not compile_requirement(Requirement.impossible()).satisfied(resources, 99)
+    assert compile_requirement(Requirement.impossible()).damage(resources) == MAX_DAMAGE
+
+
+def test_pickle_compiles_again(items):
+    requirement = RequirementOr([ResourceRequirement(items[1], 1, False), ResourceRequirement(items[2], 2, False)])
+    compiled = compile_requirement(requirement)
+
+    loaded = pickle.loads(pickle.dumps(compiled))
+
+    assert loaded is not compiled
+    assert loaded.requirement == requirement
+    assert loaded is compile_requirement(loaded.requirement)
+    assert loaded.satisfied(ResourceCollection.from_dict({items[2]: 2}), 0)
+
+
+def test_damage_with_reduction(items):
+    damage = DamageResourceInfo(0, "Heat", "Heat", (DamageReduction(items[0], 0.5),))
+    requirement = RequirementOr([
+        RequirementAnd([ResourceRequirement(items[1], 1, False), ResourceRequirement(damage, 10, False)]),
+        ResourceRequirement(damage, 50, False),
+    ])
+    compiled = compile_requirement(requirement)
+
+    resources = ResourceCollection.from_dict({items[0]: 1})
+    assert compiled.damage(resources) == 25
+    assert compiled.satisfied(resources, 26)
+    assert not compiled.satisfied(resources, 25)
+
+    resources[items[1]] = 1
+    assert compiled.damage(resources) == 5
+
+
+def test_matches_tree_for_echoes(echoes_game_description):
+    rng = random.Random(5000)
+    resources = list(echoes_game_description.resource_database.item) + list(
+        echoes_game_description.resource_database.trick)
+
+    requirements = [
+        requirement
+        for area in echoes_game_description.world_list.all_areas
+        for connections in area.connections.values()
+        for requirement in connections.values()
+    ]
+
+    for _ in range(5):
+        collection = ResourceCollection.from_dict({
+            resource: rng.randint(0, 3)
+            for resource in rng.sample(resources, len(resources) // 2)
+        })
+        as_dict = collection.as_dict()
+        energy = rng.randint(1, 500)
+
+        for requirement in requirements:
+            compiled = compile_requirement(requirement)
+            assert compiled.satisfied(collection, energy) == requirement.satisfied(as_dict, energy)
+            assert compiled.damage(collection) == requirement.damage(as_dict)
@@ -1,4 +1,10 @@
+import dataclasses
+
+import networkx
+import pytest
+
 from randovania.game_description import node_search
+from randovania.game_description.node import DockNode, TeleporterNode
 
 
 def test_distances_to_node(echoes_game_description):
@@ -11,3 +17,57 @@ def test_distances_to_node(echoes_game_description):
 
     # Assert
     assert result[starting_area] == 0
+
+
+@pytest.mark.parametrize("ignore_elevators", [False, True])
+def test_area_distances_match_networkx(echoes_game_description, ignore_elevators):
+    # Setup
+    world_list = echoes_game_description.world_list
+    patches = echoes_game_description.create_game_patches()
+    graph = networkx.DiGraph()
+    for area in world_list.all_areas:
+        graph.add_node(area)
+        for node in area.nodes:
+            if isinstance(node, DockNode):
+                world = world_list.world_with_area(area)
+                graph.add_edge(area, world.area_by_asset_id(node.default_connection.area_asset_id))
+            elif isinstance(node, TeleporterNode) and not ignore_elevators:
+                graph.add_edge(area, world_list.area_by_area_location(node.default_connection))
+    sources = list(world_list.all_areas)[::40]
+
+    # Run
+    distances = node_search.area_distances_for(world_list, patches, ignore_elevators)
+
+    # Assert
+    assert node_search.area_distances_for(world_list, patches, ignore_elevators) is distances
+    assert node_search.area_distances_for(world_list, patches, not ignore_elevators) is not distances
+    for source in sources:
+        expected = networkx.single_source_shortest_path_length(graph, source)
+        assert distances.distances_from(source) == expected
+        assert distances.distances_from(source, 2) == {area: d for area, d in expected.items() if d <= 2}
+        for target in world_list.all_areas:
+            assert distances.distance(source, target) == expected.get(target)
+
+
+def test_area_distances_for_keeps_recent_connections(echoes_game_description, monkeypatch):
+    # Setup
+    monkeypatch.setattr(node_search, "_AREA_DISTANCES_PER_WORLD_LIST", 2)
+    world_list = echoes_game_description.world_list
+    base_patches = echoes_game_description.create_game_patches()
+    dock = next(node for node in world_list.all_nodes if isinstance(node, DockNode))
+    area = world_list.nodes_to_area(dock)
+    connections = [node.default_connection for node in world_list.all_nodes if isinstance(node, DockNode)][:3]
+    all_patches = [
+        dataclasses.replace(base_patches, dock_connection={(area.area_asset_id, dock.dock_index): connection})
+        for connection in connections
+    ]
+
+    # Run
+    first = node_search.area_distances_for(world_list, all_patches[0])
+    second = node_search.area_distances_for(world_list, all_patches[1])
+    assert node_search.area_distances_for(world_list, all_patches[0]) is first
+    node_search.area_distances_for(world_list, all_patches[2])
+
+    # Assert
+    assert node_search.area_distances_for(world_list, all_patches[0]) is first
+    assert node_search.area_distances_for(world_list, all_patches[1]) is not second
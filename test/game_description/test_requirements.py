@@ -1,11 +1,13 @@
+import gc
+import random
 from typing import Tuple
 from unittest.mock import MagicMock
 
 import pytest
 
-from randovania.game_description import data_reader
+from randovania.game_description import data_reader, requirements
 from randovania.game_description.requirements import ResourceRequirement, RequirementList, RequirementSet, \
-    RequirementAnd, RequirementOr, Requirement, MAX_DAMAGE, RequirementTemplate
+    RequirementAnd, RequirementOr, Requirement, MAX_DAMAGE, RequirementTemplate, intern_requirement
 from randovania.game_description.resources.resource_database import ResourceDatabase
 from randovania.game_description.resources.simple_resource_info import SimpleResourceInfo
 
@@ -465,3 +467,121 @@ def test_requirement_damage(damage, items, requirement, echoes_resource_database
     }
 
     assert req.damage(resources) == damage
+
+
+def test_intern_requirement_shares_equal_requirements():
+    # Setup
+    first = RequirementAnd([_req("A"), RequirementOr([_req("B"), _req("C")])])
+    second = RequirementAnd([_req("A"), RequirementOr([_req("B"), _req("C")])])
+
+    # Run
+    interned_first = intern_requirement(first)
+    interned_second = intern_requirement(second)
+
+    # Assert
+    assert interned_first is first
+    assert interned_second is first
+    assert intern_requirement(RequirementAnd([])) is Requirement.trivial()
+    assert intern_requirement(RequirementOr([])) is Requirement.impossible()
+
+
+def test_read_requirement_is_interned(database):
+    # Setup
+    data = {"type": "and", "data": [
+        {"type": "resource", "data": {"type": 0, "index": 0, "amount": 1, "negate": False}},
+        {"type": "template", "data": "Use A"},
+    ]}
+
+    # Run
+    first = data_reader.read_requirement(data, database)
+    second = data_reader.read_requirement(data, database)
+
+    # Assert
+    assert first is second
+    assert first.items[0] is data_reader.read_requirement(data["data"][0], database)
+
+
+def test_simplify_and_as_set_are_memoized():
+    # Setup
+    req = RequirementOr([RequirementAnd([_req("A")]), RequirementAnd([_req("A"), _req("B")])])
+
+    # Run
+    simplified = req.simplify()
+
+    # Assert
+    assert req.simplify() is simplified
+    assert req.as_set is req.as_set
+    assert RequirementOr([RequirementAnd([_req("A")]), RequirementAnd([_req("A"), _req("B")])]).simplify() is simplified
+
+
+def test_patch_requirements_memoized_per_relevant_resources():
+    # Setup
+    res_a, id_req_a = make_req_a()
+    res_b, id_req_b = make_req_b()
+    res_c = make_req_c()[0]
+    req = RequirementAnd([id_req_a, id_req_b])
+
+    # Run
+    with_a = req.patch_requirements({res_a: 1}, 1)
+    with_a_and_c = req.patch_requirements({res_a: 1, res_c: 1}, 1)
+    without_a = req.patch_requirements({res_a: 0}, 1)
+
+    # Assert
+    assert with_a is with_a_and_c
+    assert with_a.simplify() == id_req_b
+    assert without_a.simplify() == Requirement.impossible()
+
+
+def test_requirement_set_matches_pairwise_pruning():
+    # Setup
+    rng = random.Random(5000)
+    individuals = [_req(f"R{i}") for i in range(12)]
+    lists = [RequirementList(rng.sample(individuals, rng.randint(1, 4))) for _ in range(200)]
+    lists.append(RequirementList([]))
+    other = RequirementSet(RequirementList(rng.sample(individuals, rng.randint(1, 3))) for _ in range(20))
+
+    def pairwise(alternatives):
+        input_set = frozenset(alternatives)
+        return frozenset(a for a in input_set if not any(b.items < a.items for b in input_set))
+
+    # Run
+    without_empty = RequirementSet(lists[:50])
+    with_empty = RequirementSet(lists)
+    union = without_empty.union(other)
+
+    # Assert
+    assert without_empty.alternatives == pairwise(lists[:50])
+    assert with_empty.alternatives == pairwise(lists)
+    assert with_empty == RequirementSet.trivial()
+    assert union.alternatives == pairwise(a.union(b) for a in without_empty.alternatives for b in other.alternatives)
+    assert union.union(RequirementSet.trivial()) is union
+    assert RequirementSet.impossible().union(union) == RequirementSet.impossible()
+
+
+def test_requirement_list_pickle_drops_mask():
+    # Setup
+    req_list = RequirementList([_req("A"), _req("B")])
+    assert req_list.mask
+
+    # Run
+    state = req_list.__getstate__()
+
+    # Assert
+    assert state == {"items": req_list.items}
+
+
+def test_requirement_list_mask_bits_are_released():
+    # Setup
+    resource = SimpleResourceInfo(12345, "Mask Test", "Mask Test", "")
+    first = RequirementList([ResourceRequirement(resource, 1, False)])
+    equal = RequirementList([ResourceRequirement(resource, 1, False)])
+    bit = first.mask
+
+    # Run
+    equal_bit = equal.mask
+    del first, equal
+    gc.collect()
+
+    # Assert
+    assert equal_bit == bit
+    assert bit in requirements._free_requirement_bits
@@ -0,0 +1,54 @@
+import pickle
+
+import pytest
+
+from randovania.game_description.resources.item_resource_info import ItemResourceInfo
+from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_collection import ResourceCollection
+
+
+@pytest.fixture(name="resource_a")
+def _resource_a():
+    return ItemResourceInfo(1, "A", "A", 10, None)
+
+
+def test_get_and_contains(resource_a):
+    collection = ResourceCollection.from_dict({resource_a: 0, PickupIndex(5): 1})
+
+    assert collection.get(resource_a) == 0
+    assert collection.get(PickupIndex(5), 0) == 1
+    assert collection.get(PickupIndex(6), 0) == 0
+    assert resource_a in collection
+    assert PickupIndex(6) not in collection
+    assert len(collection) == 2
+    assert collection == {resource_a: 0, PickupIndex(5): 1}
+
+
+def test_copy_on_write(resource_a):
+    original = ResourceCollection.from_dict({resource_a: 1})
+
+    copy = original.copy()
+    copy[resource_a] = 5
+    copy.add_resource_gain([(PickupIndex(2), 1)])
+    original[PickupIndex(3)] = 1
+
+    assert original == {resource_a: 1, PickupIndex(3): 1}
+    assert copy == {resource_a: 5, PickupIndex(2): 1}
+
+
+def test_delete_and_pop(resource_a):
+    collection = ResourceCollection.from_dict({resource_a: 1, "b": 2})
+
+    del collection[resource_a]
+
+    assert collection.pop("b") == 2
+    assert collection.pop("b", None) is None
+    assert len(collection) == 0
+    with pytest.raises(KeyError):
+        collection["b"]
+
+
+def test_pickle(resource_a):
+    collection = ResourceCollection.from_dict({resource_a: 3})
+
+    assert pickle.loads(pickle.dumps(collection)) == collection
@@ -0,0 +1,124 @@
+import copy
+import dataclasses
+
+import pytest
+
+from randovania.game_description import world_list as world_list_module
+from randovania.game_description.area_location import AreaLocation
+from randovania.game_description.node import PickupNode, ResourceNode, TeleporterNode
+from randovania.game_description.resources.pickup_index import PickupIndex
+
+
+def _search_node(world_list, world_name, area_name, node_name):
+    for world in world_list.worlds:
+        if world_name is not None and world_name not in (world.name, world.dark_name):
+            continue
+        for area in world.areas:
+            if area.name == area_name:
+                for node in area.nodes:
+                    if node.name == node_name:
+                        return node
+
+
+def test_lookups_match_search(echoes_game_description):
+    # Setup
+    world_list = echoes_game_description.world_list
+
+    # Run & Assert
+    for world in world_list.worlds:
+        assert world_list.world_by_asset_id(world.world_asset_id) is world
+        for area in world.areas:
+            assert world_list.world_with_area(area) is world
+            assert world_list.area_to_area_location(area) == AreaLocation(world.world_asset_id, area.area_asset_id)
+            for node in area.nodes:
+                if "/" in node.name:
+                    continue
+                for world_name in (world.name, world.dark_name, None):
+                    name = "{}/{}".format(area.name, node.name)
+                    if world_name is not None:
+                        name = "{}/{}".format(world_name, name)
+                    assert world_list.node_from_name(name) is _search_node(world_list, world_name, area.name,
+                                                                           node.name)
+
+    resource_nodes = [node for node in world_list.all_nodes if isinstance(node, ResourceNode)]
+    for node in resource_nodes:
+        first_node = next(other for other in resource_nodes if other.resource() == node.resource())
+        assert world_list.node_with_resource(node.resource()) is first_node
+        if isinstance(node, PickupNode):
+            assert world_list.node_from_pickup_index(node.pickup_index) is node
+    assert len(resource_nodes) > 100
+
+
+def test_lookups_unknown(echoes_game_description):
+    # Setup
+    world_list = echoes_game_description.world_list
+
+    # Run & Assert
+    with pytest.raises(KeyError):
+        world_list.world_by_asset_id(1234)
+    with pytest.raises(ValueError):
+        world_list.node_from_name("Temple Grounds/Unknown Area/Pickup")
+    with pytest.raises(ValueError):
+        world_list.node_from_pickup_index(PickupIndex(5000))
+
+
+def test_adjacency_for_matches_potential_nodes(echoes_game_description):
+    # Setup
+    world_list = echoes_game_description.world_list
+    patches = echoes_game_description.create_game_patches()
+
+    # Run
+    adjacency = world_list.adjacency_for(patches)
+
+    # Assert
+    assert world_list.adjacency_for(dataclasses.replace(patches, pickup_assignment={})) is adjacency
+    for node in world_list.all_nodes:
+        expected = [(target, requirement)
+                    for target, requirement in world_list.potential_nodes_from(node, patches)
+                    if target is not None]
+        connections = list(adjacency.connections_from(node))
+        assert [(target, requirement) for target, requirement, _ in connections] == expected
+        assert all(compiled.requirement is requirement for _, requirement, compiled in connections)
+
+
+def test_adjacency_for_elevator_changed_in_place(echoes_game_description):
+    # Setup
+    world_list = echoes_game_description.world_list
+    patches = echoes_game_description.create_game_patches()
+    teleporter = next(node for node in world_list.all_nodes if isinstance(node, TeleporterNode))
+    adjacency = world_list.adjacency_for(patches)
+
+    # Run
+    patches.elevator_connection[teleporter.teleporter_instance_id] = echoes_game_description.starting_location
+    new_adjacency = world_list.adjacency_for(patches)
+
+    # Assert
+    assert new_adjacency is not adjacency
+    assert world_list.resolve_teleporter_connection(echoes_game_description.starting_location) in [
+        target for target, _, _ in new_adjacency.connections_from(teleporter)
+    ]
+
+
+def test_adjacency_for_keeps_recent_patches(echoes_game_description, monkeypatch):
+    # Setup
+    monkeypatch.setattr(world_list_module, "_ADJACENCY_CACHE_SIZE", 2)
+    world_list = copy.deepcopy(echoes_game_description.world_list)
+    base_patches = echoes_game_description.create_game_patches()
+    teleporter = next(node for node in world_list.all_nodes if isinstance(node, TeleporterNode))
+    all_patches = [
+        dataclasses.replace(base_patches, elevator_connection={
+            **base_patches.elevator_connection,
+            teleporter.teleporter_instance_id: world_list.area_to_area_location(area),
+        })
+        for area in list(world_list.all_areas)[:3]
+    ]
+
+    # Run
+    first = world_list.adjacency_for(all_patches[0])
+    second = world_list.adjacency_for(all_patches[1])
+    assert world_list.adjacency_for(all_patches[0]) is first
+    world_list.adjacency_for(all_patches[2])
+
+    # Assert
+    assert world_list.adjacency_for(all_patches[0]) is first
+    assert world_list.adjacency_for(all_patches[1]) is not second
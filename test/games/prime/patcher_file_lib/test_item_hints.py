@@ -351,3 +351,28 @@ def test_create_message_for_hint_relative_area(echoes_game_description, pickup,
     # Assert
     assert result == (f'The &push;&main-color=#FF6705B3;Pickup&pop; can be found '
                       f'&push;&main-color=#FF3333;{distance_text} 10 rooms&pop; away from Torvus Bog - Great Bridge.')
+
+
+def test_create_message_for_hint_relative_area_unreachable(echoes_game_description, pickup, players_config):
+    world_list = echoes_game_description.world_list
+    patches = echoes_game_description.create_game_patches().assign_pickup_assignment({
+        PickupIndex(5): PickupTarget(pickup, 0),
+    })
+
+    hint_name_creator = LocationHintCreator(world_list, None, None)
+    location_formatters = {HintLocationPrecision.RELATIVE_TO_AREA: RelativeAreaFormatter(world_list, patches)}
+    hint = Hint(
+        HintType.LOCATION,
+        PrecisionPair(HintLocationPrecision.RELATIVE_TO_AREA, HintItemPrecision.DETAILED, include_owner=False,
+                      relative=RelativeDataArea(True,
+                                                AreaLocation(1006255871, 1393588666),
+                                                HintRelativeAreaName.NAME)),
+        PickupIndex(5)
+    )
+
+    # Run
+    with pytest.raises(ValueError, match="Temple Grounds - Credits can't be reached from "
+                                         "Temple Grounds - Transport to Agon Wastes"):
+        item_hints.create_message_for_hint(hint, {0: patches}, players_config,
+                                           hint_name_creator, location_formatters,
+                                           world_list)
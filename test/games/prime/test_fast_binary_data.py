@@ -0,0 +1,148 @@
+import hashlib
+import io
+import json
+import struct
+
+import pytest
+
+from randovania.games.game import RandovaniaGame
+from randovania.games.prime import default_data, fast_binary_data
+
+
+def test_simple_round_trip():
+    # Setup
+    sample_data = {
+        "game": "prime3",
+        "floats": [1.5, -0.25],
+        "ints": [0, 7, -1, 2 ** 40, 2 ** 64 + 1],
+        "flags": [True, False, None],
+        "names": {"Ünïcode": "", "Room": "Room"},
+        "requirement": {"type": "and", "data": [
+            {"type": "resource", "data": {"type": 2, "index": 5, "amount": 7, "negate": True}},
+            {"type": "template", "data": "Example Template"},
+            {"type": "or", "data": []},
+        ]},
+        "not_a_requirement": {"type": "resource", "data": {"type": 2, "index": -5, "amount": 7, "negate": True}},
+    }
+    b = io.BytesIO()
+
+    # Run
+    fast_binary_data.encode(sample_data, b)
+    decoded = fast_binary_data.decode(b.getvalue())
+
+    # Assert
+    assert json.dumps(decoded) == json.dumps(sample_data)
+
+
+def test_identical_requirements_are_stored_once():
+    # Setup
+    requirement = {"type": "or", "data": [
+        {"type": "resource", "data": {"type": 0, "index": 1, "amount": 1, "negate": False}},
+    ]}
+    sample_data = {"a": requirement, "b": json.loads(json.dumps(requirement))}
+    b = io.BytesIO()
+
+    # Run
+    fast_binary_data.encode(sample_data, b)
+    decoded = fast_binary_data.decode(b.getvalue())
+
+    # Assert
+    assert decoded == sample_data
+    assert decoded["a"] is decoded["b"]
+
+
+def test_decode_other_version():
+    # Setup
+    b = io.BytesIO()
+    fast_binary_data.encode({}, b)
+    data = bytearray(b.getvalue())
+    struct.pack_into("<I", data, 4, fast_binary_data.current_format_version + 1)
+
+    # Run
+    with pytest.raises(ValueError, match="Unsupported format version"):
+        fast_binary_data.decode(data)
+
+
+def test_source_hash(tmp_path):
+    # Setup
+    source_path = tmp_path.joinpath("source.bin")
+    source_path.write_bytes(b"source")
+    file_path = tmp_path.joinpath("source.rdb")
+
+    # Run
+    with file_path.open("wb") as output:
+        fast_binary_data.encode({"a": 1}, output, fast_binary_data.hash_source(source_path))
+
+    # Assert
+    assert fast_binary_data.read_source_hash(file_path) == hashlib.sha256(b"source").digest()
+    assert fast_binary_data.decode_file_path(file_path) == {"a": 1}
+
+
+@pytest.mark.parametrize("same_source", [False, True])
+def test_read_json_then_binary_checks_source(tmp_path, mocker, same_source):
+    # Setup
+    mocker.patch("randovania.games.prime.default_data.get_data_path", return_value=tmp_path)
+    mocker.patch("randovania.games.prime.default_data.decode_file_path", return_value={"from": "bin"})
+    binary_path = tmp_path.joinpath("binary_data", "prime2.bin")
+    binary_path.parent.mkdir()
+    binary_path.write_bytes(b"current")
+    fast_binary_path = binary_path.with_suffix(".rdb")
+    with fast_binary_path.open("wb") as output:
+        fast_binary_data.encode({"from": "rdb"}, output,
+                                hashlib.sha256(b"current" if same_source else b"previous").digest())
+    default_data.read_json_then_binary.cache_clear()
+
+    # Run
+    try:
+        path, data = default_data.read_json_then_binary(RandovaniaGame.PRIME2)
+    finally:
+        default_data.read_json_then_binary.cache_clear()
+
+    # Assert
+    if same_source:
+        assert (path, data) == (fast_binary_path, {"from": "rdb"})
+    else:
+        assert (path, data) == (binary_path, {"from": "bin"})
+
+
+@pytest.mark.parametrize("same_source", [False, True])
+def test_read_json_then_binary_prefers_fast_binary_of_json(tmp_path, mocker, same_source):
+    # Setup
+    mocker.patch("randovania.games.prime.default_data.get_data_path", return_value=tmp_path)
+    json_path = tmp_path.joinpath("json_data", "prime1.json")
+    json_path.parent.mkdir()
+    json_path.write_text(json.dumps({"from": "json"}))
+    fast_binary_path = tmp_path.joinpath("binary_data", "prime1.rdb")
+    fast_binary_path.parent.mkdir()
+    source = json_path.read_bytes() if same_source else b"previous"
+    with fast_binary_path.open("wb") as output:
+        fast_binary_data.encode({"from": "rdb"}, output, hashlib.sha256(source).digest())
+    default_data.read_json_then_binary.cache_clear()
+
+    # Run
+    try:
+        path, data = default_data.read_json_then_binary(RandovaniaGame.PRIME1)
+    finally:
+        default_data.read_json_then_binary.cache_clear()
+
+    # Assert
+    if same_source:
+        assert (path, data) == (fast_binary_path, {"from": "rdb"})
+    else:
+        assert (path, data) == (json_path, {"from": "json"})
+
+
+@pytest.mark.parametrize("game", RandovaniaGame)
+def test_full_file_round_trip(game, tmp_path):
+    # Setup
+    original_data = default_data.read_json_then_binary(game)[1]
+    file_path = tmp_path.joinpath(f"{game.value}.{fast_binary_data.FILE_EXTENSION}")
+
+    # Run
+    with file_path.open("wb") as output:
+        fast_binary_data.encode(original_data, output)
+    final_data = fast_binary_data.decode_file_path(file_path)
+
+    # Assert
+    assert final_data == original_data
+    assert json.dumps(final_data) == json.dumps(original_data)
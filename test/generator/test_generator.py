@@ -1,9 +1,13 @@
 from typing import Callable, Union
 from unittest.mock import MagicMock, patch, call
 
+import pytest
+
 import randovania
 from randovania.generator import generator
+from randovania.generator.layout_cache import CachedLayout
 from randovania.layout.layout_description import LayoutDescription
+from randovania.resolver.exceptions import GenerationFailure, ResolverTimeout
 
 
 @patch("randovania.generator.generator._validate_item_pool_size", autospec=True)
@@ -42,7 +46,8 @@ def test_create_patches(mock_random: MagicMock,
         call(player_pools[i].pickups, player_pools[i].game, player_pools[i].configuration)
         for i in range(num_players)
     ])
-    mock_run_filler.assert_called_once_with(rng, {i: player_pools[i] for i in range(num_players)}, status_update)
+    mock_run_filler.assert_called_once_with(rng, {i: player_pools[i] for i in range(num_players)}, status_update,
+                                            jobs=1)
     mock_distribute_remaining_items.assert_called_once_with(rng, mock_run_filler.return_value.player_results)
 
     assert result == LayoutDescription(
@@ -51,3 +56,150 @@ def test_create_patches(mock_random: MagicMock,
         all_patches=mock_distribute_remaining_items.return_value,
         item_order=mock_run_filler.return_value.action_log,
     )
+
+
+@patch("randovania.generator.generator.resolver.resolve", autospec=True)
+@patch("randovania.generator.generator._async_create_description", autospec=True)
+def test_generate_description_validation_timeout(mock_create_description: MagicMock,
+                                                 mock_resolve: MagicMock,
+                                                 ):
+    # Setup
+    permalink = MagicMock()
+    permalink.player_count = 1
+    mock_resolve.side_effect = ResolverTimeout("timeout")
+
+    # Run
+    with pytest.raises(GenerationFailure) as exception:
+        generator.generate_description(permalink, None, True, timeout=30)
+
+    # Assert
+    mock_resolve.assert_called_once_with(
+        configuration=permalink.presets[0].configuration,
+        patches=mock_create_description.return_value.all_patches[0],
+        status_update=id,
+        timeout=30,
+    )
+    assert isinstance(exception.value.source, ResolverTimeout)
+
+
+@pytest.mark.parametrize(("cached_validated", "validate"), [
+    (None, True), (None, False), (False, True), (False, False), (True, True),
+])
+@patch("randovania.generator.generator.resolver.resolve", autospec=True)
+@patch("randovania.generator.generator._async_create_description", autospec=True)
+def test_generate_description_layout_cache(mock_create_description: MagicMock,
+                                           mock_resolve: MagicMock,
+                                           cached_validated, validate):
+    # Setup
+    permalink = MagicMock()
+    permalink.player_count = 1
+    layout_cache = MagicMock()
+    if cached_validated is None:
+        layout_cache.get.return_value = None
+        expected_layout = mock_create_description.return_value
+    else:
+        layout_cache.get.return_value = CachedLayout(MagicMock(), cached_validated)
+        expected_layout = layout_cache.get.return_value.layout
+
+    # Run
+    result = generator.generate_description(permalink, None, validate, layout_cache=layout_cache)
+
+    # Assert
+    assert result == expected_layout
+    layout_cache.get.assert_called_once_with(permalink)
+    assert mock_create_description.called == (cached_validated is None)
+    should_validate = validate and not cached_validated
+    assert mock_resolve.called == should_validate
+    if cached_validated is None or should_validate:
+        layout_cache.put.assert_called_once_with(permalink, expected_layout, validated=should_validate)
+    else:
+        layout_cache.put.assert_not_called()
+
+
+@pytest.mark.parametrize("concurrent", [False, True])
+@patch("randovania.generator.generator._create_description_attempt", autospec=True)
+def test_create_description_attempts(mock_attempt: MagicMock, concurrent):
+    # Setup
+    permalink = MagicMock()
+    status_update = MagicMock()
+    mock_attempt.side_effect = [generator.UnableToGenerate("failure"), ({0: "patches"}, ("log",))]
+
+    # Run
+    if concurrent:
+        with patch("randovania.generator.generator.multiprocessing.Pool", autospec=True) as mock_pool:
+            pool = mock_pool.return_value.__enter__.return_value
+
+            def apply_async(func, args, callback, error_callback):
+                result = MagicMock()
+                try:
+                    result.get.return_value = func(*args)
+                    callback(result.get.return_value)
+                except generator.UnableToGenerate as e:
+                    result.get.side_effect = e
+                    error_callback(e)
+                return result
+
+            pool.apply_async.side_effect = apply_async
+            result = generator._create_in_concurrent_attempts(permalink, status_update, 2, 2)
+    else:
+        result = generator._create_in_sequential_attempts(permalink, status_update, 2, 1)
+
+    # Assert
+    assert result == ({0: "patches"}, ("log",))
+    assert [c.args[:2] for c in mock_attempt.call_args_list] == [(permalink, 0), (permalink, 1)]
+    status_update.assert_any_call("Attempt 1 failed")
+
+
+def test_rng_for_attempt():
+    # Setup
+    permalink = MagicMock()
+    permalink.as_bytes = b"\x01\x02\x03"
+
+    # Run
+    first = [generator.rng_for_attempt(permalink, 0).random() for _ in range(3)]
+    second = generator.rng_for_attempt(permalink, 1).random()
+    second_again = generator.rng_for_attempt(permalink, 1).random()
+
+    # Assert
+    assert first[0] == generator.Random(permalink.as_bytes).random()
+    assert second == second_again
+    assert second not in first
+
+
+@pytest.mark.parametrize("successes", [{2, 3}, set()])
+@patch("randovania.generator.generator.multiprocessing.Pool", autospec=True)
+def test_create_in_concurrent_attempts(mock_pool: MagicMock, successes):
+    # Setup
+    permalink = MagicMock()
+    status_update = MagicMock()
+    pool = mock_pool.return_value.__enter__.return_value
+
+    def apply_async(func, args, callback, error_callback):
+        attempt = args[1]
+        result = MagicMock()
+        if attempt in successes:
+            result.get.return_value = ({}, (f"attempt {attempt}",))
+            callback(result.get.return_value)
+        else:
+            result.get.side_effect = generator.UnableToGenerate(f"failure {attempt}")
+            error_callback(result.get.side_effect)
+        return result
+
+    pool.apply_async.side_effect = apply_async
+
+    # Run
+    if successes:
+        result = generator._create_in_concurrent_attempts(permalink, status_update, 4, 2)
+    else:
+        with pytest.raises(generator.UnableToGenerate, match="failure 3"):
+            generator._create_in_concurrent_attempts(permalink, status_update, 4, 2)
+
+    # Assert
+    mock_pool.assert_called_once_with(processes=2)
+    assert pool.apply_async.call_count == 4
+    if successes:
+        assert result == ({}, ("attempt 2",))
+        status_update.assert_has_calls([call("Attempt 1 failed"), call("Attempt 2 failed"),
+                                         call("Attempt 3 succeeded")])
+    else:
+        assert status_update.call_count == 5
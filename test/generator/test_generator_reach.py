@@ -21,7 +21,7 @@ from randovania.games.game import RandovaniaGame
 from randovania.generator import base_patches_factory, generator
 from randovania.generator.generator_reach import GeneratorReach, filter_pickup_nodes, \
     reach_with_all_safe_resources, get_collectable_resource_nodes_of_reach, \
-    advance_reach_with_possible_unsafe_resources, collectable_resource_nodes
+    advance_reach_with_possible_unsafe_resources, collectable_resource_nodes, collect_all_safe_resources_in_reach
 from randovania.generator.item_pool import pool_creator
 from randovania.layout.permalink import Permalink
 from randovania.layout.preset import Preset
@@ -205,3 +205,56 @@ def test_reach_size_from_start_echoes(echoes_game_description, default_layout_co
     # Assert
     assert len(list(reach.nodes)) >= nodes
     assert len(list(reach.safe_nodes)) >= safe_nodes
+
+
+def test_fork_is_independent(default_layout_configuration):
+    # Setup
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+    reach = reach_with_all_safe_resources(game, state)
+
+    original_nodes = set(reach.nodes)
+    original_safe_nodes = set(reach.safe_nodes)
+    original_unreachable = dict(reach._unreachable_paths)
+    original_edges = set(reach._digraph.edges_data())
+
+    new_state = reach.state.copy()
+    new_state.previous_state = reach.state
+    for item in game.resource_database.item:
+        if item.long_name in {"Morph Ball Bomb", "Space Jump Boots", "Boost Ball", "Missile"}:
+            new_state.resources[item] = 5
+
+    # Run
+    fork = reach.fork()
+    fork.advance_to(new_state)
+    collect_all_safe_resources_in_reach(fork)
+
+    # Assert
+    assert set(fork.nodes) > original_nodes
+    assert set(reach.nodes) == original_nodes
+    assert set(reach.safe_nodes) == original_safe_nodes
+    assert reach._unreachable_paths == original_unreachable
+    assert set(reach._digraph.edges_data()) == original_edges
+    assert set(fork.nodes) == set(reach_with_all_safe_resources(game, fork.state).nodes)
+
+
+def test_advance_to_state_modified_in_place(default_layout_configuration):
+    # Setup
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+    reach = reach_with_all_safe_resources(game, state)
+    original_nodes = set(reach.nodes)
+
+    # Run
+    for item in game.resource_database.item:
+        if item.long_name in {"Morph Ball Bomb", "Space Jump Boots", "Boost Ball", "Missile"}:
+            reach.state.resources[item] = 5
+    reach.state.previous_state = reach.state
+    reach.advance_to(reach.state)
+    collect_all_safe_resources_in_reach(reach)
+
+    # Assert
+    expected = reach_with_all_safe_resources(game, reach.state)
+    assert set(reach.nodes) > original_nodes
+    assert set(reach.nodes) == set(expected.nodes)
+    assert reach._unreachable_paths.keys() == expected._unreachable_paths.keys()
@@ -0,0 +1,123 @@
+import random
+
+import networkx
+import pytest
+
+from randovania.game_description.requirements import Requirement
+from randovania.generator.graph import RandovaniaGraph, path_to, IncrementalComponent
+
+
+def _random_graphs(seed: int, node_count: int, edge_count: int):
+    rng = random.Random(seed)
+    graph = RandovaniaGraph.new()
+    reference = networkx.DiGraph()
+    for node in range(node_count):
+        graph.add_node(node)
+        reference.add_node(node)
+    for _ in range(edge_count):
+        source, target = rng.randrange(node_count), rng.randrange(node_count)
+        graph.add_edge(source, target, Requirement.trivial())
+        reference.add_edge(source, target)
+    return graph, reference
+
+
+def test_copy_on_write():
+    # Setup
+    graph = RandovaniaGraph.new()
+    for node in range(3):
+        graph.add_node(node)
+    graph.add_edge(0, 1, Requirement.trivial())
+    graph.add_edge(1, 2, Requirement.trivial())
+
+    # Run
+    copy = graph.copy()
+    copy.add_node(3)
+    copy.add_edge(2, 3, Requirement.trivial())
+    copy.remove_edge(0, 1)
+    graph.add_edge(2, 0, Requirement.impossible())
+
+    # Assert
+    assert set(graph.edges_data()) == {(0, 1, Requirement.trivial()), (1, 2, Requirement.trivial()),
+                                       (2, 0, Requirement.impossible())}
+    assert set(copy.edges_data()) == {(1, 2, Requirement.trivial()), (2, 3, Requirement.trivial())}
+    assert 3 in copy
+    assert 3 not in graph
+    assert copy.edges[1] is graph.edges[1]
+    assert graph.reverse_edges == {0: {2}, 1: {0}, 2: {1}}
+    assert copy.reverse_edges == {1: set(), 2: {1}, 3: {2}}
+
+
+@pytest.mark.parametrize("seed", [1000, 2000, 3000])
+def test_zero_one_bfs(seed):
+    # Setup
+    graph, reference = _random_graphs(seed, 60, 120)
+    expensive = {node for node in range(60) if node % 3 == 0}
+
+    def weight(target: int) -> int:
+        return 1 if target in expensive else 0
+
+    # Run
+    costs, predecessors = graph.zero_one_bfs({0}, weight)
+
+    # Assert
+    expected = networkx.multi_source_dijkstra_path_length(reference, {0},
+                                                          weight=lambda source, target, _: weight(target))
+    assert costs == expected
+    for node, cost in costs.items():
+        path = path_to(predecessors, node)
+        assert path[0] == 0
+        assert path[-1] == node
+        assert all(graph.has_edge(source, target) for source, target in zip(path, path[1:]))
+        assert sum(weight(target) for target in path[1:]) == cost
+
+
+@pytest.mark.parametrize("seed", [1000, 2000, 3000])
+def test_single_source_dijkstra_path(seed):
+    # Setup
+    graph, reference = _random_graphs(seed, 60, 120)
+
+    # Run
+    paths = graph.single_source_dijkstra_path(0)
+
+    # Assert
+    expected = networkx.single_source_shortest_path_length(reference, 0)
+    assert {node: len(path) - 1 for node, path in paths.items()} == expected
+    for node, path in paths.items():
+        assert path[0] == 0
+        assert path[-1] == node
+        assert all(graph.has_edge(source, target) for source, target in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("seed", [1000, 2000, 3000])
+def test_strongly_connected_components(seed):
+    # Setup
+    graph, reference = _random_graphs(seed, 60, 90)
+
+    # Run
+    components = list(graph.strongly_connected_components())
+
+    # Assert
+    expected = list(networkx.strongly_connected_components(reference))
+    assert sorted(map(sorted, components)) == sorted(map(sorted, expected))
+
+
+@pytest.mark.parametrize("seed", [1000, 2000, 3000])
+def test_incremental_component(seed):
+    # Setup
+    rng = random.Random(seed)
+    graph = RandovaniaGraph.new()
+    for node in range(40):
+        graph.add_node(node)
+    component = IncrementalComponent(graph, 0)
+
+    for _ in range(80):
+        source, target = rng.randrange(40), rng.randrange(40)
+
+        # Run
+        graph.add_edge(source, target, Requirement.trivial())
+        component.add_edge(graph, source, target)
+
+        # Assert
+        expected = next(nodes for nodes in graph.strongly_connected_components() if 0 in nodes)
+        assert component.nodes == expected
+        assert component.nodes == IncrementalComponent(graph, 0).nodes
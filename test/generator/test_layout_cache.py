@@ -0,0 +1,91 @@
+import dataclasses
+import os
+
+import pytest
+
+from randovania.generator import layout_cache
+from randovania.generator.layout_cache import LayoutCache
+from randovania.layout.layout_description import LayoutDescription
+from randovania.layout.permalink import Permalink
+
+
+@pytest.fixture(name="layout")
+def _layout(test_files_dir) -> LayoutDescription:
+    return LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+
+
+def test_put_then_get(tmp_path, layout):
+    # Setup
+    cache = LayoutCache(tmp_path.joinpath("cache"))
+    other_permalink = Permalink(layout.permalink.seed_number + 1, True, layout.permalink.presets)
+
+    # Run
+    cache.put(layout.permalink, layout, validated=True)
+    cached = cache.get(layout.permalink)
+
+    # Assert
+    assert cached.validated
+    assert cached.layout.shareable_hash == layout.shareable_hash
+    assert cache.get(other_permalink) is None
+
+
+def test_different_version(tmp_path, layout, mocker):
+    # Setup
+    cache = LayoutCache(tmp_path)
+    cache.put(layout.permalink, layout, validated=False)
+
+    # Run
+    mocker.patch("randovania.generator.layout_cache.VERSION", "0.0.0-other")
+    cached = cache.get(layout.permalink)
+
+    # Assert
+    assert cached is None
+
+
+def test_broken_entry_removed(tmp_path, layout):
+    # Setup
+    cache = LayoutCache(tmp_path)
+    cache.put(layout.permalink, layout, validated=False)
+    entry_path, = tmp_path.iterdir()
+    entry_path.write_text('{"validated": true, "lay')
+
+    # Run
+    cached = cache.get(layout.permalink)
+
+    # Assert
+    assert cached is None
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_evicts_least_recently_used(tmp_path, layout):
+    # Setup
+    permalinks = [Permalink(seed_number, True, layout.permalink.presets) for seed_number in range(3)]
+    cache = LayoutCache(tmp_path)
+    for i, permalink in enumerate(permalinks):
+        cache.put(permalink, dataclasses.replace(layout, permalink=permalink), validated=False)
+        os.utime(cache._path_for(permalink), (1000 + i, 1000 + i))
+    entry_size = cache._path_for(permalinks[0]).stat().st_size
+
+    # Run
+    assert cache.get(permalinks[0]) is not None
+    smaller_cache = LayoutCache(tmp_path, max_size=2 * entry_size)
+    smaller_cache.evict()
+
+    # Assert
+    assert [cache._path_for(permalink).is_file() for permalink in permalinks] == [True, False, True]
+    assert layout_cache.DEFAULT_MAX_SIZE > entry_size
+
+
+def test_clear(tmp_path, layout):
+    # Setup
+    cache = LayoutCache(tmp_path.joinpath("cache"))
+    cache.put(layout.permalink, layout, validated=True)
+    tmp_path.joinpath("cache", "unrelated.txt").write_text("keep")
+
+    # Run
+    cache.clear()
+    LayoutCache(tmp_path.joinpath("missing")).clear()
+
+    # Assert
+    assert cache.get(layout.permalink) is None
+    assert [path.name for path in tmp_path.joinpath("cache").iterdir()] == ["unrelated.txt"]
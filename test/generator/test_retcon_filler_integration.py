@@ -5,6 +5,8 @@ import pytest
 
 from randovania.game_description import data_reader
 from randovania.game_description.resources.pickup_index import PickupIndex
+from randovania.game_description.resources.resource_collection import resource_index_for
+from randovania.generator import generator
 from randovania.generator.filler import retcon
 from randovania.generator.filler.retcon import FillerConfiguration
 from randovania.layout.available_locations import RandomizationMode
@@ -63,7 +65,6 @@ def test_retcon_filler_integration(default_layout_configuration):
     available_pickups = game.pickup_database.all_useful_pickups
 
     new_game, state = logic_bootstrap(layout_configuration, game, patches)
-    new_game.patch_requirements(state.resources, layout_configuration.damage_strictness.value)
 
     filler_patches = retcon.retcon_playthrough_filler(new_game,
                                                       state, tuple(available_pickups), rng,
@@ -75,3 +76,69 @@ def test_retcon_filler_integration(default_layout_configuration):
                                                       ),
                                                       status_update)
     assert filler_patches == patches
+
+
+def _create_player_state(default_layout_configuration) -> retcon.PlayerState:
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    new_game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+
+    player_state = retcon.PlayerState(
+        index=0,
+        game=new_game,
+        initial_state=state,
+        pickups_left=list(player_pool.pickups),
+        configuration=FillerConfiguration(
+            randomization_mode=RandomizationMode.FULL,
+            minimum_random_starting_items=0,
+            maximum_random_starting_items=0,
+            indices_to_exclude=frozenset(),
+        ),
+    )
+    player_state.update_for_new_state()
+    return player_state
+
+
+@pytest.mark.skip_generation_tests
+def test_weighted_potential_actions_in_parallel(default_layout_configuration):
+    # Setup
+    player_state = _create_player_state(default_layout_configuration)
+    status_update = MagicMock()
+
+    # Run
+    sequential = player_state.weighted_potential_actions(status_update, 100)
+    parallel = player_state.weighted_potential_actions(status_update, 100, jobs=2)
+
+    # Assert
+    assert len(sequential) > 1
+    assert list(parallel.items()) == list(sequential.items())
+    assert status_update.call_count == 2 * len(sequential)
+
+
+@pytest.mark.skip_generation_tests
+def test_weight_pool_with_new_resource_index(default_layout_configuration):
+    # Setup
+    player_state = _create_player_state(default_layout_configuration)
+    actions = player_state.potential_actions(100)
+    current_uncollected = retcon.UncollectedState.from_reach(player_state.reach)
+
+    # Run
+    with retcon._WeightPool([player_state], 2) as pool:
+        before = pool.weights(player_state, actions, current_uncollected)
+        resource_index_for(("resource only known after the processes started",))
+        after = pool.weights(player_state, actions, current_uncollected)
+
+    # Assert
+    assert before == [player_state.weight_for_action(action, current_uncollected) for action in actions]
+    assert after == before
+
+
+def test_can_weight_in_parallel_daemonic(mocker, caplog):
+    # Setup
+    mocker.patch("multiprocessing.current_process").return_value.daemon = True
+
+    # Run
+    result = retcon._can_weight_in_parallel(2)
+
+    # Assert
+    assert not result
+    assert "Weighting actions in a single process instead of 2" in caplog.text
@@ -194,3 +194,27 @@ async def test_on_menu_action_map_tracker(default_main_window, mocker):
     # Assert
     mock_execute_dialog.assert_awaited_once()
     default_main_window.open_map_tracker.assert_called_once_with(preset.get_preset().configuration)
+
+
+def test_on_use_layout_cache_change(default_main_window: MainWindow):
+    # Setup
+    default_main_window._options._save_to_disk = MagicMock()
+    default_main_window.menu_action_use_layout_cache.setChecked(False)
+
+    # Run
+    default_main_window._on_use_layout_cache_change()
+
+    # Assert
+    assert not default_main_window._options.advanced_use_layout_cache
+
+
+def test_on_menu_action_clear_layout_cache(default_main_window: MainWindow, mocker):
+    # Setup
+    mock_layout_cache = mocker.patch("randovania.gui.main_window.LayoutCache", autospec=True)
+
+    # Run
+    default_main_window._on_menu_action_clear_layout_cache()
+
+    # Assert
+    mock_layout_cache.assert_called_once_with(default_main_window._options.layout_cache_path)
+    mock_layout_cache.return_value.clear.assert_called_once_with()
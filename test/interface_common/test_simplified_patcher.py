@@ -3,6 +3,7 @@ from unittest.mock import patch, MagicMock
 
 import pytest
 
+from randovania.generator.layout_cache import LayoutCache
 from randovania.interface_common import simplified_patcher
 from randovania.interface_common.options import Options
 from randovania.layout.permalink import Permalink
@@ -58,14 +59,17 @@ def test_unpack_iso(mock_delete_files_location: MagicMock,
     )
 
 
+@pytest.mark.parametrize("use_layout_cache", [False, True])
 @patch("randovania.interface_common.simplified_patcher.ConstantPercentageCallback",
        autospec=False)  # TODO: pytest-qt bug
 @patch("randovania.interface_common.echoes.generate_layout", autospec=True)
 def test_generate_layout(mock_generate_layout: MagicMock,
                          mock_constant_percentage_callback: MagicMock,
+                         use_layout_cache: bool,
                          ):
     # Setup
     options: Options = MagicMock()
+    options.advanced_use_layout_cache = use_layout_cache
     permalink: Permalink = MagicMock()
     progress_update = MagicMock()
 
@@ -79,6 +83,7 @@ def test_generate_layout(mock_generate_layout: MagicMock,
         status_update=mock_constant_percentage_callback.return_value,
         validate_after_generation=options.advanced_validate_seed_after,
         timeout_during_generation=options.advanced_timeout_during_generation,
+        layout_cache=LayoutCache(options.layout_cache_path) if use_layout_cache else None,
     )
 
 
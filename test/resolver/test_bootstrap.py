@@ -1,3 +1,4 @@
+import copy
 from unittest.mock import MagicMock
 
 import pytest
@@ -38,3 +39,51 @@ def test_logic_bootstrap(default_preset, echoes_game_description):
                                                 echoes_game_description.create_game_patches())
 
     
+
+
+def test_patched_game_is_shared(echoes_game_description):
+    # Setup
+    resources = {echoes_game_description.resource_database.energy_tank: 1}
+
+    # Run
+    first = bootstrap.patched_game(echoes_game_description, resources, 1)
+    second = bootstrap.patched_game(echoes_game_description, dict(resources), 1)
+    other_multiplier = bootstrap.patched_game(echoes_game_description, resources, 2)
+
+    # Assert
+    assert first is second
+    assert first is not echoes_game_description
+    assert other_multiplier is not first
+
+
+def test_logic_bootstrap_shares_patched_game(default_preset, echoes_game_description):
+    # Setup
+    patches = echoes_game_description.create_game_patches()
+
+    # Run
+    first_game, first_state = bootstrap.logic_bootstrap(default_preset.configuration, echoes_game_description, patches)
+    second_game, second_state = bootstrap.logic_bootstrap(default_preset.configuration, echoes_game_description,
+                                                          patches)
+
+    # Assert
+    assert first_game is second_game
+    assert first_game is not echoes_game_description
+    assert first_state is not second_state
+    assert first_state.world_list is first_game.world_list
+    assert first_game.world_list.all_nodes[first_state.node.index] is first_state.node
+    assert first_state.resources == second_state.resources
+
+
+def test_move_state_to_game(default_preset, echoes_game_description):
+    # Setup
+    game, state = bootstrap.logic_bootstrap(default_preset.configuration, echoes_game_description,
+                                            echoes_game_description.create_game_patches())
+    game_copy = copy.deepcopy(game)
+
+    # Run
+    bootstrap.move_state_to_game(state, game_copy)
+
+    # Assert
+    assert state.world_list is game_copy.world_list
+    assert state.node is game_copy.world_list.all_nodes[state.node.index]
+    assert state.node is not game.world_list.all_nodes[state.node.index]
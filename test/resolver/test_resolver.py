@@ -1,7 +1,11 @@
+from unittest.mock import patch, MagicMock
+
 import pytest
 
+from randovania.game_description.requirements import RequirementSet, RequirementList, ResourceRequirement
 from randovania.layout.layout_description import LayoutDescription
 from randovania.resolver import resolver, debug
+from randovania.resolver.exceptions import ResolverTimeout
 
 
 @pytest.mark.skip_resolver_tests
@@ -19,3 +23,78 @@ def test_resolver_with_log_file(test_files_dir):
 
     # Assert
     assert final_state_by_resolve is not None
+
+
+def test_resolver_timeout(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+
+    # Run
+    with pytest.raises(ResolverTimeout):
+        resolver.resolve(configuration=description.permalink.presets[0].configuration,
+                         patches=description.all_patches[0],
+                         timeout=0)
+
+
+def test_replay_steps_recreates_final_state(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+    configuration = description.permalink.presets[0].configuration
+    patches = description.all_patches[0]
+
+    logic, starting_state = resolver._create_logic_and_starting_state(configuration, patches)
+    final_state = resolver.advance_depth(starting_state, logic, lambda s: None)
+    all_nodes = logic.game.world_list.all_nodes
+
+    # Run
+    steps = resolver._steps_to_state(starting_state, final_state, all_nodes)
+    replayed = resolver._replay_steps(starting_state, steps, all_nodes)
+
+    # Assert
+    assert replayed.node == final_state.node
+    assert replayed.energy == final_state.energy
+    assert replayed.resources == final_state.resources
+    assert replayed.collected_resource_nodes == final_state.collected_resource_nodes
+    assert replayed.path_from_previous_state == final_state.path_from_previous_state
+
+
+@pytest.mark.skip_resolver_tests
+def test_resolver_parallel_branches(test_files_dir):
+    # Setup
+    description = LayoutDescription.from_file(test_files_dir.joinpath("log_files", "seed_a.rdvgame"))
+    configuration = description.permalink.presets[0].configuration
+    status_update = []
+
+    # Run
+    # Without safe actions, the resolver has to choose between actions early on
+    with patch.object(resolver, "_find_safe_action", return_value=None):
+        final_state = resolver.resolve(configuration=configuration,
+                                       patches=description.all_patches[0],
+                                       status_update=status_update.append,
+                                       jobs=2)
+
+    # Assert
+    assert "Resolving 3 branches with 2 processes" in status_update
+    assert final_state is not None
+
+
+def test_dominated_state_keeps_failure_requirements(echoes_resource_database):
+    # Setup
+    requirement = RequirementSet([RequirementList([
+        ResourceRequirement(echoes_resource_database.energy_tank, 1, False),
+    ])])
+    logic = MagicMock()
+    logic.game.victory_condition.satisfied.return_value = False
+    logic.get_additional_requirements.return_value = RequirementSet.trivial()
+    logic.failed_states.find_dominating_failure.return_value.has_action = True
+    logic.failed_states.find_dominating_failure.return_value.additional_requirements = requirement
+    state = MagicMock()
+
+    # Run
+    steps = resolver._advance_depth_steps(state, logic, lambda s: None, None)
+    with pytest.raises(StopIteration) as result:
+        next(steps)
+
+    # Assert
+    assert result.value.value == (None, True)
+    logic.set_additional_requirements.assert_called_once_with(state.node, requirement)
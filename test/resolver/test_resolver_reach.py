@@ -1,6 +1,10 @@
+from random import Random
 from unittest.mock import MagicMock, PropertyMock
 
 from randovania.game_description.node import EventNode
+from randovania.generator import generator
+from randovania.resolver.bootstrap import logic_bootstrap
+from randovania.resolver.logic import Logic
 from randovania.resolver.resolver_reach import ResolverReach
 
 
@@ -51,3 +55,58 @@ def test_possible_actions_with_event():
     event.can_collect.assert_called_once_with(state.patches, state.resources, reach._logic.game.world_list.all_nodes)
     logic.get_additional_requirements.assert_called_once_with(event)
     logic.get_additional_requirements.return_value.satisfied.assert_called_once_with(state.resources, 1)
+
+
+def test_extend_matches_calculate_reach(default_layout_configuration):
+    # Setup
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+    logic = Logic(game, default_layout_configuration)
+    previous_reach = ResolverReach.calculate_reach(logic, state)
+
+    new_state = state.copy()
+    for item in game.resource_database.item:
+        if item.long_name in {"Morph Ball Bomb", "Space Jump Boots", "Boost Ball", "Missile"}:
+            new_state.resources[item] = 5
+
+    # Run
+    extended = ResolverReach.extend(previous_reach, new_state)
+    full = ResolverReach.calculate_reach(logic, new_state)
+
+    # Assert
+    assert len(set(extended.nodes)) > len(set(previous_reach.nodes))
+    assert set(extended.nodes) == set(full.nodes)
+    assert extended._energy_at_node == full._energy_at_node
+    assert extended.satisfiable_requirements == full.satisfiable_requirements
+
+
+def test_calculate_reach_expands_each_node_once(default_layout_configuration):
+    # Setup
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+    logic = Logic(game, default_layout_configuration)
+
+    # Run
+    reach = ResolverReach.calculate_reach(logic, state)
+
+    # Assert
+    assert reach.expanded_nodes == len(reach._search.checked_nodes)
+    assert all(energy <= state.maximum_energy for energy in reach._energy_at_node.values())
+
+
+def test_path_to_node_follows_connections(default_layout_configuration):
+    # Setup
+    player_pool = generator.create_player_pool(Random(15000), default_layout_configuration, 0, 1)
+    game, state = logic_bootstrap(default_layout_configuration, player_pool.game, player_pool.patches)
+    logic = Logic(game, default_layout_configuration)
+    reach = ResolverReach.calculate_reach(logic, state)
+
+    # Run
+    paths = {node: reach.path_to_node(node) for node in reach.nodes}
+
+    # Assert
+    for node, path in paths.items():
+        assert path[0] == state.node
+        for source, target in zip(path, path[1:] + (node,)):
+            assert target in {connected for connected, _ in game.world_list.potential_nodes_from(source,
+                                                                                                  state.patches)}
@@ -109,3 +109,16 @@ def test_state_with_pickup(database, patches):
     # Assert
     assert final.previous_state is starting
     assert final.resources == {resource_a: 1}
+
+
+def test_path_as_tuple():
+    # Setup
+    path_to_b = ("A", None)
+    path_to_c = ("B", path_to_b)
+
+    # Run
+    result = state.path_as_tuple(("C", path_to_c))
+
+    # Assert
+    assert result == ("A", "B", "C")
+    assert state.path_as_tuple(None) == ()
@@ -0,0 +1,68 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from randovania.game_description.requirements import RequirementSet
+from randovania.game_description.resources.item_resource_info import ItemResourceInfo
+from randovania.game_description.resources.resource_collection import ResourceCollection
+from randovania.resolver.transposition_table import TranspositionTable
+
+
+def _state(node, energy, resources, maximum_energy=None):
+    state = MagicMock()
+    state.node = node
+    state.energy = energy
+    state.maximum_energy = maximum_energy if maximum_energy is not None else energy
+    state.resources = ResourceCollection.from_dict(resources)
+    return state
+
+
+@pytest.fixture(name="items")
+def _items():
+    return [ItemResourceInfo(i, str(i), str(i), 10, None) for i in range(3)]
+
+
+def test_dominated_state(items):
+    table = TranspositionTable(frozenset())
+    table.record_failure(_state("a", 99, {items[0]: 1, items[1]: 2}), True, RequirementSet.trivial())
+
+    # Same resources, subset, less energy
+    assert table.find_dominating_failure(_state("a", 99, {items[0]: 1, items[1]: 2})).has_action
+    assert table.find_dominating_failure(_state("a", 99, {items[1]: 1})) is not None
+    assert table.find_dominating_failure(_state("a", 50, {items[0]: 1})) is not None
+
+    # Different node, more energy, more resources
+    assert table.find_dominating_failure(_state("b", 99, {items[0]: 1})) is None
+    assert table.find_dominating_failure(_state("a", 150, {items[0]: 1})) is None
+    assert table.find_dominating_failure(_state("a", 99, {items[0]: 1, items[2]: 1})) is None
+    assert table.find_dominating_failure(_state("a", 99, {items[1]: 3})) is None
+
+
+def test_dangerous_resources_must_match(items):
+    table = TranspositionTable(frozenset([items[2]]))
+    table.record_failure(_state("a", 99, {items[0]: 1, items[2]: 1}), False, RequirementSet.trivial())
+
+    assert table.find_dominating_failure(_state("a", 99, {items[0]: 1, items[2]: 1})) is not None
+    assert table.find_dominating_failure(_state("a", 99, {items[0]: 1})) is None
+
+
+@pytest.mark.parametrize("failure_at_maximum", [False, True])
+def test_missing_energy_tank(items, failure_at_maximum):
+    # Setup
+    energy_tank = items[2]
+    table = TranspositionTable(frozenset(), energy_tank)
+    requirements = RequirementSet.trivial()
+    table.record_failure(_state("a", 150 if failure_at_maximum else 99, {items[0]: 1, energy_tank: 1},
+                                maximum_energy=150), True, requirements)
+
+    # Run
+    # The uncollected energy tank pickup would refill this state to more energy than the failure had
+    missing_tank = table.find_dominating_failure(_state("a", 99, {items[0]: 1}, maximum_energy=99))
+    same_tanks = table.find_dominating_failure(_state("a", 99, {items[0]: 1, energy_tank: 1}, maximum_energy=150))
+
+    # Assert
+    if failure_at_maximum:
+        assert missing_tank is not None
+    else:
+        assert missing_tank is None
+    assert same_tanks.additional_requirements is requirements
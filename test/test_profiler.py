@@ -0,0 +1,38 @@
+import json
+
+from randovania import profiler
+
+
+@profiler.phase("inner")
+def _inner_phase(reaches: int):
+    for _ in range(reaches):
+        profiler.count_reach_calculation()
+
+
+def test_profiling_nested_phases(tmp_path):
+    # Setup
+    _inner_phase(5)
+
+    # Run
+    with profiler.profiling() as profile:
+        with profiler.phase("outer"):
+            _inner_phase(2)
+            _inner_phase(3)
+        profiler.count_reach_calculation()
+
+    _inner_phase(1)
+    profile.save_json(tmp_path.joinpath("profile.json"))
+    profile.save_chrome_trace(tmp_path.joinpath("trace.json"))
+
+    # Assert
+    data = json.loads(tmp_path.joinpath("profile.json").read_text())
+    assert data["seconds"] >= data["phases"]["outer"]["seconds"] >= data["phases"]["inner"]["seconds"]
+    assert {name: (phase["calls"], phase["reach_calculations"]) for name, phase in data["phases"].items()} == {
+        "outer": (1, 5),
+        "inner": (2, 5),
+    }
+
+    trace = json.loads(tmp_path.joinpath("trace.json").read_text())
+    assert [(event["name"], event["ph"], event["args"]["reach_calculations"])
+            for event in trace["traceEvents"]] == [("outer", "X", 5), ("inner", "X", 2), ("inner", "X", 3)]
+    assert all(event["dur"] >= 0 for event in trace["traceEvents"])
@@ -0,0 +1,38 @@
+"""
+Resolves the single player layouts in test/test_files/log_files, reporting how many reach calculations and node
+expansions each one needed.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from randovania.layout.layout_description import LayoutDescription
+from randovania.resolver import debug, resolver
+
+_ROOT_FOLDER = Path(__file__).parents[1]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("layouts", type=Path, nargs="*",
+                        default=sorted(_ROOT_FOLDER.joinpath("test", "test_files", "log_files").glob("*.rdvgame")))
+    args = parser.parse_args()
+
+    print("{:<30} {:>10} {:>8} {:>12} {:>10}".format("Layout", "Possible", "Reaches", "Expansions", "Time"))
+    for layout_path in args.layouts:
+        description = LayoutDescription.from_file(layout_path)
+        if description.permalink.player_count != 1:
+            continue
+
+        before = time.perf_counter()
+        final_state = resolver.resolve(description.permalink.presets[0].configuration, description.all_patches[0])
+        elapsed = time.perf_counter() - before
+
+        print("{:<30} {:>10} {:>8} {:>12} {:>9.2f}s".format(
+            layout_path.name, str(final_state is not None),
+            debug.reach_calculations, debug.reach_expansions, elapsed,
+        ))
+
+
+if __name__ == '__main__':
+    main()
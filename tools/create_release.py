@@ -16,7 +16,7 @@ import tenacity
 from randovania import VERSION
 from randovania.cli import prime_database
 from randovania.games.game import RandovaniaGame
-from randovania.games.prime import default_data
+from randovania.games.prime import default_data, fast_binary_data
 from randovania.interface_common.enum_lib import iterate_enum
 
 _ROOT_FOLDER = Path(__file__).parents[1]
@@ -87,9 +87,11 @@ async def main():
         shutil.rmtree(app_folder, ignore_errors=False)
 
     for game in iterate_enum(RandovaniaGame):
-        prime_database.export_as_binary(
-            default_data.read_json_then_binary(game)[1],
-            _ROOT_FOLDER.joinpath("randovania", "data", "binary_data", f"{game.value}.bin"))
+        data = default_data.read_json_then_binary(game)[1]
+        binary_path = _ROOT_FOLDER.joinpath("randovania", "data", "binary_data", f"{game.value}.bin")
+        prime_database.export_as_binary(data, binary_path)
+        prime_database.export_as_fast_binary(data, binary_path.with_suffix(f".{fast_binary_data.FILE_EXTENSION}"),
+                                             fast_binary_data.hash_source(binary_path))
 
     if is_production():
         server_suffix = "randovania"